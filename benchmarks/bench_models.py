@@ -0,0 +1,106 @@
+"""
+Benchmark: per-item vs list-level model validation and serialization.
+
+Usage:
+    python benchmarks/bench_models.py [--items N] [--repeat R]
+
+Compares one pydantic-core call per item against one call per list through
+the shared ``list[Example]``/``list[Result]`` adapters, for validating dicts,
+validating JSON lines and serializing to JSON. Also reports the one-off cost
+of building the validators, which ``warm_models`` pays in a parent process
+so forked workers do not.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+
+from my_project.models import (
+    Example,
+    Result,
+    dump_examples_json,
+    dump_results_json,
+    validate_examples,
+    validate_examples_jsonl,
+    validate_results,
+    warm_models,
+)
+
+_BUILD_SNIPPET = (
+    "import time; t = time.perf_counter(); from my_project import models; "
+    "i = time.perf_counter(); models.warm_models(); w = time.perf_counter(); "
+    "print(i - t, w - i)"
+)
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _row(label: str, per_item: float, listed: float) -> None:
+    print(f"  {label:<22}{per_item:8.4f}s {listed:8.4f}s  {per_item / listed:5.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    build = subprocess.run(
+        [sys.executable, "-c", _BUILD_SNIPPET], capture_output=True, text=True, check=True
+    )
+    print(f"Python {sys.version.split()[0]}, {args.items} items, best of {args.repeat}")
+    imported, built = (float(v) * 1000 for v in build.stdout.split())
+    print(f"  cold process: import {imported:.1f}ms, warm_models {built:.1f}ms")
+
+    warm_models()
+    examples = [
+        Example(id=f"id-{i}", name=f"name-{i}", metadata={"tenant": str(i % 7)})
+        for i in range(args.items)
+    ]
+    results = [
+        Result(success=True, message="ok", data={"id": e.id, "name": e.name}) for e in examples
+    ]
+    example_dicts = [e.model_dump() for e in examples]
+    result_dicts = [r.model_dump() for r in results]
+    lines = [e.model_dump_json().encode() for e in examples]
+
+    print(f"  {'':<22}{'per-item':>9} {'list':>8}  speedup")
+    _row(
+        "Example from dicts",
+        _best(lambda: [Example.model_validate(d) for d in example_dicts], args.repeat),
+        _best(lambda: validate_examples(example_dicts), args.repeat),
+    )
+    _row(
+        "Result from dicts",
+        _best(lambda: [Result.model_validate(d) for d in result_dicts], args.repeat),
+        _best(lambda: validate_results(result_dicts), args.repeat),
+    )
+    _row(
+        "Example from JSONL",
+        _best(lambda: [Example.model_validate_json(line) for line in lines], args.repeat),
+        _best(lambda: validate_examples_jsonl(lines), args.repeat),
+    )
+    _row(
+        "Example to JSON",
+        _best(lambda: [e.model_dump_json() for e in examples], args.repeat),
+        _best(lambda: dump_examples_json(examples), args.repeat),
+    )
+    _row(
+        "Result to JSON",
+        _best(lambda: [r.model_dump_json() for r in results], args.repeat),
+        _best(lambda: dump_results_json(results), args.repeat),
+    )
+
+
+if __name__ == "__main__":
+    main()
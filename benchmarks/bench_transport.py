@@ -0,0 +1,68 @@
+"""
+Benchmark: shared-memory vs pickle result transport for multi-process runs.
+
+Usage:
+    python benchmarks/bench_transport.py [--items N] [--processes P] [--repeat R]
+
+Both variants process the same names with the default pipeline across the
+same number of worker processes. "pickle" returns list[Result] through a
+ProcessPoolExecutor; "shared memory" uses process_parallel and is timed
+twice: until results are available (lazy) and after decoding every item.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from my_project.core import process_batch
+from my_project.transport import process_parallel
+
+if TYPE_CHECKING:
+    from my_project.models import Result
+
+
+def _pickle_worker(names: list[str]) -> list[Result]:
+    return process_batch(names).outputs
+
+
+def run_pickle(names: list[str], processes: int) -> list[Result]:
+    step = -(-len(names) // processes)
+    chunks = [names[i : i + step] for i in range(0, len(names), step)]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return [r for chunk in pool.map(_pickle_worker, chunks) for r in chunk]
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    names = [f"item-{i}" for i in range(args.items)]
+
+    pickle_s = _best(lambda: run_pickle(names, args.processes), args.repeat)
+    lazy_s = _best(lambda: process_parallel(names, args.processes), args.repeat)
+    full_s = _best(lambda: list(process_parallel(names, args.processes)), args.repeat)
+
+    print(f"{args.items} items, {args.processes} processes, best of {args.repeat}")
+    print(f"  pickle transport:                 {pickle_s:8.3f}s")
+    print(f"  shared memory (lazy decode):      {lazy_s:8.3f}s  {pickle_s / lazy_s:5.2f}x")
+    print(f"  shared memory (decode all items): {full_s:8.3f}s  {pickle_s / full_s:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
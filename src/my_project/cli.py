@@ -8,10 +8,49 @@ from __future__ import annotations
 
 import argparse
 import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
 
 from my_project import __version__
-from my_project.config import get_settings
-from my_project.core import process_example
+from my_project.config import Settings, get_settings
+from my_project.core import (
+    negative_cache_pipeline,
+    open_repository,
+    persistent_pipeline,
+    process_example,
+)
+from my_project.negative_cache import NegativeCache
+from my_project.pages import SiteBuildError, build_site, compress_site
+from my_project.parallel import free_threaded
+from my_project.preview import create_server
+from my_project.segments import SegmentStore
+from my_project.sharding import ShardedStore
+from my_project.streaming import MemoryLimitError, stream_run
+from my_project.tracing import Tracer, span, start_tracing, stop_tracing
+from my_project.workload import TARGETS, WorkloadRecorder, replay
+
+
+def _sample_rate(value: str) -> float:
+    """Parse a sampling rate argument, rejecting values outside 0-1."""
+    try:
+        rate = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid rate: {value!r}") from None
+    if not 0 <= rate <= 1:
+        raise argparse.ArgumentTypeError(f"rate must be between 0 and 1, got {value}")
+    return rate
+
+
+def _positive_int(value: str) -> int:
+    """Parse a count argument, rejecting values below 1."""
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return count
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -42,10 +81,165 @@ def create_parser() -> argparse.ArgumentParser:
         default="example",
         help="Name for the example (default: example)",
     )
+    run_parser.add_argument(
+        "--input",
+        type=str,
+        default=None,
+        help="Stream names from a file, one per line ('-' for stdin); "
+        "writes JSON results instead of processing --name",
+    )
+    run_parser.add_argument(
+        "--output",
+        type=str,
+        default="-",
+        help="Where streamed results go (default: stdout)",
+    )
+    run_parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=1,
+        help="Processor threads for streamed input (default: 1)",
+    )
+    run_parser.add_argument(
+        "--trace",
+        type=_sample_rate,
+        metavar="RATE",
+        help="Trace this fraction of runs/chunks to LOG_DIR/traces (default: TRACE_SAMPLE_RATE)",
+    )
+    run_parser.add_argument(
+        "--capture",
+        action="store_true",
+        help="Record the workload under LOG_DIR/captures for 'replay' (or CAPTURE_WORKLOADS)",
+    )
+    run_parser.add_argument(
+        "--negative-cache",
+        action="store_true",
+        help="Answer names that failed before from the negative cache (or NEGATIVE_CACHE)",
+    )
+    run_parser.add_argument(
+        "--persist",
+        action="store_true",
+        help="Write examples and results to the SQLite store and time segments in DATA_DIR",
+    )
 
     # Example: 'info' command
     subparsers.add_parser("info", help="Show application info")
 
+    # 'build-site' command
+    site_parser = subparsers.add_parser("build-site", help="Build the static preview site")
+    site_parser.add_argument(
+        "--source",
+        type=Path,
+        default=None,
+        help="Directory of JSON/YAML data files (default: DATA_DIR)",
+    )
+    site_parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("site"),
+        help="Output directory (default: site)",
+    )
+    site_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for rendering (default: CPU count)",
+    )
+    site_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the build cache and rebuild every page",
+    )
+    site_parser.add_argument(
+        "--asset-url",
+        type=str,
+        default="assets/",
+        help="URL prefix for content-addressed assets, relative to pages (default: assets/)",
+    )
+    site_parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Also write pre-compressed .gz/.br siblings for text files",
+    )
+
+    # 'preview-site' command
+    preview_parser = subparsers.add_parser("preview-site", help="Serve the built site locally")
+    preview_parser.add_argument(
+        "--directory",
+        type=Path,
+        default=Path("site"),
+        help="Site directory to serve (default: site)",
+    )
+    preview_parser.add_argument(
+        "--host",
+        type=str,
+        default=None,
+        help="Interface to bind (default: API_HOST)",
+    )
+    preview_parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Port to bind (default: API_PORT)",
+    )
+
+    # 'replay' command
+    replay_parser = subparsers.add_parser(
+        "replay", help="Replay a captured run workload and report latency"
+    )
+    replay_parser.add_argument("capture", type=Path, help="Capture file written by 'run --capture'")
+    replay_parser.add_argument(
+        "--target",
+        choices=sorted(TARGETS),
+        default="inprocess",
+        help="Replay in this process or through 'my-project run' subprocesses (default: inprocess)",
+    )
+    replay_parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Pace relative to the recording; 0 replays as fast as possible (default: 1.0)",
+    )
+    replay_parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=4,
+        help="Items or recorded chunks in flight at once (default: 4)",
+    )
+
+    # 'negative-cache' command
+    cache_parser = subparsers.add_parser(
+        "negative-cache", help="Show the negative cache of failed names"
+    )
+    cache_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Expire old failures and rebuild the bloom filter first",
+    )
+    cache_parser.add_argument(
+        "--forget", nargs="+", default=[], metavar="NAME", help="Remove names from the cache"
+    )
+
+    # 'compact-segments' command
+    subparsers.add_parser(
+        "compact-segments",
+        help="Sort and index closed time segments and expire old ones",
+    )
+
+    # 'rebalance-shards' command
+    rebalance_parser = subparsers.add_parser(
+        "rebalance-shards", help="Move examples onto a new number of shards"
+    )
+    rebalance_parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help="New shard count (default: SHARD_COUNT)",
+    )
+
+    # 'compact-shards' command
+    subparsers.add_parser("compact-shards", help="Compact every shard database in parallel")
+
     return parser
 
 
@@ -55,7 +249,52 @@ def cmd_run(args: argparse.Namespace) -> int:
     if args.debug:
         print(f"Debug mode enabled. Settings: {settings}")
 
-    result = process_example(args.name)
+    capture = getattr(args, "capture", False) or settings.capture_workloads
+    recorder = WorkloadRecorder.create(settings) if capture else None
+    use_cache = getattr(args, "negative_cache", False) or settings.negative_cache
+    cache = NegativeCache.from_settings(settings) if use_cache else None
+    rate = getattr(args, "trace", None)
+    rate = settings.trace_sample_rate if rate is None else rate
+    tracer = start_tracing(Tracer.create(settings, rate)) if rate > 0 else None
+    try:
+        with span("cmd_run"):
+            return _run(args, settings, recorder, cache)
+    finally:
+        if tracer is not None:
+            stop_tracing()
+            path = tracer.export()
+            print(
+                f"Traced {tracer.sampled}/{tracer.roots} roots ({tracer.events} spans) to {path}",
+                file=sys.stderr,
+            )
+        if recorder is not None:
+            recorder.close()
+            print(f"Captured {recorder.records} items to {recorder.path}", file=sys.stderr)
+        if cache is not None:
+            cache.close()
+            print(cache.stats.format(), file=sys.stderr)
+
+
+def _run(
+    args: argparse.Namespace,
+    settings: Settings,
+    recorder: WorkloadRecorder | None,
+    cache: NegativeCache | None,
+) -> int:
+    """Run one name, or stream --input, and report the outcome."""
+    if getattr(args, "input", None) is not None:
+        return _stream(args, settings, recorder, cache)
+
+    started = time.perf_counter()
+    if getattr(args, "persist", False):
+        result = process_example(args.name, settings=settings, persist=True, negative_cache=cache)
+    elif cache is not None:
+        result = process_example(args.name, negative_cache=cache)
+    else:
+        result = process_example(args.name)
+    if recorder is not None:
+        recorder.record(args.name, started, time.perf_counter() - started, result.success)
+
     if result.success:
         print(f"Success: {result.message}")
         return 0
@@ -64,6 +303,50 @@ def cmd_run(args: argparse.Namespace) -> int:
         return 1
 
 
+def _stream(
+    args: argparse.Namespace,
+    settings: Settings,
+    recorder: WorkloadRecorder | None = None,
+    cache: NegativeCache | None = None,
+) -> int:
+    """Stream names from --input to --output with bounded memory."""
+    try:
+        with ExitStack() as stack:
+            source = (
+                sys.stdin
+                if args.input == "-"
+                else stack.enter_context(Path(args.input).open(encoding="utf-8"))
+            )
+            sink = (
+                sys.stdout
+                if args.output == "-"
+                else stack.enter_context(Path(args.output).open("w", encoding="utf-8"))
+            )
+            pipeline = (
+                persistent_pipeline(
+                    stack.enter_context(open_repository(settings)),
+                    segments=SegmentStore.from_settings(settings),
+                )
+                if getattr(args, "persist", False)
+                else None
+            )
+            if cache is not None:
+                pipeline = negative_cache_pipeline(cache, pipeline)
+            report = stream_run(
+                source, sink, pipeline, settings=settings, workers=args.workers, recorder=recorder
+            )
+    except (MemoryLimitError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(
+        f"Processed {report.items} items ({report.failed} failed) in {report.seconds:.2f}s; "
+        f"peak RSS {report.peak_rss_mb:.1f} MiB, peak queued {report.peak_queued}",
+        file=sys.stderr,
+    )
+    return 0 if report.failed == 0 else 1
+
+
 def cmd_info(_args: argparse.Namespace) -> int:
     """Handle the 'info' command."""
     settings = get_settings()
@@ -71,6 +354,116 @@ def cmd_info(_args: argparse.Namespace) -> int:
     print(f"Version: {__version__}")
     print(f"Environment: {settings.app_env}")
     print(f"Debug: {settings.debug}")
+    print(f"Free-threaded: {free_threaded()}")
+    return 0
+
+
+def cmd_build_site(args: argparse.Namespace) -> int:
+    """Handle the 'build-site' command."""
+    source = args.source if args.source is not None else get_settings().data_dir
+    try:
+        report = build_site(
+            source, args.output, jobs=args.jobs, force=args.force, asset_url=args.asset_url
+        )
+    except SiteBuildError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(
+        f"Site built in {args.output}/: {len(report.written)} written, "
+        f"{len(report.unchanged)} unchanged, {len(report.skipped)} skipped, "
+        f"{len(report.removed)} removed, {len(report.assets_written)} new assets"
+    )
+
+    if args.compress:
+        weight = compress_site(args.output, jobs=args.jobs)
+        print(
+            f"Compressed {len(weight.compressed)} files ({len(weight.skipped)} up to date): "
+            f"{weight.raw_bytes} bytes raw, {weight.gzip_bytes} gzip, {weight.brotli_bytes} brotli"
+        )
+    return 0
+
+
+def cmd_preview_site(args: argparse.Namespace) -> int:
+    """Handle the 'preview-site' command."""
+    if not args.directory.is_dir():
+        print(f"Error: {args.directory} does not exist; run build-site first", file=sys.stderr)
+        return 1
+
+    settings = get_settings()
+    host = args.host if args.host is not None else settings.api_host
+    port = args.port if args.port is not None else settings.api_port
+    server = create_server(args.directory, host, port)
+    print(f"Serving {args.directory}/ at http://{host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def cmd_replay(args: argparse.Namespace) -> int:
+    """Handle the 'replay' command."""
+    try:
+        report = replay(args.capture, target=args.target, speed=args.speed, workers=args.workers)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(report.format())
+    return 0
+
+
+def cmd_negative_cache(args: argparse.Namespace) -> int:
+    """Handle the 'negative-cache' command."""
+    with NegativeCache.from_settings() as cache:
+        if args.forget:
+            print(f"Forgot {cache.forget(args.forget)} names")
+        if args.rebuild:
+            cache.rebuild()
+        bloom = cache.bloom
+        print(f"Cached failures: {len(cache)}")
+        print(
+            f"Bloom filter:    {bloom.bits // 8:,} bytes, {bloom.hashes} hashes, "
+            f"{bloom.count}/{bloom.capacity} names (target FP rate {cache.fp_rate:.2%})"
+        )
+    return 0
+
+
+def cmd_compact_segments(_args: argparse.Namespace) -> int:
+    """Handle the 'compact-segments' command."""
+    report = SegmentStore.from_settings().compact()
+    print(
+        f"Compacted {len(report.compacted)} segments ({report.records} records, "
+        f"{report.duplicates} superseded dropped); expired {len(report.expired)}"
+    )
+    return 0
+
+
+def cmd_rebalance_shards(args: argparse.Namespace) -> int:
+    """Handle the 'rebalance-shards' command."""
+    settings = get_settings()
+    shards = args.shards if args.shards is not None else settings.shard_count
+    if shards < 1:
+        print("Error: --shards must be at least 1", file=sys.stderr)
+        return 1
+
+    with ShardedStore.from_settings(settings) as store:
+        report = store.rebalance(shards)
+    print(
+        f"Rebalanced {report.previous} -> {report.shards} shards in {report.seconds:.2f}s: "
+        f"{report.examples_moved} examples and {report.results_moved} results moved"
+    )
+    return 0
+
+
+def cmd_compact_shards(_args: argparse.Namespace) -> int:
+    """Handle the 'compact-shards' command."""
+    with ShardedStore.from_settings() as store:
+        compacted = store.compact()
+    print(f"Compacted {compacted} shards")
     return 0
 
 
@@ -86,6 +479,13 @@ def main() -> int:
     commands = {
         "run": cmd_run,
         "info": cmd_info,
+        "build-site": cmd_build_site,
+        "preview-site": cmd_preview_site,
+        "replay": cmd_replay,
+        "negative-cache": cmd_negative_cache,
+        "compact-segments": cmd_compact_segments,
+        "rebalance-shards": cmd_rebalance_shards,
+        "compact-shards": cmd_compact_shards,
     }
 
     handler = commands.get(args.command)
@@ -6,10 +6,11 @@ Uses Pydantic Settings for environment-based configuration with validation.
 
 from __future__ import annotations
 
-from functools import lru_cache
+from functools import cache, lru_cache
 from pathlib import Path
+from typing import Annotated, Any, Literal
 
-from pydantic import Field
+from pydantic import Field, TypeAdapter, ValidationError, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -19,6 +20,10 @@ class Settings(BaseSettings):
 
     Environment variables can be set directly or via a .env file.
     All settings have sensible defaults for local development.
+
+    Settings are frozen: an instance is an immutable snapshot that can be
+    shared between threads without locks. Use ``with_overrides`` to derive
+    a per-request or per-tenant snapshot.
     """
 
     model_config = SettingsConfigDict(
@@ -26,6 +31,7 @@ class Settings(BaseSettings):
         env_file_encoding="utf-8",
         case_sensitive=False,
         extra="ignore",
+        frozen=True,
     )
 
     # Application settings
@@ -43,12 +49,129 @@ class Settings(BaseSettings):
     api_host: str = Field(default="0.0.0.0", description="API host")
     api_port: int = Field(default=8000, description="API port")
 
+    # SQLite repository settings
+    sqlite_filename: str = Field(
+        default="my_project.sqlite3", description="SQLite database file name under data_dir"
+    )
+    sqlite_batch_size: int = Field(
+        default=1000, ge=1, description="Rows per transaction for bulk upserts"
+    )
+
+    # Workload capture settings
+    capture_workloads: bool = Field(
+        default=False, description="Record every run under log_dir/captures for replay"
+    )
+
+    # Negative cache settings
+    negative_cache: bool = Field(
+        default=False, description="Answer names that failed before from data_dir/negative_cache"
+    )
+    negative_cache_fp_rate: float = Field(
+        default=0.01, gt=0, lt=1, description="Target false-positive rate of the bloom filter"
+    )
+    negative_cache_rebuild_seconds: float | None = Field(
+        default=3600.0, gt=0, description="Rebuild the bloom filter this often (None disables)"
+    )
+    negative_cache_ttl_hours: float | None = Field(
+        default=None, gt=0, description="Retry failed names after this long (None never retries)"
+    )
+
+    # Tracing settings
+    trace_sample_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Fraction of runs traced to log_dir/traces (0: off)"
+    )
+
+    # Batch execution settings
+    batch_backend: Literal["auto", "thread", "process", "serial"] = Field(
+        default="auto", description="Backend for run_batch; auto prefers threads without a GIL"
+    )
+    batch_workers: int | None = Field(
+        default=None, ge=1, description="Workers for run_batch (None uses the CPU count)"
+    )
+
+    # Sharded store settings
+    shard_count: int = Field(default=1, ge=1, description="Shards for a new sharded store")
+    shard_key: str = Field(
+        default="tenant", description="Example metadata entry used to pick a shard"
+    )
+
+    # Time-partitioned segment settings
+    segment_granularity: Literal["hour", "day"] = Field(
+        default="hour", description="Width of each created_at segment"
+    )
+    segment_retention_hours: int | None = Field(
+        default=None, ge=1, description="Expire segments older than this (None keeps all)"
+    )
+
+    # Streaming run settings
+    stream_chunk_size: int = Field(default=500, ge=1, description="Names per streaming chunk")
+    stream_high_watermark: int = Field(
+        default=20_000, ge=1, description="Items resident per stage before producers block"
+    )
+    stream_low_watermark: int = Field(
+        default=10_000, ge=0, description="Items resident per stage before producers resume"
+    )
+    max_rss_mb: int | None = Field(
+        default=None, ge=1, description="RSS ceiling in MiB for streaming runs (None disables)"
+    )
+
+    @model_validator(mode="after")
+    def _check_watermarks(self) -> Settings:
+        self._check_consistency()
+        return self
+
+    def _check_consistency(self) -> None:
+        """Cross-field checks, shared by construction and with_overrides."""
+        if self.stream_low_watermark >= self.stream_high_watermark:
+            raise ValueError("stream_low_watermark must be below stream_high_watermark")
+
+    def with_overrides(self, **overrides: Any) -> Settings:
+        """
+        Return a snapshot with some fields replaced.
+
+        Only the overridden fields are validated; the environment and .env
+        are not read again and unchanged fields are shared with this
+        snapshot, which is left untouched.
+
+        Args:
+            **overrides: Field values to replace, e.g. ``data_dir=Path(...)``
+
+        Returns:
+            New Settings snapshot (this one if there are no overrides)
+
+        Raises:
+            ValueError: If a field name is unknown or a value is invalid
+        """
+        if not overrides:
+            return self
+        fields = type(self).model_fields
+        unknown = sorted(overrides.keys() - fields.keys())
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(unknown)}")
+
+        validated: dict[str, Any] = {}
+        for name, value in overrides.items():
+            try:
+                validated[name] = _field_adapter(type(self), name).validate_python(value)
+            except ValidationError as e:
+                raise ValueError(f"Invalid value for {name}: {e.errors()[0]['msg']}") from None
+        snapshot = self.model_copy(update=validated)
+        snapshot._check_consistency()
+        return snapshot
+
     def ensure_directories(self) -> None:
         """Create necessary directories if they don't exist."""
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
 
+@cache
+def _field_adapter(model: type[BaseSettings], name: str) -> TypeAdapter[Any]:
+    """Validator for a single field, built once per field."""
+    field = model.model_fields[name]
+    return TypeAdapter(Annotated[field.annotation, field])  # type: ignore[valid-type]
+
+
 @lru_cache
 def get_settings() -> Settings:
     """
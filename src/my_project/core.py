@@ -6,9 +6,26 @@ This module contains the main functionality. Add your business logic here.
 
 from __future__ import annotations
 
+import sqlite3
 import uuid
+import warnings
+from functools import cache
+from typing import TYPE_CHECKING, Any
 
+from my_project.config import get_settings
 from my_project.models import Example, Result, Status
+from my_project.negative_cache import KnownFailureError
+from my_project.pipeline import DEFAULT_CHUNK_SIZE, Pipeline, PipelineRun
+from my_project.repository import SQLiteRepository
+from my_project.segments import SegmentStore
+from my_project.sharding import RING_FILE, SHARDS_DIR, ShardedStore
+from my_project.tracing import current_tracer, span
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from my_project.config import Settings
+    from my_project.negative_cache import NegativeCache
 
 
 def create_example(name: str, metadata: dict[str, str] | None = None) -> Example:
@@ -22,42 +39,257 @@ def create_example(name: str, metadata: dict[str, str] | None = None) -> Example
     Returns:
         New Example instance with generated ID
     """
-    return Example(
-        id=str(uuid.uuid4()),
-        name=name,
-        status=Status.PENDING,
-        metadata=metadata or {},
+    with span("create_example"):
+        # uuid4 draws from os.urandom and keeps no shared state, so it is safe
+        # to call from many threads at once, with or without the GIL.
+        example_id = str(uuid.uuid4())
+        with span("Example"):
+            return Example(
+                id=example_id,
+                name=name,
+                status=Status.PENDING,
+                metadata=metadata or {},
+            )
+
+
+def _create_stage(name: str) -> Example:
+    # Looked up at call time so create_example can be patched in tests.
+    return create_example(name)
+
+
+def _complete_stage(example: Example) -> Example:
+    example.status = Status.COMPLETED
+    return example
+
+
+def _result_stage(example: Example) -> Result:
+    return Result(
+        success=True,
+        message=f"Successfully processed '{example.name}'",
+        data={"id": example.id, "name": example.name},
     )
 
 
-def process_example(name: str) -> Result:
+def _error_result(_name: str, exc: Exception) -> Result:
+    return Result(
+        success=False,
+        message="Processing failed",
+        error=str(exc),
+    )
+
+
+def default_pipeline() -> Pipeline:
+    """
+    Build the standard processing pipeline.
+
+    Stages are ``create`` -> ``complete`` -> ``result``; all are pure and
+    fuse into a single pass per item. Failures become error Results.
+    Returns a fresh pipeline, so callers may add their own stages
+    (e.g. ``add_stage("validate", ..., before="create")``).
+    """
+    return (
+        Pipeline(on_error=_error_result)
+        .add_stage("create", _create_stage)
+        .add_stage("complete", _complete_stage)
+        .add_stage("result", _result_stage)
+    )
+
+
+@cache
+def _shared_pipeline() -> Pipeline:
+    pipeline = default_pipeline()
+    # Compile up front so concurrent runs only ever read the shared pipeline.
+    pipeline.compile()
+    return pipeline
+
+
+def _passthrough(write: Callable[[list[Any]], object]) -> Callable[[list[Any]], list[Any]]:
+    def stage(items: list[Any]) -> list[Any]:
+        write(items)
+        return items
+
+    return stage
+
+
+def persistent_pipeline(
+    repository: SQLiteRepository | ShardedStore | None,
+    pipeline: Pipeline | None = None,
+    *,
+    segments: SegmentStore | None = None,
+) -> Pipeline:
+    """
+    Return a copy of a pipeline that writes through to persistent stores.
+
+    Adds batch ``persist_examples``/``persist_segments`` stages before
+    ``result`` (or at the end if there is none) and, with a repository, a
+    batch ``persist_results`` stage at the end, so each chunk is written
+    with one bulk write per store.
+
+    Args:
+        repository: SQLite repository or sharded store for examples and results, if any
+        pipeline: Pipeline to extend (default: default_pipeline())
+        segments: Time-partitioned segment store for examples, if any
+    """
+    pipeline = (pipeline or default_pipeline()).copy()
+    anchor = "result" if any(stage.name == "result" for stage in pipeline.stages) else None
+    if repository is not None:
+        pipeline.add_stage(
+            "persist_examples",
+            _passthrough(repository.upsert_examples),
+            batch=True,
+            pure=False,
+            before=anchor,
+        )
+    if segments is not None:
+        pipeline.add_stage(
+            "persist_segments", _passthrough(segments.append), batch=True, pure=False, before=anchor
+        )
+    if repository is not None:
+        pipeline.add_stage(
+            "persist_results", _passthrough(repository.upsert_results), batch=True, pure=False
+        )
+    return pipeline
+
+
+_NOT_CACHED = (KnownFailureError, OSError, sqlite3.Error)
+
+
+def negative_cache_pipeline(cache: NegativeCache, pipeline: Pipeline | None = None) -> Pipeline:
+    """
+    Return a copy of a pipeline that short-circuits names known to fail.
+
+    Adds a ``negative_cache`` stage in front of every other stage. Names the
+    cache knows fail there with their cached error, so they get the same
+    error Result as before without running the rest of the pipeline. Other
+    failures are recorded in the cache, except environmental ones (OSError,
+    sqlite3.Error) that say nothing about the name itself.
+
+    Args:
+        cache: Negative cache to consult and record failures in
+        pipeline: Pipeline to extend (default: default_pipeline())
+    """
+    pipeline = (pipeline or default_pipeline()).copy()
+    first = pipeline.stages[0].name if pipeline.stages else None
+    pipeline.add_stage("negative_cache", cache.check, before=first)
+    on_error = pipeline.on_error
+
+    def record_failure(item: Any, exc: Exception) -> Any:
+        if isinstance(item, str) and not isinstance(exc, _NOT_CACHED):
+            cache.record(item, str(exc))
+        return on_error(item, exc)
+
+    pipeline.on_error = record_failure
+    return pipeline
+
+
+def open_repository(settings: Settings | None = None) -> SQLiteRepository | ShardedStore:
+    """
+    Open the configured example store under a settings snapshot's data_dir.
+
+    A new sharded store imports the unsharded database, and an existing one
+    stays in use even if ``shard_count`` drops back to 1, so switching never
+    hides stored rows. A ``shard_count`` that differs from the count the
+    sharded store records only takes effect through ``rebalance-shards``;
+    it is reported with a warning.
+
+    Returns:
+        ShardedStore when ``shard_count > 1`` or a sharded store already
+        exists, otherwise SQLiteRepository
+    """
+    settings = settings or get_settings()
+    if settings.shard_count == 1 and not (settings.data_dir / SHARDS_DIR / RING_FILE).exists():
+        return SQLiteRepository.from_settings(settings)
+    store = ShardedStore.from_settings(settings)
+    if store.shard_count != settings.shard_count:
+        warnings.warn(
+            f"SHARD_COUNT={settings.shard_count} is ignored: the store at {store.root} has "
+            f"{store.shard_count} shards; run 'my-project rebalance-shards' to change it",
+            stacklevel=2,
+        )
+    return store
+
+
+def process_batch(
+    names: Iterable[str],
+    pipeline: Pipeline | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    repository: SQLiteRepository | None = None,
+    *,
+    settings: Settings | None = None,
+    persist: bool = False,
+    negative_cache: NegativeCache | None = None,
+) -> PipelineRun:
+    """
+    Process many names through a pipeline.
+
+    Args:
+        names: Names to process
+        pipeline: Pipeline to run (default: default_pipeline())
+        chunk_size: Items per chunk handed to batch stages
+        repository: Write examples and results through to this repository
+        settings: Settings snapshot used when persisting (default: get_settings())
+        persist: Open the SQLite store (sharded when ``shard_count > 1``) and
+            time segments under the snapshot's data_dir for this call and
+            write through to both
+        negative_cache: Short-circuit names known to fail and record new failures
+
+    Returns:
+        PipelineRun with one Result per name, in order, and a timing report
+    """
+    with span("process_batch"):
+        if negative_cache is not None:
+            pipeline = negative_cache_pipeline(negative_cache, pipeline)
+        if persist:
+            settings = settings or get_settings()
+            with open_repository(settings) as opened:
+                pipeline = persistent_pipeline(
+                    opened, pipeline, segments=SegmentStore.from_settings(settings)
+                )
+                return pipeline.run(names, chunk_size=chunk_size)
+        if repository is not None:
+            pipeline = persistent_pipeline(repository, pipeline)
+        return (pipeline or _shared_pipeline()).run(names, chunk_size=chunk_size)
+
+
+def process_example(
+    name: str,
+    pipeline: Pipeline | None = None,
+    repository: SQLiteRepository | None = None,
+    *,
+    settings: Settings | None = None,
+    persist: bool = False,
+    negative_cache: NegativeCache | None = None,
+) -> Result:
     """
     Process an example item.
 
-    This is a placeholder function demonstrating the pattern for
-    business logic that returns a Result.
+    Runs the name through the default pipeline (create, mark completed,
+    build result) or the given one.
 
     Args:
         name: Name to process
+        pipeline: Pipeline to run (default: default_pipeline())
+        repository: Write the example and result through to this repository
+        settings: Settings snapshot used when persisting (default: get_settings())
+        persist: Write through to the stores under the snapshot's data_dir
+        negative_cache: Short-circuit the name if it is known to fail
 
     Returns:
         Result indicating success or failure
     """
-    try:
-        example = create_example(name)
-        example.status = Status.COMPLETED
-
-        return Result(
-            success=True,
-            message=f"Successfully processed '{name}'",
-            data={"id": example.id, "name": example.name},
-        )
-    except Exception as e:
-        return Result(
-            success=False,
-            message="Processing failed",
-            error=str(e),
-        )
+    traced = current_tracer() is not None
+    with span("process_example", name=name):
+        # Untraced plain runs skip process_batch; the traced path keeps its spans.
+        if repository is None and not persist and negative_cache is None and not traced:
+            return (pipeline or _shared_pipeline()).run_one(name)
+        return process_batch(
+            [name],
+            pipeline=pipeline,
+            repository=repository,
+            settings=settings,
+            persist=persist,
+            negative_cache=negative_cache,
+        ).outputs[0]
 
 
 def validate_input(value: str, max_length: int = 100) -> tuple[bool, str | None]:
@@ -3,15 +3,28 @@ Data models for the application.
 
 This module contains Pydantic models that define the core data structures.
 Add your domain models here.
+
+Models defer building their validators until first use, so importing this
+module stays cheap for commands that never touch them. Batch paths go
+through shared ``TypeAdapter``s for ``list[Example]`` and ``list[Result]``,
+which validate or serialize a whole list in one call into pydantic-core
+instead of one call per item. Validators live in process memory and cannot
+be saved to disk, so ``warm_models`` builds everything once in a parent
+process; worker processes forked after that inherit the built validators
+instead of rebuilding them.
 """
 
 from __future__ import annotations
 
 from datetime import datetime
 from enum import StrEnum
-from typing import Any
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
-from pydantic import BaseModel, Field
+if TYPE_CHECKING:
+    from collections.abc import Iterable
 
 
 class Status(StrEnum):
@@ -36,17 +49,63 @@ class Example(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now, description="Creation timestamp")
     metadata: dict[str, str] = Field(default_factory=dict, description="Additional metadata")
 
-    class Config:
-        """Pydantic model configuration."""
-
-        frozen = False
-        str_strip_whitespace = True
+    model_config = ConfigDict(frozen=False, str_strip_whitespace=True, defer_build=True)
 
 
 class Result(BaseModel):
     """Generic result wrapper for operations."""
 
+    model_config = ConfigDict(defer_build=True)
+
     success: bool
     message: str
     data: dict[str, Any] | None = None
     error: str | None = None
+
+
+@cache
+def example_list_adapter() -> TypeAdapter[list[Example]]:
+    """Shared validator and serializer for ``list[Example]``."""
+    return TypeAdapter(list[Example])
+
+
+@cache
+def result_list_adapter() -> TypeAdapter[list[Result]]:
+    """Shared validator and serializer for ``list[Result]``."""
+    return TypeAdapter(list[Result])
+
+
+def warm_models() -> None:
+    """Build every model validator and list adapter now instead of on first use."""
+    for model in (Example, Result):
+        if not model.__pydantic_complete__:
+            model.model_rebuild(force=True)
+    example_list_adapter()
+    result_list_adapter()
+
+
+def validate_examples(items: Iterable[Any]) -> list[Example]:
+    """Validate dicts (or Examples) into Examples in one call."""
+    return example_list_adapter().validate_python(list(items))
+
+
+def validate_results(items: Iterable[Any]) -> list[Result]:
+    """Validate dicts (or Results) into Results in one call."""
+    return result_list_adapter().validate_python(list(items))
+
+
+def validate_examples_jsonl(lines: Iterable[bytes]) -> list[Example]:
+    """Validate JSON lines, one Example per non-blank line, in one call."""
+    return example_list_adapter().validate_json(
+        b"[" + b",".join(line for line in lines if line.strip()) + b"]"
+    )
+
+
+def dump_examples_json(examples: list[Example]) -> bytes:
+    """Serialize Examples to a JSON array in one call."""
+    return example_list_adapter().dump_json(examples)
+
+
+def dump_results_json(results: list[Result]) -> bytes:
+    """Serialize Results to a JSON array in one call."""
+    return result_list_adapter().dump_json(results)
@@ -0,0 +1,392 @@
+"""
+Negative cache for names that are known to fail.
+
+NegativeCache remembers the error of every name that failed processing, so a
+name that fails again is answered with the same error Result without running
+the pipeline. Entries live in a small SQLite table under
+``data_dir/negative_cache``. A bloom filter over the cached names sits in
+front of the table: a name the filter has never seen is definitely not
+cached and skips the table lookup. Only names the filter reports as present
+(cached ones plus false positives at ``fp_rate``) are looked up.
+
+The filter is persisted alongside the table as ``bloom.bin``. Bloom filters
+cannot remove names, and they lose accuracy once they hold more names than
+they were sized for, so the cache rebuilds the filter from the table
+periodically (every ``rebuild_seconds``) and whenever the table outgrows it.
+A rebuild first drops entries older than ``ttl_hours``, if set, so a name
+that has since been fixed gets another chance.
+
+New failures are buffered and written in batches. They are added to the
+filter straight away, and the buffer is checked before the table, so a
+failure is cached for later lookups as soon as it is recorded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import sqlite3
+import struct
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, Field
+
+from my_project.config import get_settings
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from my_project.config import Settings
+
+NEGATIVE_CACHE_DIR = "negative_cache"
+FAILURES_FILENAME = "failures.sqlite3"
+BLOOM_FILENAME = "bloom.bin"
+
+# Smallest number of names a rebuilt filter is sized for.
+_MIN_CAPACITY = 1024
+
+_BLOOM_MAGIC = b"MPBF"
+# Magic, hash count, capacity, names added, size in bits.
+_BLOOM_HEADER = struct.Struct("<4sBQQQ")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS failures (
+    name TEXT PRIMARY KEY,
+    error TEXT NOT NULL,
+    failures INTEGER NOT NULL DEFAULT 1,
+    last_failed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_failures_last_failed ON failures (last_failed);
+"""
+
+_UPSERT_FAILURE = """
+INSERT INTO failures (name, error, failures, last_failed)
+VALUES (?, ?, 1, ?)
+ON CONFLICT (name) DO UPDATE SET
+    error = excluded.error,
+    failures = failures + 1,
+    last_failed = excluded.last_failed
+"""
+
+
+class KnownFailureError(Exception):
+    """Raised for a name whose earlier failure is in the negative cache."""
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over strings.
+
+    Args:
+        capacity: Names the filter is sized for
+        fp_rate: Target false-positive rate at capacity
+    """
+
+    def __init__(self, capacity: int, fp_rate: float = 0.01) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1")
+        bits = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+        self.capacity = capacity
+        self.bits = max(8, bits)
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.count = 0
+        self._array = bytearray(-(-self.bits // 8))
+
+    def _positions(self, name: str) -> list[int]:
+        # Double hashing: k positions from two independent 64-bit halves.
+        digest = hashlib.blake2b(name.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, name: str) -> None:
+        """Add a name."""
+        for pos in self._positions(name):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        array = self._array
+        return all(array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(name))
+
+    @property
+    def saturated(self) -> bool:
+        """Whether more names were added than the filter was sized for."""
+        return self.count > self.capacity
+
+    def to_bytes(self) -> bytes:
+        """Serialize the filter."""
+        header = _BLOOM_HEADER.pack(_BLOOM_MAGIC, self.hashes, self.capacity, self.count, self.bits)
+        return header + bytes(self._array)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> BloomFilter:
+        """
+        Load a filter written by to_bytes.
+
+        Raises:
+            ValueError: If the data is not a serialized filter
+        """
+        try:
+            magic, hashes, capacity, count, bits = _BLOOM_HEADER.unpack_from(data)
+        except struct.error as e:
+            raise ValueError("Truncated bloom filter") from e
+        body = data[_BLOOM_HEADER.size :]
+        if magic != _BLOOM_MAGIC or len(body) != -(-bits // 8):
+            raise ValueError("Not a bloom filter")
+        bloom = cls.__new__(cls)
+        bloom.capacity = capacity
+        bloom.bits = bits
+        bloom.hashes = hashes
+        bloom.count = count
+        bloom._array = bytearray(body)
+        return bloom
+
+
+class NegativeCacheStats(BaseModel):
+    """Lookup counters for a negative cache since it was opened."""
+
+    lookups: int = Field(default=0, description="Names checked")
+    filtered: int = Field(default=0, description="Names the bloom filter ruled out")
+    hits: int = Field(default=0, description="Names answered from the cache")
+    false_positives: int = Field(default=0, description="Filter matches not in the cache")
+    recorded: int = Field(default=0, description="New failures recorded")
+    rebuilds: int = Field(default=0, description="Times the filter was rebuilt")
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Observed fraction of uncached names the filter let through."""
+        misses = self.filtered + self.false_positives
+        return self.false_positives / misses if misses else 0.0
+
+    def format(self) -> str:
+        """Render the counters as one line."""
+        return (
+            f"Negative cache: {self.hits}/{self.lookups} hits ({self.hit_rate:.1%}), "
+            f"{self.filtered} filtered, {self.false_positives} false positives "
+            f"({self.false_positive_rate:.2%}), {self.recorded} recorded, "
+            f"{self.rebuilds} rebuilds"
+        )
+
+
+class NegativeCache:
+    """
+    Cache of failed names with a persisted bloom-filter prefilter.
+
+    Thread-safe; one instance may serve every worker in a process.
+
+    Args:
+        root: Directory for the failure table and filter; created if missing
+        fp_rate: Target false-positive rate of the filter
+        rebuild_seconds: Rebuild the filter at the first recorded failure
+            this long after the last build (None: only when it is saturated
+            or on demand)
+        ttl_hours: Forget failures older than this at the next rebuild
+            (None keeps them)
+        batch_size: New failures buffered before they are written
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        fp_rate: float = 0.01,
+        rebuild_seconds: float | None = 3600.0,
+        ttl_hours: float | None = None,
+        batch_size: int = 1000,
+    ) -> None:
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        root.mkdir(parents=True, exist_ok=True)
+        self.root = root
+        self.fp_rate = fp_rate
+        self.rebuild_seconds = rebuild_seconds
+        self.ttl_hours = ttl_hours
+        self.batch_size = batch_size
+        self.stats = NegativeCacheStats()
+        self._lock = threading.Lock()
+        self._pending: dict[str, str] = {}
+        # Used from every worker thread, always under _lock.
+        self._conn = sqlite3.connect(
+            root / FAILURES_FILENAME, timeout=30.0, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._bloom = self._load_bloom()
+        self._built_at = time.monotonic()
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> NegativeCache:
+        """Open the cache at ``data_dir / negative_cache``."""
+        settings = settings or get_settings()
+        return cls(
+            settings.data_dir / NEGATIVE_CACHE_DIR,
+            fp_rate=settings.negative_cache_fp_rate,
+            rebuild_seconds=settings.negative_cache_rebuild_seconds,
+            ttl_hours=settings.negative_cache_ttl_hours,
+            batch_size=settings.sqlite_batch_size,
+        )
+
+    @property
+    def bloom(self) -> BloomFilter:
+        """The current prefilter."""
+        return self._bloom
+
+    def _load_bloom(self) -> BloomFilter:
+        try:
+            bloom = BloomFilter.from_bytes((self.root / BLOOM_FILENAME).read_bytes())
+        except (OSError, ValueError):
+            return self._build()
+        if bloom.count < self._count() or bloom.saturated:
+            # Written before failures recorded by another process, or outgrown.
+            return self._build()
+        return bloom
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM failures").fetchone()[0]
+
+    def _build(self) -> BloomFilter:
+        """Drop expired rows and write a filter sized for the rest."""
+        if self.ttl_hours is not None:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM failures WHERE last_failed < ?",
+                    (time.time() - self.ttl_hours * 3600,),
+                )
+        count = self._count()
+        bloom = BloomFilter(max(_MIN_CAPACITY, 2 * count), self.fp_rate)
+        for (name,) in self._conn.execute("SELECT name FROM failures"):
+            bloom.add(name)
+        self._save(bloom)
+        return bloom
+
+    def _save(self, bloom: BloomFilter) -> None:
+        path = self.root / BLOOM_FILENAME
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(bloom.to_bytes())
+        tmp.replace(path)
+
+    def rebuild(self) -> BloomFilter:
+        """Flush pending failures, expire old ones and rebuild the filter."""
+        with self._lock:
+            self._rebuild()
+            return self._bloom
+
+    def _rebuild(self) -> None:
+        self._flush()
+        self._bloom = self._build()
+        self._built_at = time.monotonic()
+        self.stats.rebuilds += 1
+
+    def lookup(self, name: str) -> str | None:
+        """
+        Return the cached error for a name, or None if it is not known to fail.
+
+        Names the filter rules out return without touching the table.
+        """
+        with self._lock:
+            self.stats.lookups += 1
+            if name not in self._bloom:
+                self.stats.filtered += 1
+                return None
+            error = self._pending.get(name)
+            if error is None:
+                row = self._conn.execute(
+                    "SELECT error FROM failures WHERE name = ?", (name,)
+                ).fetchone()
+                error = row[0] if row is not None else None
+            if error is None:
+                self.stats.false_positives += 1
+            else:
+                self.stats.hits += 1
+            return error
+
+    def check(self, name: str) -> str:
+        """
+        Pipeline stage: pass a name through unless it is known to fail.
+
+        Raises:
+            KnownFailureError: With the cached error, for a known failure
+        """
+        error = self.lookup(name)
+        if error is not None:
+            raise KnownFailureError(error)
+        return name
+
+    def record(self, name: str, error: str) -> None:
+        """Remember that a name failed with an error."""
+        with self._lock:
+            self._pending[name] = error
+            self._bloom.add(name)
+            self.stats.recorded += 1
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+            if self._bloom.saturated or (
+                self.rebuild_seconds is not None
+                and time.monotonic() - self._built_at >= self.rebuild_seconds
+            ):
+                self._rebuild()
+
+    def forget(self, names: list[str]) -> int:
+        """
+        Remove names from the cache, e.g. once their input has been fixed.
+
+        The filter keeps matching them until the next rebuild, which only
+        costs a table lookup.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            self._flush()
+            with self._conn:
+                cursor = self._conn.executemany(
+                    "DELETE FROM failures WHERE name = ?", ((n,) for n in names)
+                )
+            return cursor.rowcount
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                _UPSERT_FAILURE, ((name, error, now) for name, error in self._pending.items())
+            )
+        self._pending.clear()
+
+    def flush(self) -> None:
+        """Write buffered failures to the table."""
+        with self._lock:
+            self._flush()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._flush()
+            return self._count()
+
+    def close(self) -> None:
+        """Flush buffered failures, persist the filter and close the table."""
+        with self._lock:
+            self._flush()
+            self._save(self._bloom)
+            self._conn.close()
+
+    def __enter__(self) -> NegativeCache:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
@@ -0,0 +1,587 @@
+"""
+Static site builder for the GitHub Pages preview.
+
+Renders HTML pages from project data files (example listings and result
+reports) into a site directory. Builds are incremental: every page records
+a content hash of its inputs in a build cache, pages whose inputs are
+unchanged are skipped, and output files are only rewritten when their
+bytes actually change.
+
+Static assets (the built-in stylesheet plus anything under ``<source>/assets``)
+are content-addressed: each is written once to ``assets/<hash>/<name>`` and
+listed in ``manifest.json``. Because the path only changes when the bytes do,
+PR previews and the main deploy can share one ``/assets`` directory on
+gh-pages instead of each carrying their own copy.
+
+``compress_site`` optionally writes pre-compressed ``.gz`` (and, when the
+optional ``brotli`` package is installed, ``.br``) siblings for text files
+so the local preview server can serve them without compressing per request.
+
+Data files live in the source directory as JSON or YAML documents::
+
+    title: Nightly results
+    examples:
+      - id: ex-1
+        name: First example
+    results:
+      - success: true
+        message: All good
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import html
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import yaml
+from pydantic import BaseModel, Field, ValidationError
+
+from my_project.models import validate_examples, validate_results, warm_models
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from my_project.models import Example, Result
+
+BUILD_CACHE_NAME = ".build-cache.json"
+DATA_SUFFIXES = (".json", ".yaml", ".yml")
+INDEX_PAGE = "index.html"
+ASSETS_DIR = "assets"
+MANIFEST_NAME = "manifest.json"
+STYLESHEET = "style.css"
+
+# Bump when rendering changes so every cached page is rebuilt.
+BUILDER_VERSION = "2"
+
+# Length of the content hash used in asset paths.
+ASSET_HASH_LENGTH = 16
+
+# Files worth pre-compressing; binary formats are already compressed.
+COMPRESSIBLE_SUFFIXES = frozenset(
+    {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml", ".map", ".csv"}
+)
+# Smaller files rarely shrink enough to pay for Content-Encoding.
+MIN_COMPRESS_SIZE = 256
+
+_STYLE = (
+    "body{font-family:system-ui,sans-serif;margin:2rem auto;max-width:60rem;padding:0 1rem}"
+    "table{border-collapse:collapse;width:100%;margin-bottom:2rem}"
+    "th,td{border:1px solid #ccc;padding:.25rem .5rem;text-align:left}"
+    ".ok{color:#1a7f37}.fail{color:#cf222e}\n"
+)
+
+
+class SiteBuildError(Exception):
+    """Raised when a data file cannot be loaded or rendered."""
+
+
+class BuildReport(BaseModel):
+    """Summary of a site build."""
+
+    written: list[str] = Field(default_factory=list, description="Pages rendered and written")
+    unchanged: list[str] = Field(
+        default_factory=list, description="Pages rendered with identical output"
+    )
+    skipped: list[str] = Field(default_factory=list, description="Pages with unchanged inputs")
+    removed: list[str] = Field(default_factory=list, description="Pages whose source is gone")
+    assets: dict[str, str] = Field(
+        default_factory=dict, description="Asset name to content-addressed path"
+    )
+    assets_written: list[str] = Field(
+        default_factory=list, description="Asset paths not previously in the output"
+    )
+
+
+class CompressReport(BaseModel):
+    """Summary of a compression pass, used to gauge page weight."""
+
+    compressed: list[str] = Field(default_factory=list, description="Files (re)compressed")
+    skipped: list[str] = Field(default_factory=list, description="Files with fresh siblings")
+    raw_bytes: int = Field(default=0, description="Total size of compressible files")
+    gzip_bytes: int = Field(default=0, description="Total size of .gz siblings")
+    brotli_bytes: int = Field(default=0, description="Total size of .br siblings")
+
+
+def hash_bytes(*parts: bytes) -> str:
+    """Return a hex SHA-256 digest over length-prefixed parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def write_if_changed(path: Path, content: bytes) -> bool:
+    """
+    Atomically write content to path unless it already holds those bytes.
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    try:
+        if path.stat().st_size == len(content) and path.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(content)
+    tmp.replace(path)
+    return True
+
+
+def _remove_compressed(path: Path) -> None:
+    """Delete the compressed siblings of path, which no longer match it."""
+    for suffix in (".gz", ".br"):
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def _write_output(path: Path, content: bytes) -> bool:
+    """write_if_changed for site files, dropping compressed siblings it invalidates."""
+    written = write_if_changed(path, content)
+    if written:
+        _remove_compressed(path)
+    return written
+
+
+def asset_path(name: str, content: bytes) -> str:
+    """Return the content-addressed path for an asset, relative to the site root."""
+    return f"{ASSETS_DIR}/{hash_bytes(content)[:ASSET_HASH_LENGTH]}/{name}"
+
+
+def collect_assets(source_dir: Path) -> dict[str, bytes]:
+    """
+    Gather static assets for the site.
+
+    The built-in stylesheet is always included; files under
+    ``<source_dir>/assets`` are added by their POSIX path relative to that
+    directory and may override it.
+
+    Returns:
+        Dict of asset name to file contents
+    """
+    assets = {STYLESHEET: _STYLE.encode()}
+    asset_dir = source_dir / ASSETS_DIR
+    if asset_dir.is_dir():
+        for path in sorted(asset_dir.rglob("*")):
+            if path.is_file():
+                assets[path.relative_to(asset_dir).as_posix()] = path.read_bytes()
+    return assets
+
+
+def publish_assets(assets: dict[str, bytes], output_dir: Path) -> tuple[dict[str, str], list[str]]:
+    """
+    Write assets to their content-addressed paths and prune stale ones.
+
+    Existing asset files are never rewritten since their path implies their
+    contents. Hash directories under ``assets/`` that no longer back any
+    asset are removed from the local output.
+
+    Returns:
+        Tuple of (asset name to path mapping, paths newly written)
+    """
+    mapping: dict[str, str] = {}
+    written: list[str] = []
+    for name, content in assets.items():
+        path = asset_path(name, content)
+        mapping[name] = path
+        target = output_dir / path
+        if not target.exists():
+            write_if_changed(target, content)
+            written.append(path)
+
+    live = {path.split("/")[1] for path in mapping.values()}
+    asset_root = output_dir / ASSETS_DIR
+    for entry in asset_root.iterdir():
+        if entry.is_dir() and entry.name not in live:
+            for child in sorted(entry.rglob("*"), reverse=True):
+                child.rmdir() if child.is_dir() else child.unlink()
+            entry.rmdir()
+    return mapping, written
+
+
+def load_data_file(path: Path) -> dict[str, Any]:
+    """
+    Load and validate a site data file.
+
+    Args:
+        path: JSON or YAML file with optional title, examples and results keys
+
+    Returns:
+        Dict with "title", "examples" (list[Example]) and "results" (list[Result])
+    """
+    try:
+        text = path.read_text(encoding="utf-8")
+        raw = json.loads(text) if path.suffix == ".json" else yaml.safe_load(text)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        raise SiteBuildError(f"{path}: {e}") from e
+
+    if raw is None:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise SiteBuildError(f"{path}: expected a mapping at the top level")
+
+    try:
+        examples = validate_examples(raw.get("examples") or [])
+        results = validate_results(raw.get("results") or [])
+    except ValidationError as e:
+        raise SiteBuildError(f"{path}: {e}") from e
+
+    return {
+        "title": str(raw.get("title") or path.stem),
+        "examples": examples,
+        "results": results,
+    }
+
+
+def _layout(title: str, body: str, stylesheet: str) -> bytes:
+    """Wrap a page body in the shared HTML layout."""
+    return (
+        "<!DOCTYPE html>\n"
+        '<html><head><meta charset="utf-8">'
+        f"<title>{html.escape(title)}</title>"
+        f'<link rel="stylesheet" href="{html.escape(stylesheet)}"></head>\n'
+        f"<body>\n<h1>{html.escape(title)}</h1>\n{body}</body></html>\n"
+    ).encode()
+
+
+def _render_examples(examples: list[Example]) -> str:
+    rows = "".join(
+        "<tr>"
+        f"<td>{html.escape(ex.id)}</td>"
+        f"<td>{html.escape(ex.name)}</td>"
+        f"<td>{html.escape(ex.status.value)}</td>"
+        f"<td>{ex.created_at.isoformat(timespec='seconds')}</td>"
+        f"<td>{html.escape(', '.join(f'{k}={v}' for k, v in ex.metadata.items()))}</td>"
+        "</tr>\n"
+        for ex in examples
+    )
+    return (
+        f"<h2>Examples ({len(examples)})</h2>\n<table>\n"
+        "<tr><th>ID</th><th>Name</th><th>Status</th><th>Created</th><th>Metadata</th></tr>\n"
+        f"{rows}</table>\n"
+    )
+
+
+def _render_results(results: list[Result]) -> str:
+    passed = sum(1 for r in results if r.success)
+    rows = "".join(
+        "<tr>"
+        f'<td class="{"ok" if r.success else "fail"}">{"pass" if r.success else "fail"}</td>'
+        f"<td>{html.escape(r.message)}</td>"
+        f"<td>{html.escape(r.error or '')}</td>"
+        "</tr>\n"
+        for r in results
+    )
+    return (
+        f"<h2>Results ({passed}/{len(results)} passed)</h2>\n<table>\n"
+        "<tr><th>Outcome</th><th>Message</th><th>Error</th></tr>\n"
+        f"{rows}</table>\n"
+    )
+
+
+def render_data_page(source: Path, stylesheet: str) -> tuple[str, bytes]:
+    """
+    Render a data file into an HTML page.
+
+    Args:
+        source: Data file to render
+        stylesheet: URL of the stylesheet to link
+
+    Returns:
+        Tuple of (page title, HTML bytes)
+    """
+    data = load_data_file(source)
+    body = ""
+    if data["examples"]:
+        body += _render_examples(data["examples"])
+    if data["results"]:
+        body += _render_results(data["results"])
+    if not body:
+        body = "<p>No data.</p>\n"
+    return data["title"], _layout(data["title"], body, stylesheet)
+
+
+def render_index(pages: list[tuple[str, str]], stylesheet: str) -> bytes:
+    """Render the index page linking to (path, title) pairs."""
+    if not pages:
+        return _layout("Preview", "<p>No data pages found.</p>\n", stylesheet)
+    items = "".join(
+        f'<li><a href="{html.escape(path)}">{html.escape(title)}</a></li>\n'
+        for path, title in pages
+    )
+    return _layout("Preview", f"<ul>\n{items}</ul>\n", stylesheet)
+
+
+def _build_page(source: Path, target: Path, stylesheet: str) -> tuple[str, bool]:
+    """Render one data page and write it; runs in a worker process."""
+    title, content = render_data_page(source, stylesheet)
+    return title, _write_output(target, content)
+
+
+def _page_path(source: Path) -> str:
+    return f"{source.stem}.html"
+
+
+def _discover_sources(source_dir: Path) -> dict[str, Path]:
+    """Map output page paths to data files found in source_dir."""
+    if not source_dir.is_dir():
+        return {}
+
+    pages: dict[str, Path] = {}
+    for path in sorted(source_dir.iterdir()):
+        if path.suffix not in DATA_SUFFIXES or not path.is_file():
+            continue
+        page = _page_path(path)
+        if page == INDEX_PAGE or page in pages:
+            raise SiteBuildError(f"{path}: output page '{page}' is already taken")
+        pages[page] = path
+    return pages
+
+
+def _read_cache(output_dir: Path) -> dict[str, Any]:
+    try:
+        cache = json.loads((output_dir / BUILD_CACHE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != BUILDER_VERSION:
+        return {}
+    return cache
+
+
+def _load_cache(output_dir: Path) -> dict[str, dict[str, str]]:
+    return _read_cache(output_dir).get("pages", {})
+
+
+def _save_cache(
+    output_dir: Path,
+    pages: dict[str, dict[str, str]] | None = None,
+    compressed: dict[str, str] | None = None,
+) -> None:
+    """Write the build cache; sections not passed in keep their recorded value."""
+    cache = _read_cache(output_dir)
+    content = json.dumps(
+        {
+            "version": BUILDER_VERSION,
+            "pages": cache.get("pages", {}) if pages is None else pages,
+            "compressed": cache.get("compressed", {}) if compressed is None else compressed,
+        },
+        indent=2,
+        sort_keys=True,
+    )
+    write_if_changed(output_dir / BUILD_CACHE_NAME, content.encode())
+
+
+def _save_manifest(
+    output_dir: Path, assets: dict[str, str], pages: dict[str, dict[str, str]]
+) -> None:
+    """Write manifest.json listing content-addressed assets and page digests."""
+    manifest = {
+        "version": BUILDER_VERSION,
+        "assets": assets,
+        "pages": {page: entry["digest"] for page, entry in pages.items()},
+    }
+    content = json.dumps(manifest, indent=2, sort_keys=True)
+    _write_output(output_dir / MANIFEST_NAME, content.encode())
+
+
+def _encodings() -> list[str]:
+    return [".gz", ".br"] if brotli is not None else [".gz"]
+
+
+def _compress_file(path: Path) -> dict[str, int]:
+    """Write compressed siblings for one file; runs in a worker process."""
+    content = path.read_bytes()
+    sizes: dict[str, int] = {}
+    for suffix in _encodings():
+        if suffix == ".gz":
+            # mtime=0 keeps the output byte-for-byte reproducible.
+            packed = gzip.compress(content, compresslevel=9, mtime=0)
+        else:
+            packed = brotli.compress(content, quality=11)  # type: ignore[union-attr]
+        write_if_changed(path.with_name(path.name + suffix), packed)
+        sizes[suffix] = len(packed)
+    return sizes
+
+
+def _is_fresh(path: Path, digest: str, recorded: str | None) -> bool:
+    """True when path was compressed with its current content and every sibling exists."""
+    if digest != recorded:
+        return False
+    return all(path.with_name(path.name + suffix).exists() for suffix in _encodings())
+
+
+def compress_site(output_dir: Path, jobs: int | None = None) -> CompressReport:
+    """
+    Write pre-compressed siblings for text files in the site, in parallel.
+
+    Each compressible file gets ``<name>.gz`` and, if ``brotli`` is
+    installed, ``<name>.br``. The content digest of every compressed file is
+    recorded in the build cache, and files whose digest is unchanged since
+    the last pass are skipped, so repeated calls after an incremental build
+    only compress what changed. Siblings of files that no longer exist are
+    removed, as are those of files now too small to compress. The build
+    cache itself is never compressed.
+
+    Args:
+        output_dir: Built site directory
+        jobs: Worker processes (default: CPU count)
+
+    Returns:
+        CompressReport with per-file outcomes and total sizes
+    """
+    report = CompressReport()
+    encodings = tuple(_encodings())
+    build_cache = output_dir / BUILD_CACHE_NAME
+    previous: dict[str, str] = _read_cache(output_dir).get("compressed", {})
+    digests: dict[str, str] = {}
+    stale: list[Path] = []
+    for path in sorted(output_dir.rglob("*")):
+        original = path.with_suffix("")
+        if path.suffix in (".gz", ".br") and original.suffix in COMPRESSIBLE_SUFFIXES:
+            if (
+                original == build_cache
+                or not original.is_file()
+                or original.stat().st_size < MIN_COMPRESS_SIZE
+            ):
+                path.unlink()
+            continue
+        if (
+            path == build_cache
+            or path.suffix not in COMPRESSIBLE_SUFFIXES
+            or not path.is_file()
+            or path.stat().st_size < MIN_COMPRESS_SIZE
+        ):
+            continue
+        content = path.read_bytes()
+        name = path.relative_to(output_dir).as_posix()
+        digests[name] = hash_bytes(content)
+        report.raw_bytes += len(content)
+        if _is_fresh(path, digests[name], previous.get(name)):
+            report.skipped.append(name)
+            report.gzip_bytes += path.with_name(path.name + ".gz").stat().st_size
+            if ".br" in encodings:
+                report.brotli_bytes += path.with_name(path.name + ".br").stat().st_size
+        else:
+            stale.append(path)
+
+    workers = min(jobs or os.cpu_count() or 1, len(stale))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_compress_file, stale, chunksize=4))
+    else:
+        outcomes = [_compress_file(path) for path in stale]
+
+    for path, sizes in zip(stale, outcomes, strict=True):
+        report.compressed.append(path.relative_to(output_dir).as_posix())
+        report.gzip_bytes += sizes[".gz"]
+        report.brotli_bytes += sizes.get(".br", 0)
+    _save_cache(output_dir, compressed=digests)
+    return report
+
+
+def build_site(
+    source_dir: Path,
+    output_dir: Path,
+    jobs: int | None = None,
+    force: bool = False,
+    asset_url: str = f"{ASSETS_DIR}/",
+) -> BuildReport:
+    """
+    Build the static site incrementally.
+
+    Args:
+        source_dir: Directory containing JSON/YAML data files
+        output_dir: Directory to write the site into
+        jobs: Worker processes for rendering (default: CPU count)
+        force: Ignore the build cache and render every page
+        asset_url: URL prefix under which ``assets/`` is served, relative to
+            the pages (e.g. ``../assets/`` for previews deployed one
+            directory below a shared assets root)
+
+    Returns:
+        BuildReport describing what was written, skipped and removed
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Forcing ignores recorded digests, but the recorded pages still tell
+    # which outputs belong to sources that are gone.
+    recorded = _load_cache(output_dir)
+    previous = {} if force else recorded
+    sources = _discover_sources(source_dir)
+    report = BuildReport()
+    cache: dict[str, dict[str, str]] = {}
+
+    report.assets, report.assets_written = publish_assets(collect_assets(source_dir), output_dir)
+    stylesheet = asset_url + report.assets[STYLESHEET].removeprefix(f"{ASSETS_DIR}/")
+    # Pages embed asset URLs, so any asset change invalidates every page.
+    layout_key = json.dumps([BUILDER_VERSION, stylesheet]).encode()
+
+    stale: dict[str, Path] = {}
+    for page, source in sources.items():
+        digest = hash_bytes(layout_key, page.encode(), source.read_bytes())
+        entry = previous.get(page)
+        if entry and entry.get("digest") == digest and (output_dir / page).exists():
+            cache[page] = entry
+            report.skipped.append(page)
+        else:
+            cache[page] = {"digest": digest}
+            stale[page] = source
+
+    workers = min(jobs or os.cpu_count() or 1, len(stale))
+    if workers > 1:
+        # Forked workers inherit the built validators instead of each building them.
+        warm_models()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = pool.map(
+                _build_page,
+                stale.values(),
+                [output_dir / p for p in stale],
+                [stylesheet] * len(stale),
+                chunksize=1,
+            )
+            built = dict(zip(stale, outcomes, strict=True))
+    else:
+        built = {
+            page: _build_page(source, output_dir / page, stylesheet)
+            for page, source in stale.items()
+        }
+
+    for page, (title, written) in built.items():
+        cache[page]["title"] = title
+        (report.written if written else report.unchanged).append(page)
+
+    for page in recorded:
+        if page not in cache and page != INDEX_PAGE:
+            (output_dir / page).unlink(missing_ok=True)
+            _remove_compressed(output_dir / page)
+            report.removed.append(page)
+
+    listing = [(page, cache[page]["title"]) for page in sorted(sources)]
+    index_digest = hash_bytes(layout_key, json.dumps(listing).encode())
+    index_entry = previous.get(INDEX_PAGE)
+    cache[INDEX_PAGE] = {"digest": index_digest, "title": "Preview"}
+    if (
+        index_entry
+        and index_entry.get("digest") == index_digest
+        and (output_dir / INDEX_PAGE).exists()
+    ):
+        report.skipped.append(INDEX_PAGE)
+    elif _write_output(output_dir / INDEX_PAGE, render_index(listing, stylesheet)):
+        report.written.append(INDEX_PAGE)
+    else:
+        report.unchanged.append(INDEX_PAGE)
+
+    _save_cache(output_dir, pages=cache)
+    _save_manifest(output_dir, report.assets, cache)
+    return report
@@ -0,0 +1,199 @@
+"""
+Parallel execution backends for batch runs.
+
+``run_batch`` splits names into chunks and runs each chunk through the core
+pipeline on one of these backends:
+
+- ``thread``: a thread pool in this process. On free-threaded CPython
+  (3.13t and later, with the GIL disabled) threads run Python code on all
+  cores. On standard builds they only overlap I/O such as persistence.
+- ``process``: worker processes with shared-memory result transport
+  (``transport.process_parallel``).
+- ``serial``: the calling thread, for baselines and debugging.
+
+``auto`` picks ``thread`` when the interpreter is free-threaded and
+``process`` otherwise.
+
+Chunks share no mutable state, so the thread backend needs no locks on the
+hot path. IDs come from ``uuid.uuid4`` (``os.urandom``, no shared generator
+state). Settings are frozen snapshots. On the thread and serial backends
+each chunk returns its own PipelineReport, and the calling thread sums their
+per-segment timings into ``BatchReport.stages`` once the chunks are done.
+The process backend splits names evenly over its workers and reports no
+stage timings.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+from pydantic import BaseModel, Field
+
+from my_project.config import get_settings
+from my_project.core import process_batch
+from my_project.pipeline import DEFAULT_CHUNK_SIZE, StageTiming
+from my_project.transport import process_parallel
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from my_project.config import Settings
+    from my_project.models import Result
+    from my_project.pipeline import Pipeline, PipelineRun
+
+Backend = Literal["auto", "thread", "process", "serial"]
+
+# Chunks per worker, so uneven chunks still keep every worker busy.
+_CHUNKS_PER_WORKER = 4
+
+
+def free_threaded() -> bool:
+    """Return True on a free-threaded interpreter running with the GIL disabled."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on."""
+    count = getattr(os, "process_cpu_count", os.cpu_count)()
+    return count or 1
+
+
+def resolve_backend(backend: Backend) -> Backend:
+    """Resolve ``auto`` to ``thread`` on free-threaded builds and ``process`` otherwise."""
+    if backend == "auto":
+        return "thread" if free_threaded() else "process"
+    return backend
+
+
+class BatchReport(BaseModel):
+    """Metrics for a parallel batch run."""
+
+    backend: str = Field(..., description="Backend that ran the batch")
+    workers: int = Field(..., description="Worker threads or processes")
+    free_threaded: bool = Field(..., description="Whether the GIL was disabled")
+    items: int = Field(default=0, description="Items processed")
+    failed: int = Field(default=0, description="Items whose Result was unsuccessful")
+    chunks: int = Field(default=0, description="Chunks processed")
+    seconds: float = Field(default=0.0, description="Wall time of the run")
+    stages: list[StageTiming] = Field(
+        default_factory=list,
+        description="Per-segment timings summed over chunks (thread and serial backends)",
+    )
+
+    def format(self) -> str:
+        """Render the report as one line."""
+        rate = self.items / self.seconds if self.seconds else 0.0
+        build = "free-threaded" if self.free_threaded else "GIL"
+        return (
+            f"{self.items} items ({self.failed} failed) in {self.seconds:.3f}s on "
+            f"{self.workers} {self.backend} workers ({build}): {rate:,.0f} items/s"
+        )
+
+
+class BatchRun(NamedTuple):
+    """
+    Outputs of a batch run, in input order, with its metrics.
+
+    The process backend returns its SharedResults as they are, so Results are
+    only decoded for the items a caller indexes.
+    """
+
+    outputs: Sequence[Result]
+    report: BatchReport
+
+
+def _chunks(names: Sequence[str], size: int) -> list[Sequence[str]]:
+    return [names[i : i + size] for i in range(0, len(names), size)]
+
+
+def run_batch(
+    names: Sequence[str],
+    *,
+    backend: Backend | None = None,
+    workers: int | None = None,
+    pipeline: Pipeline | None = None,
+    chunk_size: int | None = None,
+    settings: Settings | None = None,
+) -> BatchRun:
+    """
+    Process names in parallel on the configured backend.
+
+    Args:
+        names: Names to process
+        backend: Execution backend (default: Settings.batch_backend)
+        workers: Threads or processes (default: Settings.batch_workers or CPU count)
+        pipeline: Pipeline for the thread and serial backends (default: core default)
+        chunk_size: Names per chunk for the thread and serial backends
+            (default: spread over a few chunks per worker)
+        settings: Settings snapshot supplying the defaults
+
+    Returns:
+        BatchRun with one Result per name, in order (lazily decoded for the
+        process backend), and a BatchReport
+
+    Raises:
+        ValueError: If workers or chunk_size is below 1, or a custom pipeline
+            or chunk_size is used with the process backend
+    """
+    settings = settings or get_settings()
+    resolved = resolve_backend(backend or settings.batch_backend)
+    workers = workers or settings.batch_workers or available_cpus()
+    if workers < 1 or (chunk_size is not None and chunk_size < 1):
+        raise ValueError("workers and chunk_size must be at least 1")
+    if resolved == "serial":
+        workers = 1
+
+    report = BatchReport(backend=resolved, workers=workers, free_threaded=free_threaded())
+    started = time.perf_counter()
+
+    if resolved == "process":
+        if pipeline is not None:
+            raise ValueError("The process backend only runs the default pipeline")
+        if chunk_size is not None:
+            raise ValueError("The process backend splits names per worker; drop chunk_size")
+        shared = process_parallel(names, workers)
+        outputs: Sequence[Result] = shared
+        report.failed = len(shared) - shared.successes
+        report.chunks = min(workers, len(names))
+    else:
+        size = chunk_size or max(
+            1, min(DEFAULT_CHUNK_SIZE, -(-len(names) // (workers * _CHUNKS_PER_WORKER)))
+        )
+        chunks = _chunks(names, size)
+
+        def run(chunk: Sequence[str]) -> PipelineRun:
+            return process_batch(chunk, pipeline=pipeline, chunk_size=len(chunk))
+
+        if resolved == "serial":
+            runs = [run(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+                runs = list(pool.map(run, chunks))
+
+        merged: list[Result] = []
+        for chunk_run in runs:
+            merged.extend(chunk_run.outputs)
+        outputs = merged
+        report.failed = sum(1 for r in merged if not r.success)
+        report.chunks = len(runs)
+        # Every chunk ran the same pipeline, so segment timings line up by position.
+        report.stages = [
+            timings[0].model_copy(
+                update={
+                    "calls": sum(t.calls for t in timings),
+                    "items": sum(t.items for t in timings),
+                    "failed": sum(t.failed for t in timings),
+                    "seconds": sum(t.seconds for t in timings),
+                }
+            )
+            for timings in zip(*(chunk_run.report.stages for chunk_run in runs), strict=True)
+        ]
+
+    report.items = len(outputs)
+    report.seconds = time.perf_counter() - started
+    return BatchRun(outputs, report)
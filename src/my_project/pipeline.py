@@ -0,0 +1,416 @@
+"""
+Declarative processing pipeline.
+
+A Pipeline is an ordered list of named stages. Per-item stages take one item
+and return the transformed item; batch stages take a list and return a list
+of the same length. When a pipeline runs, adjacent *pure* per-item stages are
+fused into a single function, so each item makes one pass through them
+instead of one pass per stage. Impure stages (those with side effects whose
+order matters, such as persisting) and batch stages each get their own pass.
+
+Items are processed in chunks. An item that raises in any stage is handed to
+the pipeline's ``on_error`` callback and skips the remaining stages.
+``run_one`` processes a single item without the chunk bookkeeping.
+
+Example:
+    pipeline = Pipeline()
+    pipeline.add_stage("strip", str.strip)
+    pipeline.add_stage("upper", str.upper)
+    pipeline.add_stage("persist", save_all, batch=True, pure=False)
+    outputs, report = pipeline.run(names)
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, Field
+
+from my_project.tracing import current_tracer, span
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class Stage:
+    """A registered pipeline stage."""
+
+    name: str
+    fn: Callable[[Any], Any]
+    pure: bool = True
+    batch: bool = False
+
+
+class StageTiming(BaseModel):
+    """Timing for one executed segment (a single stage or a fused group)."""
+
+    name: str = Field(..., description="Segment name; fused stages are joined with '+'")
+    stages: list[str] = Field(..., description="Stages executed in this segment")
+    fused: bool = Field(default=False, description="Whether stages were fused into one pass")
+    batch: bool = Field(default=False, description="Whether the segment runs on whole chunks")
+    calls: int = Field(default=0, description="Number of per-item or per-chunk calls")
+    items: int = Field(default=0, description="Items that entered the segment")
+    failed: int = Field(default=0, description="Items that failed in the segment")
+    seconds: float = Field(default=0.0, description="Wall time spent in the segment")
+
+
+class PipelineReport(BaseModel):
+    """Per-segment timing report for a pipeline run."""
+
+    items: int = 0
+    failed: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    stages: list[StageTiming] = Field(default_factory=list)
+
+    def format(self) -> str:
+        """Render the report as an aligned text table."""
+        lines = [f"{self.items} items ({self.failed} failed) in {self.seconds:.4f}s"]
+        width = max((len(s.name) for s in self.stages), default=0)
+        for s in self.stages:
+            kind = "batch" if s.batch else "fused" if s.fused else "item"
+            per_item = s.seconds / s.items * 1e6 if s.items else 0.0
+            lines.append(
+                f"  {s.name:<{width}}  {kind:<5}  {s.seconds:.4f}s  {per_item:8.2f}us/item"
+                f"  {s.failed} failed"
+            )
+        return "\n".join(lines)
+
+
+@dataclass(slots=True)
+class _Counters:
+    """Mutable per-segment counters for the hot loop; reported as StageTiming."""
+
+    calls: int = 0
+    items: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+
+class _Failed:
+    """Marks an item that failed; holds the on_error output."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+@dataclass(frozen=True, slots=True)
+class _Segment:
+    stages: tuple[Stage, ...]
+    fn: Callable[[Any], Any]
+    batch: bool
+    name: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        # Joined once here; the hot loop reads it for every chunk.
+        object.__setattr__(self, "name", "+".join(stage.name for stage in self.stages))
+
+
+class PipelineRun:
+    """
+    Outputs of a pipeline run, in input order, with its timing report.
+
+    The report is built from the run's counters when first read, so callers
+    that only need ``outputs`` never pay for it. Unpacks like a pair:
+    ``outputs, report = pipeline.run(items)``.
+    """
+
+    __slots__ = ("_chunks", "_counters", "_report", "_seconds", "_segments", "outputs")
+
+    def __init__(
+        self,
+        outputs: list[Any],
+        segments: tuple[_Segment, ...],
+        counters: list[_Counters],
+        chunks: int,
+        seconds: float,
+    ) -> None:
+        self.outputs = outputs
+        self._segments = segments
+        self._counters = counters
+        self._chunks = chunks
+        self._seconds = seconds
+        self._report: PipelineReport | None = None
+
+    @property
+    def report(self) -> PipelineReport:
+        """Per-segment timing report."""
+        if self._report is None:
+            counters = self._counters
+            self._report = PipelineReport(
+                items=len(self.outputs),
+                failed=sum(c.failed for c in counters),
+                chunks=self._chunks,
+                seconds=self._seconds,
+                stages=[
+                    StageTiming(
+                        name=seg.name,
+                        stages=[stage.name for stage in seg.stages],
+                        fused=len(seg.stages) > 1,
+                        batch=seg.batch,
+                        calls=c.calls,
+                        items=c.items,
+                        failed=c.failed,
+                        seconds=c.seconds,
+                    )
+                    for seg, c in zip(self._segments, counters, strict=True)
+                ],
+            )
+        return self._report
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter((self.outputs, self.report))
+
+
+def _fuse(fns: tuple[Callable[[Any], Any], ...]) -> Callable[[Any], Any]:
+    """Compose per-item functions left to right into a single call."""
+    if len(fns) == 1:
+        return fns[0]
+
+    def fused(item: Any) -> Any:
+        for fn in fns:
+            item = fn(item)
+        return item
+
+    return fused
+
+
+def _reraise(_item: Any, exc: Exception) -> Any:
+    raise exc
+
+
+class Pipeline:
+    """
+    Ordered collection of processing stages with fusion at run time.
+
+    Args:
+        on_error: Called as ``on_error(item, exc)`` when a stage raises; its
+            return value becomes the item's output. Defaults to re-raising.
+    """
+
+    def __init__(self, on_error: Callable[[Any, Exception], Any] | None = None) -> None:
+        self._stages: list[Stage] = []
+        self._segments: tuple[_Segment, ...] | None = None
+        self.on_error = on_error or _reraise
+
+    @property
+    def stages(self) -> tuple[Stage, ...]:
+        """Registered stages in execution order."""
+        return tuple(self._stages)
+
+    def add_stage(
+        self,
+        name: str,
+        fn: Callable[[Any], Any],
+        *,
+        pure: bool = True,
+        batch: bool = False,
+        before: str | None = None,
+        after: str | None = None,
+    ) -> Pipeline:
+        """
+        Register a stage.
+
+        Args:
+            name: Unique stage name used in reports
+            fn: Per-item ``fn(item) -> item``, or ``fn(items) -> items`` if batch
+            pure: Whether the stage is free of order-sensitive side effects;
+                only adjacent pure per-item stages are fused
+            batch: Whether fn takes and returns a whole chunk
+            before: Insert before the named stage instead of appending
+            after: Insert after the named stage instead of appending
+
+        Returns:
+            The pipeline, for chaining
+        """
+        if any(stage.name == name for stage in self._stages):
+            raise ValueError(f"Stage '{name}' is already registered")
+        if before is not None and after is not None:
+            raise ValueError("Pass at most one of 'before' and 'after'")
+
+        stage = Stage(name=name, fn=fn, pure=pure, batch=batch)
+        anchor = before if before is not None else after
+        if anchor is None:
+            self._stages.append(stage)
+        else:
+            index = self._index(anchor) + (1 if after is not None else 0)
+            self._stages.insert(index, stage)
+        self._segments = None
+        return self
+
+    def stage(
+        self, name: str | None = None, *, pure: bool = True, batch: bool = False
+    ) -> Callable[[Callable[[Any], Any]], Callable[[Any], Any]]:
+        """Decorator form of add_stage; the stage name defaults to the function name."""
+
+        def register(fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+            self.add_stage(name or fn.__name__, fn, pure=pure, batch=batch)
+            return fn
+
+        return register
+
+    def remove_stage(self, name: str) -> Pipeline:
+        """Remove a registered stage by name."""
+        del self._stages[self._index(name)]
+        self._segments = None
+        return self
+
+    def copy(self) -> Pipeline:
+        """Return an independent pipeline with the same stages and error handler."""
+        clone = Pipeline(on_error=self.on_error)
+        clone._stages = list(self._stages)
+        return clone
+
+    def _index(self, name: str) -> int:
+        for i, stage in enumerate(self._stages):
+            if stage.name == name:
+                return i
+        raise KeyError(f"No stage named '{name}'")
+
+    def compile(self) -> tuple[_Segment, ...]:
+        """Group stages into execution segments, fusing adjacent pure per-item stages."""
+        if self._segments is not None:
+            return self._segments
+
+        segments: list[_Segment] = []
+        group: list[Stage] = []
+
+        def flush() -> None:
+            if group:
+                fns = tuple(stage.fn for stage in group)
+                segments.append(_Segment(tuple(group), _fuse(fns), batch=False))
+                group.clear()
+
+        for stage in self._stages:
+            if stage.pure and not stage.batch:
+                group.append(stage)
+                continue
+            flush()
+            segments.append(_Segment((stage,), stage.fn, batch=stage.batch))
+        flush()
+
+        self._segments = tuple(segments)
+        return self._segments
+
+    def run(self, items: Iterable[Any], chunk_size: int = DEFAULT_CHUNK_SIZE) -> PipelineRun:
+        """
+        Run every item through the pipeline.
+
+        Args:
+            items: Input items
+            chunk_size: Items per chunk handed to batch stages
+
+        Returns:
+            PipelineRun with outputs in input order and a timing report
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        segments = self.compile()
+        counters = [_Counters() for _ in segments]
+        outputs: list[Any] = []
+        chunks = 0
+        started = time.perf_counter()
+
+        chunk: list[Any] = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                outputs.extend(self._run_chunk(chunk, segments, counters))
+                chunks += 1
+                chunk = []
+        if chunk:
+            outputs.extend(self._run_chunk(chunk, segments, counters))
+            chunks += 1
+
+        return PipelineRun(
+            [o.value if type(o) is _Failed else o for o in outputs],
+            segments,
+            counters,
+            chunks,
+            time.perf_counter() - started,
+        )
+
+    def run_one(self, item: Any) -> Any:
+        """
+        Run a single item through the pipeline and return its output.
+
+        Without batch stages, and while no tracer is installed, the compiled
+        segments are called directly with no chunking, per-segment spans or
+        timing report; otherwise the item goes through ``run``.
+        """
+        segments = self.compile()
+        if current_tracer() is not None or any(seg.batch for seg in segments):
+            return self.run((item,)).outputs[0]
+        value = item
+        for seg in segments:
+            try:
+                value = seg.fn(value)
+            except Exception as e:
+                return self.on_error(item, e)
+        return value
+
+    def _run_chunk(
+        self, chunk: list[Any], segments: tuple[_Segment, ...], counters: list[_Counters]
+    ) -> list[Any]:
+        values = chunk
+        originals = chunk
+        on_error = self.on_error
+
+        for seg, timing in zip(segments, counters, strict=True):
+            live = [i for i, v in enumerate(values) if type(v) is not _Failed]
+            if not live:
+                break
+            start = time.perf_counter()
+            timing.items += len(live)
+
+            with span(seg.name, items=len(live)):
+                if seg.batch:
+                    values = self._run_batch(seg, values, live, originals, timing)
+                else:
+                    fn = seg.fn
+                    out = list(values)
+                    for i in live:
+                        try:
+                            out[i] = fn(values[i])
+                        except Exception as e:
+                            out[i] = _Failed(on_error(originals[i], e))
+                            timing.failed += 1
+                    values = out
+                    timing.calls += len(live)
+
+            timing.seconds += time.perf_counter() - start
+        return values
+
+    def _run_batch(
+        self,
+        seg: _Segment,
+        values: list[Any],
+        live: list[int],
+        originals: list[Any],
+        timing: _Counters,
+    ) -> list[Any]:
+        out = list(values)
+        timing.calls += 1
+        try:
+            results = list(seg.fn([values[i] for i in live]))
+            if len(results) != len(live):
+                raise ValueError(
+                    f"Batch stage '{seg.name}' returned {len(results)} items for {len(live)}"
+                )
+        except Exception as e:
+            for i in live:
+                out[i] = _Failed(self.on_error(originals[i], e))
+            timing.failed += len(live)
+            return out
+
+        for i, result in zip(live, results, strict=True):
+            out[i] = result
+        return out
@@ -0,0 +1,168 @@
+"""
+Local preview server for the built static site.
+
+Serves ``$(SITE_DIR)`` the way a CDN would, so page weight and latency can be
+measured before pushing a preview: pre-compressed ``.br``/``.gz`` siblings
+written by ``compress_site`` are served when the client accepts them and
+they are not older than the file itself, every response carries an ETag and
+honours ``If-None-Match`` with a 304, and file bodies are sent with
+``socket.sendfile`` (zero-copy ``sendfile(2)`` where the platform supports it).
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import time
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from my_project.pages import ASSETS_DIR
+
+# Preferred order when the client accepts several encodings.
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Content-addressed assets never change at a given URL.
+_IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+def _is_current(sibling: Path, path: Path) -> bool:
+    """True when a compressed sibling exists and is not older than its file."""
+    try:
+        return sibling.stat().st_mtime_ns >= path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def _accepted_encodings(header: str | None) -> set[str]:
+    """Parse Accept-Encoding into the set of codings with a non-zero q-value."""
+    accepted: set[str] = set()
+    for item in (header or "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding)
+    return accepted
+
+
+def make_etag(stat: os.stat_result, encoding: str | None = None) -> str:
+    """Build a strong ETag from file size and mtime, distinct per encoding."""
+    tag = f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+    if encoding:
+        tag += f"-{encoding}"
+    return f'"{tag}"'
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """Static file handler with pre-compressed variants, ETags and sendfile."""
+
+    server_version = "my-project-preview"
+
+    def do_GET(self) -> None:
+        """Serve a file, preferring a pre-compressed variant."""
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        """Serve headers only."""
+        self._serve(send_body=False)
+
+    def _resolve(self) -> Path | None:
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            if not self.path.split("?", 1)[0].endswith("/"):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", self.path.split("?", 1)[0] + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            path = path / "index.html"
+        if not path.is_file():
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        return path
+
+    def _serve(self, send_body: bool) -> None:
+        started = time.perf_counter()
+        path = self._resolve()
+        if path is None:
+            return
+
+        accepted = _accepted_encodings(self.headers.get("Accept-Encoding"))
+        encoding = None
+        body_path = path
+        for coding, suffix in _ENCODINGS:
+            if coding in accepted:
+                candidate = path.with_name(path.name + suffix)
+                if _is_current(candidate, path):
+                    encoding, body_path = coding, candidate
+                    break
+
+        with body_path.open("rb") as f:
+            stat = os.fstat(f.fileno())
+            etag = make_etag(stat, encoding)
+            relative = path.relative_to(self.directory).as_posix()
+            cache_control = (
+                _IMMUTABLE_CACHE if relative.startswith(f"{ASSETS_DIR}/") else "no-cache"
+            )
+
+            if etag in (self.headers.get("If-None-Match") or "").replace(" ", "").split(","):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", cache_control)
+                self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                self._log_timing(relative, 0, encoding, started)
+                return
+
+            content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(stat.st_size))
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+
+            sent = 0
+            if send_body:
+                self.wfile.flush()
+                sent = self.connection.sendfile(f)
+            self._log_timing(relative, sent, encoding, started)
+
+    def _log_timing(self, path: str, sent: int, encoding: str | None, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.log_message("%s %d bytes %s %.2fms", path, sent, encoding or "identity", elapsed_ms)
+
+    def log_request(self, code: int | str = "-", size: int | str = "-") -> None:
+        """Suppress the default access log; _log_timing covers served files."""
+        if isinstance(code, HTTPStatus):
+            code = code.value
+        if code not in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+            super().log_request(code, size)
+
+
+def create_server(directory: Path, host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Create a threaded preview server for a site directory.
+
+    Args:
+        directory: Built site directory to serve
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+
+    Returns:
+        Bound server; call serve_forever() to start handling requests
+    """
+    handler = partial(PreviewHandler, directory=str(directory.resolve()))
+    return ThreadingHTTPServer((host, port), handler)
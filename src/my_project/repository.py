@@ -0,0 +1,348 @@
+"""
+SQLite-backed persistence for examples and results.
+
+SQLiteRepository stores Example and Result records in a single SQLite file
+under ``Settings.data_dir``. The database runs in WAL mode so readers never
+block the writer, writes go through ``executemany`` bulk upserts committed
+in configurable transaction batches, and ``status`` and ``created_at`` are
+indexed so lookups by status and time range stay fast as the table grows.
+
+SQLite connections must not be shared between threads, so the repository
+keeps one connection per thread and opens it lazily on first use.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+from my_project.config import get_settings
+from my_project.models import Example, Result, Status
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+    from my_project.config import Settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS examples (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_examples_status_created ON examples (status, created_at);
+CREATE INDEX IF NOT EXISTS ix_examples_created ON examples (created_at);
+
+CREATE TABLE IF NOT EXISTS results (
+    seq INTEGER PRIMARY KEY,
+    example_id TEXT UNIQUE,
+    success INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    data TEXT,
+    error TEXT
+);
+"""
+
+_UPSERT_EXAMPLE = """
+INSERT INTO examples (id, name, status, created_at, metadata)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    name = excluded.name,
+    status = excluded.status,
+    created_at = excluded.created_at,
+    metadata = excluded.metadata
+"""
+
+_UPSERT_RESULT = """
+INSERT INTO results (example_id, success, message, data, error)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (example_id) DO UPDATE SET
+    success = excluded.success,
+    message = excluded.message,
+    data = excluded.data,
+    error = excluded.error
+"""
+
+# Used when migrating rows, so a newer row already at the target wins.
+_INSERT_EXAMPLE_IF_MISSING = """
+INSERT INTO examples (id, name, status, created_at, metadata)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (id) DO NOTHING
+"""
+
+_INSERT_RESULT_IF_MISSING = """
+INSERT INTO results (example_id, success, message, data, error)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (example_id) DO NOTHING
+"""
+
+_EXAMPLE_COLUMNS = "id, name, status, created_at, metadata"
+
+
+def _timestamp(value: datetime) -> str:
+    # Fixed-width ISO text so lexical order matches chronological order.
+    return value.isoformat(timespec="microseconds")
+
+
+def _example_row(example: Example) -> tuple[str, str, str, str, str]:
+    return (
+        example.id,
+        example.name,
+        example.status.value,
+        _timestamp(example.created_at),
+        json.dumps(example.metadata, separators=(",", ":")),
+    )
+
+
+def _result_row(result: Result) -> tuple[Any, ...]:
+    example_id = result.data.get("id") if result.data else None
+    return (
+        example_id,
+        int(result.success),
+        result.message,
+        json.dumps(result.data, separators=(",", ":")) if result.data is not None else None,
+        result.error,
+    )
+
+
+def _row_to_example(row: tuple[Any, ...]) -> Example:
+    # Rows were validated on the way in, so skip re-validation on reads.
+    return Example.model_construct(
+        id=row[0],
+        name=row[1],
+        status=Status(row[2]),
+        created_at=datetime.fromisoformat(row[3]),
+        metadata=json.loads(row[4]),
+    )
+
+
+def _row_to_result(row: tuple[Any, ...]) -> Result:
+    return Result(
+        success=bool(row[0]),
+        message=row[1],
+        data=json.loads(row[2]) if row[2] is not None else None,
+        error=row[3],
+    )
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class SQLiteRepository:
+    """
+    Repository for Example and Result records in SQLite.
+
+    Args:
+        path: Database file; created along with its parent directory
+        batch_size: Rows per transaction for bulk upserts
+    """
+
+    def __init__(self, path: Path, batch_size: int = 1000) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> SQLiteRepository:
+        """Open the repository at ``data_dir / sqlite_filename``."""
+        settings = settings or get_settings()
+        return cls(settings.data_dir / settings.sqlite_filename, settings.sqlite_batch_size)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Each connection is only used by its own thread; check_same_thread
+            # is off so close() can release every connection from one place.
+            conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close every connection opened by any thread."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def __enter__(self) -> SQLiteRepository:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def _bulk(self, sql: str, rows: Iterable[tuple[Any, ...]]) -> int:
+        conn = self._connection()
+        written = 0
+        for batch in _batched(rows, self.batch_size):
+            with conn:
+                conn.executemany(sql, batch)
+            written += len(batch)
+        return written
+
+    def upsert_examples(self, examples: Iterable[Example], *, replace: bool = True) -> int:
+        """
+        Insert or update examples by ID.
+
+        Args:
+            examples: Examples to write
+            replace: Overwrite existing rows; if False, keep them
+
+        Returns:
+            Number of examples written
+        """
+        sql = _UPSERT_EXAMPLE if replace else _INSERT_EXAMPLE_IF_MISSING
+        return self._bulk(sql, map(_example_row, examples))
+
+    def upsert_results(self, results: Iterable[Result], *, replace: bool = True) -> int:
+        """
+        Insert results, replacing any earlier result for the same example ID.
+
+        Results without an ``id`` in their data are always appended.
+
+        Args:
+            results: Results to write
+            replace: Overwrite existing rows; if False, keep them
+
+        Returns:
+            Number of results written
+        """
+        sql = _UPSERT_RESULT if replace else _INSERT_RESULT_IF_MISSING
+        return self._bulk(sql, map(_result_row, results))
+
+    def iter_examples(self) -> Iterator[list[Example]]:
+        """
+        Yield every stored example in pages of ``batch_size``.
+
+        Pages are read by rowid, so rows may be deleted between pages.
+        """
+        conn = self._connection()
+        last = 0
+        while rows := conn.execute(
+            f"SELECT rowid, {_EXAMPLE_COLUMNS} FROM examples WHERE rowid > ? "
+            "ORDER BY rowid LIMIT ?",
+            (last, self.batch_size),
+        ).fetchall():
+            last = rows[-1][0]
+            yield [_row_to_example(row[1:]) for row in rows]
+
+    def iter_results(self) -> Iterator[list[Result]]:
+        """Yield every stored result in pages of ``batch_size``."""
+        conn = self._connection()
+        last = 0
+        while rows := conn.execute(
+            "SELECT seq, success, message, data, error FROM results WHERE seq > ? "
+            "ORDER BY seq LIMIT ?",
+            (last, self.batch_size),
+        ).fetchall():
+            last = rows[-1][0]
+            yield [_row_to_result(row[1:]) for row in rows]
+
+    def delete_examples(self, example_ids: Iterable[str]) -> int:
+        """Delete examples by ID, returning how many were removed."""
+        return self._delete("DELETE FROM examples WHERE id = ?", example_ids)
+
+    def delete_results(self, example_ids: Iterable[str]) -> int:
+        """Delete the results for the given example IDs."""
+        return self._delete("DELETE FROM results WHERE example_id = ?", example_ids)
+
+    def _delete(self, sql: str, ids: Iterable[str]) -> int:
+        conn = self._connection()
+        deleted = 0
+        for batch in _batched(((i,) for i in ids), self.batch_size):
+            with conn:
+                deleted += conn.executemany(sql, batch).rowcount
+        return deleted
+
+    def compact(self) -> None:
+        """Checkpoint and truncate the WAL, reclaim free pages and refresh planner stats."""
+        conn = self._connection()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA optimize")
+
+    def get_example(self, example_id: str) -> Example | None:
+        """Fetch one example by ID."""
+        row = (
+            self._connection()
+            .execute(f"SELECT {_EXAMPLE_COLUMNS} FROM examples WHERE id = ?", (example_id,))
+            .fetchone()
+        )
+        return _row_to_example(row) if row else None
+
+    def examples_by_status(self, status: Status, limit: int | None = None) -> list[Example]:
+        """Fetch examples with a status, oldest first."""
+        rows = (
+            self._connection()
+            .execute(
+                f"SELECT {_EXAMPLE_COLUMNS} FROM examples WHERE status = ? "
+                "ORDER BY created_at LIMIT ?",
+                (status.value, -1 if limit is None else limit),
+            )
+            .fetchall()
+        )
+        return [_row_to_example(row) for row in rows]
+
+    def examples_between(
+        self, start: datetime, end: datetime, status: Status | None = None
+    ) -> list[Example]:
+        """
+        Fetch examples created in ``[start, end)``, oldest first.
+
+        Args:
+            start: Inclusive lower bound
+            end: Exclusive upper bound
+            status: Optionally restrict to one status
+        """
+        sql = f"SELECT {_EXAMPLE_COLUMNS} FROM examples WHERE created_at >= ? AND created_at < ?"
+        params: list[Any] = [_timestamp(start), _timestamp(end)]
+        if status is not None:
+            sql += " AND status = ?"
+            params.append(status.value)
+        rows = self._connection().execute(sql + " ORDER BY created_at", params).fetchall()
+        return [_row_to_example(row) for row in rows]
+
+    def result_for(self, example_id: str) -> Result | None:
+        """Fetch the stored result for an example ID."""
+        row = (
+            self._connection()
+            .execute(
+                "SELECT success, message, data, error FROM results WHERE example_id = ?",
+                (example_id,),
+            )
+            .fetchone()
+        )
+        return _row_to_result(row) if row else None
+
+    def count_examples(self, status: Status | None = None) -> int:
+        """Count stored examples, optionally by status."""
+        if status is None:
+            row = self._connection().execute("SELECT COUNT(*) FROM examples").fetchone()
+        else:
+            row = (
+                self._connection()
+                .execute("SELECT COUNT(*) FROM examples WHERE status = ?", (status.value,))
+                .fetchone()
+            )
+        return row[0]
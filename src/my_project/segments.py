@@ -0,0 +1,286 @@
+"""
+Time-partitioned storage for examples, keyed by ``Example.created_at``.
+
+SegmentStore appends examples as JSON lines to one segment file per hour or
+per day (``segments/2024-01-01T13.jsonl`` or ``segments/2024-01-01.jsonl``).
+Segment names sort chronologically, so a range query bisects the sorted list
+of segment names and only opens segments that overlap the range.
+
+While a segment is still receiving writes it is an unsorted append log.
+Compaction rewrites a closed segment (one whose time bucket has ended)
+sorted by ``created_at`` with superseded records for the same ID dropped,
+and writes a sidecar ``.idx`` file holding the sorted timestamps and their
+byte offsets. Queries against a compacted segment bisect the index and read
+only the matching byte range. Appending to a compacted segment removes its
+index, returning it to the unsorted state until it is compacted again.
+
+Segments older than ``Settings.segment_retention_hours`` are deleted by
+``expire`` (and by ``compact``, which expires before compacting).
+
+Appends and compaction are serialized within a process; run compaction from
+one process at a time.
+"""
+
+from __future__ import annotations
+
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Literal
+
+from pydantic import BaseModel, Field
+
+from my_project.config import get_settings
+from my_project.models import validate_examples_jsonl
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from my_project.config import Settings
+    from my_project.models import Example
+
+Granularity = Literal["hour", "day"]
+
+SEGMENTS_DIR = "segments"
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+
+_KEY_FORMATS: dict[str, str] = {"hour": "%Y-%m-%dT%H", "day": "%Y-%m-%d"}
+_SPANS: dict[str, timedelta] = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class CompactionReport(BaseModel):
+    """Summary of a compaction pass."""
+
+    compacted: list[str] = Field(default_factory=list, description="Segments rewritten sorted")
+    expired: list[str] = Field(default_factory=list, description="Segments deleted by retention")
+    records: int = Field(default=0, description="Records kept in compacted segments")
+    duplicates: int = Field(default=0, description="Superseded records dropped")
+
+
+def _naive(ts: datetime) -> datetime:
+    # created_at defaults to naive local time; fold aware values onto it.
+    return ts.astimezone().replace(tzinfo=None) if ts.tzinfo is not None else ts
+
+
+def _micros(ts: datetime) -> int:
+    return (_naive(ts) - _EPOCH) // _MICROSECOND
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+class SegmentStore:
+    """
+    Append-only, time-partitioned example store.
+
+    Args:
+        root: Directory holding segment files; created if missing
+        granularity: Segment width, ``"hour"`` or ``"day"``
+        retention_hours: Age after which whole segments expire (None keeps all)
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        granularity: Granularity = "hour",
+        retention_hours: int | None = None,
+    ) -> None:
+        if granularity not in _SPANS:
+            raise ValueError(f"granularity must be 'hour' or 'day', not {granularity!r}")
+        self.root = root
+        self.granularity = granularity
+        self.retention_hours = retention_hours
+        self._format = _KEY_FORMATS[granularity]
+        self._span = _SPANS[granularity]
+        self._lock = threading.Lock()
+        root.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> SegmentStore:
+        """Open the store at ``data_dir / segments``."""
+        settings = settings or get_settings()
+        return cls(
+            settings.data_dir / SEGMENTS_DIR,
+            granularity=settings.segment_granularity,
+            retention_hours=settings.segment_retention_hours,
+        )
+
+    def key(self, ts: datetime) -> str:
+        """Name of the segment holding a timestamp."""
+        return _naive(ts).strftime(self._format)
+
+    def bucket(self, key: str) -> datetime:
+        """Start of a segment's time bucket."""
+        return datetime.strptime(key, self._format)
+
+    def _segment_path(self, key: str) -> Path:
+        return self.root / f"{key}{SEGMENT_SUFFIX}"
+
+    def _index_path(self, key: str) -> Path:
+        return self.root / f"{key}{INDEX_SUFFIX}"
+
+    def segments(self) -> list[str]:
+        """Names of all segments, oldest first."""
+        return sorted(
+            path.name.removesuffix(SEGMENT_SUFFIX)
+            for path in self.root.iterdir()
+            if path.name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def is_compacted(self, key: str) -> bool:
+        """Whether a segment is sorted and indexed."""
+        return self._index_path(key).exists()
+
+    def append(self, examples: Iterable[Example]) -> int:
+        """
+        Append examples to the segments for their ``created_at``.
+
+        A later record for the same ID supersedes earlier ones in reads and
+        compaction, so re-appending an updated example acts as an upsert.
+
+        Returns:
+            Number of examples written
+        """
+        groups: dict[str, list[str]] = {}
+        for example in examples:
+            groups.setdefault(self.key(example.created_at), []).append(
+                example.model_dump_json() + "\n"
+            )
+
+        with self._lock:
+            for key, lines in groups.items():
+                self._index_path(key).unlink(missing_ok=True)
+                with self._segment_path(key).open("a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+        return sum(len(lines) for lines in groups.values())
+
+    def segments_for(self, start: datetime, end: datetime) -> list[str]:
+        """Names of the segments overlapping ``[start, end)``, oldest first."""
+        keys = self.segments()
+        selected: list[str] = []
+        end = _naive(end)
+        for key in keys[bisect_left(keys, self.key(start)) :]:
+            if self.bucket(key) >= end:
+                break
+            selected.append(key)
+        return selected
+
+    def between(self, start: datetime, end: datetime) -> list[Example]:
+        """
+        Fetch examples created in ``[start, end)``, oldest first.
+
+        Args:
+            start: Inclusive lower bound
+            end: Exclusive upper bound
+        """
+        lo, hi = _micros(start), _micros(end)
+        found: list[Example] = []
+        for key in self.segments_for(start, end):
+            if self.is_compacted(key):
+                found.extend(self._read_indexed(key, lo, hi))
+            else:
+                found.extend(e for e in self._read_all(key) if lo <= _micros(e.created_at) < hi)
+        return found
+
+    def last(self, window: timedelta, now: datetime | None = None) -> list[Example]:
+        """Fetch examples created within ``window`` before ``now``."""
+        now = _naive(now or datetime.now())
+        return self.between(now - window, now + _MICROSECOND)
+
+    def _read_all(self, key: str) -> list[Example]:
+        """Read a segment, keeping the latest record per ID, sorted by created_at."""
+        with self._segment_path(key).open("rb") as f:
+            latest = {example.id: example for example in validate_examples_jsonl(f)}
+        return sorted(latest.values(), key=lambda e: _micros(e.created_at))
+
+    def _load_index(self, key: str) -> tuple[array[int], array[int]]:
+        data = array("q")
+        data.frombytes(self._index_path(key).read_bytes())
+        count = (len(data) - 1) // 2
+        return data[:count], data[count:]
+
+    def _read_indexed(self, key: str, lo: int, hi: int) -> list[Example]:
+        times, offsets = self._load_index(key)
+        first = bisect_left(times, lo)
+        last = bisect_left(times, hi)
+        if first >= last:
+            return []
+        with self._segment_path(key).open("rb") as f:
+            f.seek(offsets[first])
+            chunk = f.read(offsets[last] - offsets[first])
+        return validate_examples_jsonl(chunk.splitlines())
+
+    def expire(self, now: datetime | None = None) -> list[str]:
+        """
+        Delete segments whose bucket ended before the retention window.
+
+        Returns:
+            Names of the deleted segments
+        """
+        if self.retention_hours is None:
+            return []
+        now = _naive(now or datetime.now())
+        cutoff = now - timedelta(hours=self.retention_hours)
+        expired: list[str] = []
+        with self._lock:
+            for key in self.segments():
+                if self.bucket(key) + self._span > cutoff:
+                    break
+                self._index_path(key).unlink(missing_ok=True)
+                self._segment_path(key).unlink(missing_ok=True)
+                expired.append(key)
+        return expired
+
+    def compact(self, now: datetime | None = None) -> CompactionReport:
+        """
+        Expire old segments, then sort and index every closed, unsorted segment.
+
+        Args:
+            now: Reference time for closing and retention (default: now)
+
+        Returns:
+            CompactionReport listing expired and compacted segments
+        """
+        now = _naive(now or datetime.now())
+        report = CompactionReport(expired=self.expire(now))
+        for key in self.segments():
+            if self.bucket(key) + self._span > now:
+                break
+            if self.is_compacted(key):
+                continue
+            kept, dropped = self.compact_segment(key)
+            report.compacted.append(key)
+            report.records += kept
+            report.duplicates += dropped
+        return report
+
+    def compact_segment(self, key: str) -> tuple[int, int]:
+        """
+        Rewrite one segment sorted by created_at and write its index.
+
+        Returns:
+            (records kept, superseded records dropped)
+        """
+        with self._lock:
+            path = self._segment_path(key)
+            with path.open("rb") as f:
+                total = sum(1 for line in f if line.strip())
+            examples = self._read_all(key)
+
+            lines = [e.model_dump_json().encode() + b"\n" for e in examples]
+            offsets = array("q", [0])
+            for line in lines:
+                offsets.append(offsets[-1] + len(line))
+            times = array("q", (_micros(e.created_at) for e in examples))
+
+            _write_atomic(path, b"".join(lines))
+            _write_atomic(self._index_path(key), times.tobytes() + offsets.tobytes())
+        return len(examples), total - len(examples)
@@ -0,0 +1,433 @@
+"""
+Consistent-hash sharding of the example store across directories.
+
+ShardedStore spreads examples and results over N SQLite repositories under
+``data_dir/shards/<NNN>/``. Each example is routed by its shard key, the
+``Settings.shard_key`` metadata entry (the tenant by default) or its ID when
+that entry is missing; results are routed by their example ID. Routing uses
+a hash ring with virtual nodes, so changing N moves only about 1/N of the
+keys instead of reshuffling everything.
+
+Writes are grouped by shard and each group is written with one bulk upsert,
+with groups for different shards written in parallel; shards never contend
+on a single database file. Scans and compaction fan out across shards the
+same way.
+
+Changing the shard count is an online rebalance: new writes are routed with
+the new ring immediately, point lookups fall back to the previous ring, and
+rows that changed owner are copied (never overwriting a newer row) and then
+removed from their old shard. The shard count in effect is recorded in
+``ring.json``; an interrupted rebalance is resumed by calling ``rebalance``
+again. Coordination is per process: run rebalancing while other processes
+are not writing.
+
+The unsharded database (``data_dir/<sqlite_filename>``) is the one-shard
+starting point: when a sharded store is first created next to it, its rows
+are imported into shard 0, the file is removed, and the store is then
+rebalanced onto the requested shard count. Once ``ring.json`` exists the
+sharded store is the store of record, whatever ``SHARD_COUNT`` says.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import shutil
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, Field
+
+from my_project.config import get_settings
+from my_project.repository import SQLiteRepository
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from datetime import datetime
+    from pathlib import Path
+
+    from my_project.config import Settings
+    from my_project.models import Example, Result, Status
+
+SHARDS_DIR = "shards"
+RING_FILE = "ring.json"
+DEFAULT_VNODES = 64
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent-hash ring mapping keys to shard numbers.
+
+    Args:
+        shards: Number of shards
+        vnodes: Virtual nodes per shard; more nodes give a more even spread
+    """
+
+    def __init__(self, shards: int, vnodes: int = DEFAULT_VNODES) -> None:
+        if shards < 1 or vnodes < 1:
+            raise ValueError("shards and vnodes must be at least 1")
+        self.shards = shards
+        points = sorted(
+            (_hash(f"{shard}:{v}"), shard) for shard in range(shards) for v in range(vnodes)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> int:
+        """Shard owning a key: the first ring point clockwise from its hash."""
+        index = bisect_right(self._points, _hash(key))
+        return self._owners[index % len(self._points)]
+
+
+class RebalanceReport(BaseModel):
+    """Summary of a shard rebalance."""
+
+    previous: int = Field(..., description="Shard count before the rebalance")
+    shards: int = Field(..., description="Shard count after the rebalance")
+    examples_moved: int = Field(default=0, description="Examples copied to a new owner")
+    results_moved: int = Field(default=0, description="Results copied to a new owner")
+    seconds: float = Field(default=0.0, description="Wall time of the rebalance")
+
+
+class ShardedStore:
+    """
+    SQLite example and result store sharded by consistent hashing.
+
+    Exposes the write and lookup methods of SQLiteRepository, so it can be
+    passed wherever a repository is written through.
+
+    Args:
+        root: Directory holding the shard directories and ``ring.json``
+        shard_count: Shards to use when the store is new; an existing store
+            keeps its recorded count until ``rebalance`` is called
+        shard_key: Example metadata entry to route by (falls back to the ID)
+        filename: Database file name inside each shard directory
+        batch_size: Rows per transaction for bulk writes
+        seed: Unsharded database imported, then removed, when the store is new
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        shard_count: int = 1,
+        *,
+        shard_key: str = "tenant",
+        filename: str = "my_project.sqlite3",
+        batch_size: int = 1000,
+        seed: Path | None = None,
+    ) -> None:
+        self.root = root
+        self.shard_key = shard_key
+        self.filename = filename
+        self.batch_size = batch_size
+        self._repositories: dict[int, SQLiteRepository] = {}
+        self._lock = threading.Lock()
+        self._writers: Counter[int] = Counter()
+        self._writers_done = threading.Condition(self._lock)
+        self._rebalancing = threading.Lock()
+        # Long-lived workers, so each keeps reusing its per-thread connections.
+        self._pool = ThreadPoolExecutor(thread_name_prefix="shard")
+
+        root.mkdir(parents=True, exist_ok=True)
+        state = self._read_state()
+        if state is not None or seed is None or not seed.exists():
+            seed = None
+        if state is None:
+            state = {"shards": 1 if seed else shard_count}
+            if seed is not None:
+                self._import(seed)
+            self._write_state(state)
+        self._ring = HashRing(state["shards"])
+        self._previous = HashRing(state["previous"]) if "previous" in state else None
+        self._generation = 0
+        if seed is not None:
+            _remove_database(seed)
+            if shard_count != 1:
+                self.rebalance(shard_count)
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> ShardedStore:
+        """Open the sharded store at ``data_dir / shards``."""
+        settings = settings or get_settings()
+        return cls(
+            settings.data_dir / SHARDS_DIR,
+            settings.shard_count,
+            shard_key=settings.shard_key,
+            filename=settings.sqlite_filename,
+            batch_size=settings.sqlite_batch_size,
+            seed=settings.data_dir / settings.sqlite_filename,
+        )
+
+    @property
+    def shard_count(self) -> int:
+        """Number of shards new writes are routed across."""
+        return self._ring.shards
+
+    def _read_state(self) -> dict[str, int] | None:
+        path = self.root / RING_FILE
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def _write_state(self, state: dict[str, int]) -> None:
+        tmp = self.root / f"{RING_FILE}.tmp"
+        tmp.write_text(json.dumps(state))
+        tmp.replace(self.root / RING_FILE)
+
+    def _import(self, seed: Path) -> None:
+        """Copy every row of an unsharded database into shard 0."""
+        target = self.repository(0)
+        with SQLiteRepository(seed, batch_size=self.batch_size) as source:
+            for page in source.iter_examples():
+                target.upsert_examples(page, replace=False)
+            for page in source.iter_results():
+                target.upsert_results(page, replace=False)
+
+    def repository(self, shard: int) -> SQLiteRepository:
+        """Repository for one shard, opened on first use."""
+        with self._lock:
+            repo = self._repositories.get(shard)
+            if repo is None:
+                path = self.root / f"{shard:03d}" / self.filename
+                repo = SQLiteRepository(path, batch_size=self.batch_size)
+                self._repositories[shard] = repo
+            return repo
+
+    def close(self) -> None:
+        """Stop the worker threads and close every shard repository."""
+        self._pool.shutdown()
+        with self._lock:
+            for repo in self._repositories.values():
+                repo.close()
+            self._repositories.clear()
+
+    def __enter__(self) -> ShardedStore:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def key_for(self, example: Example) -> str:
+        """Routing key of an example."""
+        return example.metadata.get(self.shard_key) or example.id
+
+    def shard_for(self, example: Example) -> int:
+        """Shard that owns an example under the current ring."""
+        return self._ring.shard_for(self.key_for(example))
+
+    def _fan_out[T](self, fn: Callable[[int], T], shards: Iterable[int]) -> list[T]:
+        shards = list(shards)
+        if len(shards) <= 1:
+            return [fn(shard) for shard in shards]
+        return list(self._pool.map(fn, shards))
+
+    def _all_shards(self) -> range:
+        previous = self._previous.shards if self._previous else 0
+        return range(max(self.shard_count, previous))
+
+    def _write[T](
+        self,
+        items: Iterable[T],
+        route: Callable[[HashRing, T], int],
+        write: Callable[[SQLiteRepository, list[T]], int],
+    ) -> int:
+        """Group items by shard under the current ring and bulk-write each group."""
+        with self._lock:
+            ring = self._ring
+            generation = self._generation
+            self._writers[generation] += 1
+        try:
+            groups: dict[int, list[T]] = {}
+            for item in items:
+                groups.setdefault(route(ring, item), []).append(item)
+            return sum(
+                self._fan_out(lambda shard: write(self.repository(shard), groups[shard]), groups)
+            )
+        finally:
+            with self._lock:
+                self._writers[generation] -= 1
+                self._writers_done.notify_all()
+
+    def upsert_examples(self, examples: Iterable[Example]) -> int:
+        """
+        Insert or update examples, grouped into one bulk write per shard.
+
+        Returns:
+            Number of examples written
+        """
+        return self._write(
+            examples,
+            lambda ring, e: ring.shard_for(self.key_for(e)),
+            lambda repo, group: repo.upsert_examples(group),
+        )
+
+    def upsert_results(self, results: Iterable[Result]) -> int:
+        """
+        Insert or update results, routed by their example ID.
+
+        Returns:
+            Number of results written
+        """
+        return self._write(
+            results,
+            lambda ring, r: ring.shard_for(_result_key(r)),
+            lambda repo, group: repo.upsert_results(group),
+        )
+
+    def _lookup[T](self, key: str, fetch: Callable[[SQLiteRepository], T | None]) -> T | None:
+        found = fetch(self.repository(self._ring.shard_for(key)))
+        previous = self._previous
+        if found is None and previous is not None:
+            found = fetch(self.repository(previous.shard_for(key)))
+        return found
+
+    def get_example(self, example_id: str, tenant: str | None = None) -> Example | None:
+        """
+        Fetch one example.
+
+        Args:
+            example_id: Example ID
+            tenant: The example's shard key value, if it has one
+        """
+        return self._lookup(tenant or example_id, lambda repo: repo.get_example(example_id))
+
+    def result_for(self, example_id: str) -> Result | None:
+        """Fetch the stored result for an example ID."""
+        return self._lookup(example_id, lambda repo: repo.result_for(example_id))
+
+    def examples_between(
+        self, start: datetime, end: datetime, status: Status | None = None
+    ) -> list[Example]:
+        """
+        Fetch examples created in ``[start, end)`` across all shards, oldest first.
+
+        Shards are scanned in parallel and their sorted results merged.
+        """
+        per_shard = self._fan_out(
+            lambda shard: self.repository(shard).examples_between(start, end, status),
+            self._all_shards(),
+        )
+        seen: set[str] = set()
+        merged: list[Example] = []
+        for example in heapq.merge(*per_shard, key=lambda e: e.created_at):
+            # Mid-rebalance an example can briefly exist on two shards.
+            if example.id not in seen:
+                seen.add(example.id)
+                merged.append(example)
+        return merged
+
+    def count_examples(self, status: Status | None = None) -> int:
+        """Count examples across shards (may overcount during a rebalance)."""
+        return sum(
+            self._fan_out(
+                lambda shard: self.repository(shard).count_examples(status), self._all_shards()
+            )
+        )
+
+    def compact(self) -> int:
+        """
+        Compact every shard database in parallel.
+
+        Returns:
+            Number of shards compacted
+        """
+        return len(
+            self._fan_out(lambda shard: self.repository(shard).compact(), self._all_shards())
+        )
+
+    def rebalance(self, shard_count: int) -> RebalanceReport:
+        """
+        Change the shard count while the store stays readable and writable.
+
+        Args:
+            shard_count: New number of shards
+
+        Returns:
+            RebalanceReport with the number of rows moved
+        """
+        with self._rebalancing:
+            started = time.perf_counter()
+            with self._lock:
+                old = self._previous or self._ring
+                self._previous = old
+                self._ring = HashRing(shard_count)
+                self._generation += 1
+                # Let writes routed with the old ring land before scanning.
+                while any(count for gen, count in self._writers.items() if gen < self._generation):
+                    self._writers_done.wait()
+            self._write_state({"shards": shard_count, "previous": old.shards})
+
+            sources = range(max(old.shards, shard_count))
+            moved = self._fan_out(self._migrate, sources)
+            for shard in range(shard_count, old.shards):
+                self._drop_shard(shard)
+
+            with self._lock:
+                self._previous = None
+            self._write_state({"shards": shard_count})
+            return RebalanceReport(
+                previous=old.shards,
+                shards=shard_count,
+                examples_moved=sum(m[0] for m in moved),
+                results_moved=sum(m[1] for m in moved),
+                seconds=time.perf_counter() - started,
+            )
+
+    def _migrate(self, source: int) -> tuple[int, int]:
+        """Move rows on one shard that the current ring assigns elsewhere."""
+        repo = self.repository(source)
+        ring = self._ring
+
+        examples_moved = 0
+        for page in repo.iter_examples():
+            groups = _group(page, lambda e: ring.shard_for(self.key_for(e)), exclude=source)
+            for shard, group in groups.items():
+                self.repository(shard).upsert_examples(group, replace=False)
+                repo.delete_examples(e.id for e in group)
+                examples_moved += len(group)
+
+        results_moved = 0
+        for page in repo.iter_results():
+            # Results without an example ID cannot be addressed; leave them be.
+            keyed = [r for r in page if _result_key(r)]
+            groups = _group(keyed, lambda r: ring.shard_for(_result_key(r)), exclude=source)
+            for shard, group in groups.items():
+                self.repository(shard).upsert_results(group, replace=False)
+                repo.delete_results(_result_key(r) for r in group)
+                results_moved += len(group)
+        return examples_moved, results_moved
+
+    def _drop_shard(self, shard: int) -> None:
+        """Remove a shard that no longer owns any keys, if it is empty."""
+        repo = self.repository(shard)
+        if repo.count_examples() or any(True for _ in repo.iter_results()):
+            return
+        with self._lock:
+            self._repositories.pop(shard, None)
+        repo.close()
+        shutil.rmtree(repo.path.parent, ignore_errors=True)
+
+
+def _group[T](items: Iterable[T], route: Callable[[T], int], exclude: int) -> dict[int, list[T]]:
+    groups: dict[int, list[T]] = {}
+    for item in items:
+        shard = route(item)
+        if shard != exclude:
+            groups.setdefault(shard, []).append(item)
+    return groups
+
+
+def _remove_database(path: Path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def _result_key(result: Result) -> str:
+    return str(result.data.get("id", "")) if result.data else ""
@@ -0,0 +1,372 @@
+"""
+Memory-bounded streaming for large ``run`` inputs.
+
+A streaming run is three stages connected by bounded queues::
+
+    reader --> [input queue] --> processor pool --> [output queue] --> writer
+
+The reader groups input lines into chunks, processor threads run each chunk
+through a pipeline, and the writer emits results as JSON lines in input
+order. Each queue tracks how many items are resident in the stage after it
+(queued *or* being worked on, including results the writer is holding back
+to restore order), and applies backpressure with hysteresis: once the high
+watermark is reached, producers block until consumers drain it to the low
+watermark. Memory therefore stays proportional to the watermarks plus one
+chunk per worker, rather than to the input size.
+
+The reader also enforces an optional RSS ceiling: while the process is above
+it, no new chunks are admitted; if the ceiling is still exceeded once
+everything in flight has drained, the run fails with MemoryLimitError.
+"""
+
+from __future__ import annotations
+
+import gc
+import resource
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from pydantic import BaseModel, Field
+
+from my_project.config import get_settings
+from my_project.core import persistent_pipeline, process_batch
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from my_project.config import Settings
+    from my_project.pipeline import Pipeline
+    from my_project.repository import SQLiteRepository
+    from my_project.workload import WorkloadRecorder
+
+# How long the reader sleeps between RSS checks while over the ceiling.
+_RSS_POLL_SECONDS = 0.05
+
+
+class MemoryLimitError(RuntimeError):
+    """Raised when RSS stays above the configured ceiling with nothing in flight."""
+
+
+class _Aborted(Exception):
+    """Internal signal that another stage failed."""
+
+
+class StreamReport(BaseModel):
+    """Summary of a streaming run."""
+
+    items: int = Field(default=0, description="Input items processed")
+    failed: int = Field(default=0, description="Items whose Result was unsuccessful")
+    chunks: int = Field(default=0, description="Chunks processed")
+    seconds: float = Field(default=0.0, description="Wall time of the run")
+    peak_rss_mb: float = Field(default=0.0, description="Peak resident set size in MiB")
+    peak_queued: int = Field(default=0, description="Most items resident in any queue stage")
+    rss_throttled: int = Field(default=0, description="Times the reader paused for the RSS limit")
+
+
+def current_rss_mb() -> float | None:
+    """Return current RSS in MiB, or None where it cannot be read cheaply."""
+    try:
+        pages = int(Path("/proc/self/statm").read_bytes().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * resource.getpagesize() / (1024 * 1024)
+
+
+def peak_rss_mb() -> float:
+    """Return the process's peak RSS in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class WatermarkQueue:
+    """
+    FIFO with weight-based backpressure and high/low watermark hysteresis.
+
+    ``put`` adds an entry and its weight; ``get`` hands out entries without
+    releasing their weight; the consumer calls ``release`` once it no longer
+    holds the entry's data. Producers block from the moment the resident
+    weight reaches ``high`` until it falls to ``low``.
+    """
+
+    def __init__(self, high: int, low: int) -> None:
+        if not 0 <= low < high:
+            raise ValueError("Watermarks must satisfy 0 <= low < high")
+        self.high = high
+        self.low = low
+        self.weight = 0
+        self.peak = 0
+        self._entries: deque[Any] = deque()
+        self._cond = threading.Condition()
+        self._throttled = False
+        self._closed = False
+        self._aborted = False
+
+    def wait_for_capacity(self) -> None:
+        """Block while the queue is above its watermark."""
+        with self._cond:
+            self._wait_for_capacity()
+
+    def _wait_for_capacity(self) -> None:
+        while self._throttled and not self._aborted:
+            self._cond.wait()
+        if self._aborted:
+            raise _Aborted
+
+    def put(self, entry: Any, weight: int = 1, block: bool = True) -> None:
+        """
+        Add an entry.
+
+        Args:
+            entry: Entry to enqueue
+            weight: Items the entry accounts for
+            block: Wait while the queue is above its watermark first
+        """
+        with self._cond:
+            if block:
+                self._wait_for_capacity()
+            elif self._aborted:
+                raise _Aborted
+            self._entries.append(entry)
+            self.weight += weight
+            self.peak = max(self.peak, self.weight)
+            if self.weight >= self.high:
+                self._throttled = True
+            self._cond.notify_all()
+
+    def get(self) -> tuple[bool, Any]:
+        """
+        Take the next entry.
+
+        Returns:
+            (True, entry), or (False, None) once closed and drained
+        """
+        with self._cond:
+            while not self._entries and not self._closed and not self._aborted:
+                self._cond.wait()
+            if self._aborted:
+                raise _Aborted
+            if not self._entries:
+                return False, None
+            return True, self._entries.popleft()
+
+    def release(self, weight: int = 1) -> None:
+        """Release weight held by a consumed entry, waking producers at the low watermark."""
+        with self._cond:
+            self.weight -= weight
+            if self._throttled and self.weight <= self.low:
+                self._throttled = False
+                self._cond.notify_all()
+
+    def wait_empty(self) -> None:
+        """Block until no weight is resident."""
+        with self._cond:
+            while self.weight > 0 and not self._aborted:
+                self._cond.wait(timeout=_RSS_POLL_SECONDS)
+            if self._aborted:
+                raise _Aborted
+
+    def close(self) -> None:
+        """Signal that no more entries will be put."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def abort(self) -> None:
+        """Wake every waiter and make further calls raise."""
+        with self._cond:
+            self._aborted = True
+            self._cond.notify_all()
+
+
+def _chunks(lines: Iterable[str], size: int) -> Iterator[list[str]]:
+    chunk: list[str] = []
+    for line in lines:
+        name = line.strip()
+        if not name:
+            continue
+        chunk.append(name)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _StreamRun:
+    def __init__(
+        self,
+        pipeline: Pipeline | None,
+        settings: Settings,
+        workers: int,
+        chunk_size: int,
+        recorder: WorkloadRecorder | None = None,
+    ) -> None:
+        self.pipeline = pipeline
+        self.recorder = recorder
+        self.settings = settings
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.inbox = WatermarkQueue(settings.stream_high_watermark, settings.stream_low_watermark)
+        self.outbox = WatermarkQueue(settings.stream_high_watermark, settings.stream_low_watermark)
+        self.report = StreamReport()
+        self.errors: list[BaseException] = []
+        self._lock = threading.Lock()
+
+    def fail(self, exc: BaseException) -> None:
+        with self._lock:
+            self.errors.append(exc)
+        self.inbox.abort()
+        self.outbox.abort()
+
+    def _admit(self) -> None:
+        """Hold the reader while RSS is above the ceiling."""
+        limit = self.settings.max_rss_mb
+        if not limit:
+            return
+        rss = current_rss_mb()
+        if rss is None or rss <= limit:
+            return
+
+        self.report.rss_throttled += 1
+        while True:
+            self.inbox.wait_empty()
+            self.outbox.wait_empty()
+            gc.collect()
+            rss = current_rss_mb()
+            if rss is None or rss <= limit:
+                return
+            if self.inbox.weight == 0 and self.outbox.weight == 0:
+                raise MemoryLimitError(
+                    f"RSS {rss:.1f} MiB exceeds max_rss_mb={limit} with nothing in flight"
+                )
+            time.sleep(_RSS_POLL_SECONDS)
+
+    def read(self, lines: Iterable[str]) -> None:
+        try:
+            for seq, chunk in enumerate(_chunks(lines, self.chunk_size)):
+                self._admit()
+                self.inbox.put((seq, chunk), weight=len(chunk))
+        except _Aborted:
+            return
+        except BaseException as e:
+            self.fail(e)
+        finally:
+            self.inbox.close()
+
+    def process(self) -> None:
+        try:
+            while True:
+                # Wait for output capacity *before* taking work: a worker that
+                # holds a chunk must always be able to hand it on, or the
+                # writer could stall waiting for that chunk's sequence number.
+                self.outbox.wait_for_capacity()
+                ok, entry = self.inbox.get()
+                if not ok:
+                    return
+                seq, chunk = entry
+                started = time.perf_counter()
+                results = process_batch(chunk, pipeline=self.pipeline).outputs
+                if self.recorder is not None:
+                    self.recorder.record_batch(
+                        chunk, results, started, time.perf_counter() - started
+                    )
+                self.outbox.put((seq, results), weight=len(results), block=False)
+                self.inbox.release(len(chunk))
+        except _Aborted:
+            return
+        except BaseException as e:
+            self.fail(e)
+
+    def write(self, output: IO[str]) -> None:
+        pending: dict[int, list[Any]] = {}
+        next_seq = 0
+        try:
+            while True:
+                ok, entry = self.outbox.get()
+                if not ok:
+                    break
+                seq, results = entry
+                pending[seq] = results
+                while next_seq in pending:
+                    batch = pending.pop(next_seq)
+                    output.write("".join(r.model_dump_json() + "\n" for r in batch))
+                    self.report.items += len(batch)
+                    self.report.failed += sum(1 for r in batch if not r.success)
+                    self.report.chunks += 1
+                    self.outbox.release(len(batch))
+                    next_seq += 1
+        except _Aborted:
+            return
+        except BaseException as e:
+            self.fail(e)
+
+
+def stream_run(
+    lines: Iterable[str],
+    output: IO[str],
+    pipeline: Pipeline | None = None,
+    *,
+    settings: Settings | None = None,
+    workers: int = 1,
+    chunk_size: int | None = None,
+    repository: SQLiteRepository | None = None,
+    recorder: WorkloadRecorder | None = None,
+) -> StreamReport:
+    """
+    Process a stream of names with bounded memory.
+
+    Args:
+        lines: Input lines, one name per line (blank lines are skipped)
+        output: Text stream receiving one JSON Result per line, in input order
+        pipeline: Pipeline for processing (default: the core default pipeline)
+        settings: Settings supplying watermarks and the RSS ceiling
+        workers: Processor threads
+        chunk_size: Names per chunk (default: Settings.stream_chunk_size)
+        repository: Write examples and results through to this repository
+        recorder: Capture each processed name for later replay
+
+    Returns:
+        StreamReport with counts, timing and peak memory
+
+    Raises:
+        MemoryLimitError: If RSS cannot be brought under max_rss_mb
+    """
+    settings = settings or get_settings()
+    size = chunk_size or settings.stream_chunk_size
+    if workers < 1 or size < 1:
+        raise ValueError("workers and chunk_size must be at least 1")
+
+    if repository is not None:
+        pipeline = persistent_pipeline(repository, pipeline)
+    run = _StreamRun(pipeline, settings, workers, size, recorder)
+    started = time.perf_counter()
+
+    reader = threading.Thread(target=run.read, args=(lines,), name="stream-reader")
+    processors = [
+        threading.Thread(target=run.process, name=f"stream-worker-{i}") for i in range(workers)
+    ]
+    reader.start()
+    for thread in processors:
+        thread.start()
+
+    writer = threading.Thread(target=run.write, args=(output,), name="stream-writer")
+    writer.start()
+    reader.join()
+    for thread in processors:
+        thread.join()
+    run.outbox.close()
+    writer.join()
+
+    if run.errors:
+        raise run.errors[0]
+
+    report = run.report
+    report.seconds = time.perf_counter() - started
+    report.peak_queued = max(run.inbox.peak, run.outbox.peak)
+    report.peak_rss_mb = peak_rss_mb()
+    return report
@@ -0,0 +1,245 @@
+"""
+Lightweight tracing spans with a Chrome trace-event exporter.
+
+Code marks the work it does with ``span``::
+
+    with span("create_example", name=name):
+        ...
+
+Spans only cost anything while a Tracer is installed with ``start_tracing``.
+Otherwise ``span`` returns a shared no-op context manager after one global
+lookup, so instrumentation can stay in hot paths.
+
+Sampling is head-based: the outermost span on a thread (the root) decides
+whether its whole trace is recorded, with probability ``sample_rate``, and
+every span nested under it follows that decision. An unsampled trace costs
+one context-variable lookup per nested span. Worker threads start without a
+trace, so their first span is a root of its own; a streamed run is sampled
+per chunk rather than all or nothing.
+
+``Tracer.export`` writes the recorded spans as Chrome trace-event JSON under
+``log_dir/traces``. Open the file in https://ui.perfetto.dev or
+``chrome://tracing``; nested spans on a thread show as a flame chart.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from my_project.config import get_settings
+
+if TYPE_CHECKING:
+    from contextlib import AbstractContextManager
+    from contextvars import Token
+    from pathlib import Path
+
+    from my_project.config import Settings
+
+TRACE_DIR = "traces"
+TRACE_SUFFIX = ".trace.json"
+
+# Spans kept per tracer before new ones are dropped, bounding memory.
+DEFAULT_MAX_EVENTS = 200_000
+
+_NOOP: AbstractContextManager[None] = nullcontext()
+
+# Sampling decision of the trace the current thread is in; None outside any.
+_sampled: ContextVar[bool | None] = ContextVar("my_project_trace_sampled", default=None)
+
+
+class _Installed:
+    """Process-wide tracer slot, shared by every thread."""
+
+    tracer: Tracer | None = None
+
+
+class Tracer:
+    """
+    Collects sampled spans in memory and exports them as a Chrome trace.
+
+    Args:
+        path: File the trace is exported to
+        sample_rate: Fraction of root spans whose traces are recorded
+        max_events: Spans kept before further ones are dropped
+        seed: Seed for the sampling decisions, for reproducible runs
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        sample_rate: float = 1.0,
+        max_events: int = DEFAULT_MAX_EVENTS,
+        seed: int | None = None,
+    ) -> None:
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_events = max_events
+        self.roots = 0
+        self.sampled = 0
+        self.dropped = 0
+        self._events: list[dict[str, Any]] = []
+        self._threads: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    @classmethod
+    def create(cls, settings: Settings | None = None, sample_rate: float | None = None) -> Tracer:
+        """Start a tracer exporting to a new file under ``log_dir / traces``."""
+        settings = settings or get_settings()
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+        path = settings.log_dir / TRACE_DIR / f"{stamp}-{os.getpid()}{TRACE_SUFFIX}"
+        rate = settings.trace_sample_rate if sample_rate is None else sample_rate
+        return cls(path, rate)
+
+    @property
+    def events(self) -> int:
+        """Spans recorded so far."""
+        return len(self._events)
+
+    def _sample(self) -> bool:
+        with self._lock:
+            self.roots += 1
+            keep = self.sample_rate >= 1 or self._random.random() < self.sample_rate
+            self.sampled += keep
+            return keep
+
+    def _record(self, name: str, start_ns: int, end_ns: int, args: dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        tid = thread.native_id or thread.ident or 0
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": (start_ns - self._origin) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self._pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                return
+            self._events.append(event)
+            self._threads.setdefault(tid, thread.name)
+
+    def export(self) -> Path:
+        """
+        Write the recorded spans as Chrome trace-event JSON.
+
+        Returns:
+            Path of the written trace
+        """
+        with self._lock:
+            metadata = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": n},
+                }
+                for tid, n in self._threads.items()
+            ]
+            trace = {
+                "traceEvents": metadata + self._events,
+                "displayTimeUnit": "ms",
+                "otherData": {
+                    "sample_rate": self.sample_rate,
+                    "roots": self.roots,
+                    "sampled": self.sampled,
+                    "dropped": self.dropped,
+                },
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(trace, separators=(",", ":")), encoding="utf-8")
+        return self.path
+
+
+class _Span:
+    __slots__ = ("_args", "_name", "_root", "_start", "_token", "_tracer")
+
+    def __init__(self, tracer: Tracer, name: str, args: dict[str, Any], root: bool) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._root = root
+        self._token: Token[bool | None] | None = None
+        self._start = 0
+
+    def __enter__(self) -> None:
+        if self._root:
+            self._token = _sampled.set(True)
+        self._start = time.perf_counter_ns()
+
+    def __exit__(self, *_exc: object) -> None:
+        end = time.perf_counter_ns()
+        if self._token is not None:
+            _sampled.reset(self._token)
+        self._tracer._record(self._name, self._start, end, self._args)
+
+
+class _Unsampled:
+    """Root of a trace that was not sampled; silences the spans under it."""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> None:
+        self._token = _sampled.set(False)
+
+    def __exit__(self, *_exc: object) -> None:
+        _sampled.reset(self._token)
+
+
+def span(name: str, /, **args: Any) -> AbstractContextManager[None]:
+    """
+    Time a block of work as a trace span.
+
+    Args:
+        name: Span name shown in the trace viewer
+        **args: JSON-serializable details attached to the span
+
+    Returns:
+        Context manager; a shared no-op when tracing is off or the
+        enclosing trace was not sampled
+    """
+    tracer = _Installed.tracer
+    if tracer is None:
+        return _NOOP
+    sampled = _sampled.get()
+    if sampled is None:
+        if not tracer._sample():
+            return _Unsampled()
+        return _Span(tracer, name, args, root=True)
+    if not sampled:
+        return _NOOP
+    return _Span(tracer, name, args, root=False)
+
+
+def start_tracing(tracer: Tracer) -> Tracer:
+    """Install a tracer for every thread in the process."""
+    _Installed.tracer = tracer
+    return tracer
+
+
+def stop_tracing() -> Tracer | None:
+    """Uninstall the current tracer and return it."""
+    tracer, _Installed.tracer = _Installed.tracer, None
+    return tracer
+
+
+def current_tracer() -> Tracer | None:
+    """The installed tracer, if any."""
+    return _Installed.tracer
@@ -0,0 +1,362 @@
+"""
+Shared-memory result transport for multi-process runs.
+
+``process_parallel`` fans names out to worker processes. Instead of pickling
+every Result back to the parent, workers encode each one as a fixed-layout
+record and push it into a ring buffer in ``multiprocessing.shared_memory``.
+The parent copies raw records into a flat buffer indexed by input position
+and returns a SharedResults sequence that decodes records lazily: Pydantic
+Result objects are only built for the items a caller actually indexes.
+
+Record layout (little-endian, RECORD.size bytes)::
+
+    Q   input index
+    B   flags (bit 0: success, bit 1: overflow)
+    H   id length        H   name length        H   error length
+    64s id               512s name (UTF-8)      256s error (UTF-8)
+
+Records carry the fields of the standard process_example result; the
+message is reconstructed from them. A Result the record cannot reproduce
+exactly (text longer than its slot, extra ``data`` keys, a custom message)
+is flagged as overflow and also sent pickled over a queue, so callers get
+the same Result as from the in-process pipeline. The record still holds its
+success flag and clipped fields for ``successes`` and ``raw``.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from multiprocessing.shared_memory import SharedMemory
+from queue import Empty
+from typing import TYPE_CHECKING, Any, overload
+
+from my_project.core import process_batch
+from my_project.models import Result, warm_models
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from multiprocessing.queues import Queue
+    from multiprocessing.synchronize import Lock, Semaphore
+
+    _Handle = tuple[str, int, Lock, Semaphore, Semaphore, Queue[tuple[int, Result]]]
+
+ID_SIZE = 64
+NAME_SIZE = 512
+ERROR_SIZE = 256
+RECORD = struct.Struct(f"<QBHHH{ID_SIZE}s{NAME_SIZE}s{ERROR_SIZE}s")
+
+FLAG_SUCCESS = 0x01
+FLAG_OVERFLOW = 0x02
+
+DEFAULT_CAPACITY = 4096
+
+# Seconds the parent waits for a record before checking worker health.
+_POLL_SECONDS = 0.5
+
+_FAILED_MESSAGE = "Processing failed"
+
+
+def _clip(text: str, size: int) -> tuple[bytes, bool]:
+    data = text.encode()
+    if len(data) <= size:
+        return data, False
+    return data[:size].decode(errors="ignore").encode(), True
+
+
+def _is_standard(result: Result) -> bool:
+    """True when decode_record can rebuild result from its fields alone."""
+    if not result.success:
+        return (
+            result.data is None and result.error is not None and (result.message == _FAILED_MESSAGE)
+        )
+    data = result.data
+    if data is None or data.keys() != {"id", "name"} or result.error is not None:
+        return False
+    name = data["name"]
+    return (
+        type(data["id"]) is str
+        and type(name) is str
+        and result.message == f"Successfully processed '{name}'"
+    )
+
+
+def encode_result(index: int, result: Result) -> bytes:
+    """
+    Pack a Result into a fixed-size record.
+
+    The record is flagged with FLAG_OVERFLOW when it cannot reproduce the
+    Result exactly; the caller must then deliver the Result another way.
+    """
+    data = result.data or {}
+    id_bytes, id_cut = _clip(str(data.get("id", "")), ID_SIZE)
+    name_bytes, name_cut = _clip(str(data.get("name", "")), NAME_SIZE)
+    error_bytes, error_cut = _clip(result.error or "", ERROR_SIZE)
+    exact = not (id_cut or name_cut or error_cut) and _is_standard(result)
+    flags = (FLAG_SUCCESS if result.success else 0) | (0 if exact else FLAG_OVERFLOW)
+    return RECORD.pack(
+        index,
+        flags,
+        len(id_bytes),
+        len(name_bytes),
+        len(error_bytes),
+        id_bytes,
+        name_bytes,
+        error_bytes,
+    )
+
+
+def decode_record(record: bytes | memoryview) -> Result:
+    """Build a Result from a packed record (lossy for overflow records)."""
+    _, flags, id_len, name_len, error_len, id_bytes, name_bytes, error_bytes = RECORD.unpack(record)
+    name = name_bytes[:name_len].decode()
+    if flags & FLAG_SUCCESS:
+        return Result(
+            success=True,
+            message=f"Successfully processed '{name}'",
+            data={"id": id_bytes[:id_len].decode(), "name": name},
+        )
+    return Result(
+        success=False,
+        message=_FAILED_MESSAGE,
+        error=error_bytes[:error_len].decode(),
+    )
+
+
+def _buffer(shm: SharedMemory) -> memoryview:
+    buf = shm.buf
+    if buf is None:
+        raise RuntimeError(f"Shared memory segment {shm.name} is closed")
+    return buf
+
+
+class ResultRing:
+    """
+    Multi-producer, single-consumer ring buffer of records in shared memory.
+
+    Producers serialize on a lock while copying a record into the next slot;
+    two semaphores count free slots and filled slots, so producers block
+    when the ring is full and the consumer blocks when it is empty. Results
+    behind overflow records travel pickled on the ``overflow`` queue.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        ctx = multiprocessing.get_context()
+        self.capacity = capacity
+        # The first 8 bytes hold the shared tail (next slot to write).
+        self.shm = SharedMemory(create=True, size=8 + capacity * RECORD.size)
+        _buffer(self.shm)[:8] = bytes(8)
+        self.lock: Lock = ctx.Lock()
+        self.items: Semaphore = ctx.Semaphore(0)
+        self.spaces: Semaphore = ctx.Semaphore(capacity)
+        self.overflow: Queue[tuple[int, Result]] = ctx.Queue()
+        self._head = 0
+
+    def handle(self) -> _Handle:
+        """Picklable handle for producers in child processes."""
+        return self.shm.name, self.capacity, self.lock, self.items, self.spaces, self.overflow
+
+    def get(self, timeout: float | None = None) -> bytes | None:
+        """Copy the next record out of the ring, or return None on timeout."""
+        if not self.items.acquire(timeout=timeout):
+            return None
+        offset = 8 + (self._head % self.capacity) * RECORD.size
+        record = bytes(_buffer(self.shm)[offset : offset + RECORD.size])
+        self._head += 1
+        self.spaces.release()
+        return record
+
+    def get_overflow(self, timeout: float | None = None) -> tuple[int, Result] | None:
+        """Receive the next (index, Result) sent for an overflow record, or None on timeout."""
+        try:
+            return self.overflow.get(timeout=timeout)
+        except Empty:
+            return None
+
+    def close(self) -> None:
+        """Release and unlink the shared memory segment and close the queue."""
+        self.overflow.close()
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attach to an existing segment owned by the parent process."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    # Earlier versions register the segment again, but multiprocessing
+    # children share the parent's resource tracker, so this is a no-op.
+    return SharedMemory(name=name)
+
+
+def _produce(handle: _Handle, start: int, names: list[str]) -> None:
+    """Worker entry point: process names and push records into the ring."""
+    name, capacity, lock, items, spaces, overflow = handle
+    shm = _attach(name)
+    try:
+        buf = _buffer(shm)
+        results = process_batch(names).outputs
+        for offset, result in enumerate(results):
+            record = encode_result(start + offset, result)
+            if record[8] & FLAG_OVERFLOW:
+                overflow.put((start + offset, result))
+            spaces.acquire()
+            with lock:
+                tail = int.from_bytes(buf[:8], "little")
+                position = 8 + (tail % capacity) * RECORD.size
+                buf[position : position + RECORD.size] = record
+                buf[:8] = (tail + 1).to_bytes(8, "little")
+            items.release()
+        del buf
+    finally:
+        shm.close()
+
+
+class SharedResults(Sequence[Result]):
+    """
+    Results of a parallel run, decoded lazily from packed records.
+
+    Indexing builds a Result on demand; ``successes`` and ``raw`` read fields
+    straight from the packed bytes without constructing any models. Items
+    whose record overflowed are served from ``overflow`` instead.
+    """
+
+    def __init__(
+        self, records: bytearray, count: int, overflow: dict[int, Result] | None = None
+    ) -> None:
+        self._records = records
+        self._count = count
+        self._overflow = overflow or {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> Result: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Result]: ...
+
+    def __getitem__(self, index: int | slice) -> Result | list[Result]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("SharedResults index out of range")
+        if index in self._overflow:
+            return self._overflow[index]
+        offset = index * RECORD.size
+        return decode_record(memoryview(self._records)[offset : offset + RECORD.size])
+
+    def __iter__(self) -> Iterator[Result]:
+        for i in range(self._count):
+            yield self[i]
+
+    @property
+    def successes(self) -> int:
+        """Count successful results by scanning flag bytes only."""
+        flags = self._records[8 :: RECORD.size]
+        return sum(flag & FLAG_SUCCESS for flag in flags)
+
+    def raw(self, index: int) -> tuple[bool, str, str, str]:
+        """Return (success, id, name, error) for one item without building a model."""
+        if not 0 <= index < self._count:
+            raise IndexError("SharedResults index out of range")
+        if index in self._overflow:
+            result = self._overflow[index]
+            data = result.data or {}
+            return (
+                result.success,
+                str(data.get("id", "")),
+                str(data.get("name", "")),
+                result.error or "",
+            )
+        _, flags, id_len, name_len, error_len, id_b, name_b, error_b = RECORD.unpack_from(
+            self._records, index * RECORD.size
+        )
+        return (
+            bool(flags & FLAG_SUCCESS),
+            id_b[:id_len].decode(),
+            name_b[:name_len].decode(),
+            error_b[:error_len].decode(),
+        )
+
+
+def _check_workers(procs: list[Any]) -> None:
+    dead = [p for p in procs if p.exitcode not in (None, 0)]
+    if dead:
+        raise RuntimeError(f"Worker exited with code {dead[0].exitcode}")
+
+
+def process_parallel(
+    names: Sequence[str],
+    processes: int | None = None,
+    capacity: int = DEFAULT_CAPACITY,
+) -> SharedResults:
+    """
+    Process names across worker processes with shared-memory result transport.
+
+    Args:
+        names: Names to process with the default pipeline
+        processes: Worker processes (default: CPU count)
+        capacity: Ring buffer slots; bounds shared memory to capacity * RECORD.size
+
+    Returns:
+        SharedResults in input order
+
+    Raises:
+        RuntimeError: If a worker process dies before delivering its records
+    """
+    total = len(names)
+    workers = max(1, min(processes or os.cpu_count() or 1, total))
+    records = bytearray(total * RECORD.size)
+    if total == 0:
+        return SharedResults(records, 0)
+
+    ring = ResultRing(capacity)
+    ctx = multiprocessing.get_context()
+    # Forked workers inherit the built validators instead of each building them.
+    warm_models()
+    received = 0
+    expected_overflow = 0
+    overflow: dict[int, Result] = {}
+    step = -(-total // workers)
+    procs: list[Any] = [
+        ctx.Process(target=_produce, args=(ring.handle(), start, list(names[start : start + step])))
+        for start in range(0, total, step)
+    ]
+    try:
+        for proc in procs:
+            proc.start()
+
+        while received < total:
+            record = ring.get(timeout=_POLL_SECONDS)
+            if record is None:
+                _check_workers(procs)
+                continue
+            index = int.from_bytes(record[:8], "little")
+            records[index * RECORD.size : (index + 1) * RECORD.size] = record
+            if record[8] & FLAG_OVERFLOW:
+                expected_overflow += 1
+            received += 1
+
+        while len(overflow) < expected_overflow:
+            item = ring.get_overflow(timeout=_POLL_SECONDS)
+            if item is None:
+                _check_workers(procs)
+                continue
+            overflow[item[0]] = item[1]
+    finally:
+        for proc in procs:
+            if proc.is_alive() and received < total:
+                proc.terminate()
+            proc.join()
+        ring.close()
+
+    return SharedResults(records, total, overflow)
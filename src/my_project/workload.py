@@ -0,0 +1,425 @@
+"""
+Workload capture and offline replay for ``run``.
+
+A capture records every name a run processed, when it started relative to
+the beginning of the run, how long it took and whether it succeeded. It is
+written under ``log_dir/captures`` as gzip-compressed JSON lines: a header
+object followed by one compact array per item::
+
+    {"format": "my-project-workload", "version": 1, "created": "...", "command": "run"}
+    [0.0, "alpha", 0.412, 1]
+    [1.734, "beta", 0.398, 0]
+    [2.101, "gamma", 0.051, 1, 1]
+
+The array fields are offset (ms), name, latency (ms), success (1/0) and, for
+items processed as part of a chunk, the chunk number. Streamed runs process
+names in chunks, so each chunked item records the chunk's start offset and
+its share of the chunk's wall time: a per-item average, not its own latency.
+
+Every batch of records is written with a zlib sync flush, so a run that is
+killed part-way still leaves a readable capture; ``load_capture`` keeps the
+records before the cut and marks the workload as truncated.
+
+``replay`` re-issues a capture against a target at the recorded pace,
+scaled by ``speed``, or as fast as possible with ``speed=0``. Recorded
+chunks are replayed as chunks, through the target's batch path, and their
+items are measured the same way they were recorded: the chunk's latency
+shared between its items. Latency is measured from each scheduled start, so
+time spent waiting for a free worker counts against it instead of hiding a
+backlog.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from pydantic import BaseModel, Field
+
+from my_project.config import get_settings
+from my_project.core import process_batch, process_example
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from pathlib import Path
+
+    from my_project.config import Settings
+    from my_project.models import Result
+
+CAPTURE_FORMAT = "my-project-workload"
+CAPTURE_VERSION = 1
+CAPTURE_DIR = "captures"
+CAPTURE_SUFFIX = ".jsonl.gz"
+
+# Seconds allowed for one item replayed through the CLI.
+_CLI_TIMEOUT = 60.0
+
+# Environment overrides for CLI replays; these beat values from .env.
+_CLI_ENV = {"CAPTURE_WORKLOADS": "false", "TRACE_SAMPLE_RATE": "0"}
+
+
+class CaptureRecord(NamedTuple):
+    """One captured item; times are in seconds, ``chunk`` is 0 outside chunks."""
+
+    offset: float
+    name: str
+    latency: float
+    success: bool
+    chunk: int = 0
+
+
+class Workload(NamedTuple):
+    """A loaded capture; ``truncated`` if the recording run was cut short."""
+
+    header: dict[str, Any]
+    records: list[CaptureRecord]
+    truncated: bool = False
+
+
+class WorkloadRecorder:
+    """
+    Thread-safe writer for a workload capture.
+
+    Args:
+        path: Capture file to create
+        command: Command being captured, stored in the header
+    """
+
+    def __init__(self, path: Path, command: str = "run") -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.records = 0
+        self.chunks = 0
+        self._lock = threading.Lock()
+        self._file = gzip.GzipFile(path, "wb")
+        self._started = time.perf_counter()
+        header = {
+            "format": CAPTURE_FORMAT,
+            "version": CAPTURE_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "command": command,
+        }
+        self._file.write(json.dumps(header).encode() + b"\n")
+        self._file.flush(zlib.Z_SYNC_FLUSH)
+
+    @classmethod
+    def create(cls, settings: Settings | None = None, command: str = "run") -> WorkloadRecorder:
+        """Start a new capture file under ``log_dir / captures``."""
+        settings = settings or get_settings()
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+        path = settings.log_dir / CAPTURE_DIR / f"{stamp}-{os.getpid()}{CAPTURE_SUFFIX}"
+        return cls(path, command)
+
+    def record(self, name: str, started: float, seconds: float, success: bool) -> None:
+        """
+        Record one item.
+
+        Args:
+            name: Input name
+            started: ``time.perf_counter()`` when the item started
+            seconds: Time the item took
+            success: Whether it succeeded
+        """
+        self._write([(name, started, seconds, success)])
+
+    def record_batch(
+        self, names: Sequence[str], results: Sequence[Result], started: float, seconds: float
+    ) -> None:
+        """
+        Record a chunk processed together, sharing its wall time between items.
+
+        The items are tagged with a chunk number so ``replay`` re-issues them
+        as one chunk.
+        """
+        if not names:
+            return
+        share = seconds / len(names)
+        items = [
+            (name, started, share, result.success)
+            for name, result in zip(names, results, strict=True)
+        ]
+        with self._lock:
+            self.chunks += 1
+            chunk = self.chunks
+        self._write(items, chunk)
+
+    def _write(self, items: list[tuple[str, float, float, bool]], chunk: int = 0) -> None:
+        tail = [chunk] if chunk else []
+        lines = "".join(
+            json.dumps(
+                [
+                    round((started - self._started) * 1000, 3),
+                    name,
+                    round(seconds * 1000, 3),
+                    int(ok),
+                    *tail,
+                ],
+                separators=(",", ":"),
+            )
+            + "\n"
+            for name, started, seconds, ok in items
+        )
+        with self._lock:
+            self._file.write(lines.encode())
+            # Make the batch decompressible on disk in case the run is killed.
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+            self.records += len(items)
+
+    def close(self) -> None:
+        """Flush and close the capture file."""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> WorkloadRecorder:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+def load_capture(path: Path) -> Workload:
+    """
+    Read a capture file.
+
+    A capture whose recording run was killed ends mid-stream; the records
+    before the cut are returned and the workload is marked truncated.
+
+    Raises:
+        ValueError: If the file is not a supported capture
+    """
+    records: list[CaptureRecord] = []
+    truncated = False
+    with gzip.open(path, "rb") as f:
+        try:
+            header = json.loads(f.readline())
+        except (EOFError, json.JSONDecodeError) as e:
+            raise ValueError(f"{path} is not a workload capture") from e
+        if not isinstance(header, dict) or header.get("format") != CAPTURE_FORMAT:
+            raise ValueError(f"{path} is not a workload capture")
+        if header.get("version") != CAPTURE_VERSION:
+            raise ValueError(f"Unsupported capture version {header.get('version')}")
+        try:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    truncated = True
+                    break
+                if line.strip():
+                    offset, name, latency, ok, *chunk = json.loads(line)
+                    records.append(
+                        CaptureRecord(
+                            offset / 1000, name, latency / 1000, bool(ok), chunk[0] if chunk else 0
+                        )
+                    )
+        except EOFError:
+            truncated = True
+    return Workload(header, records, truncated)
+
+
+def _percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * fraction))
+    return sorted_values[rank - 1]
+
+
+class ReplayReport(BaseModel):
+    """Results of replaying a capture."""
+
+    target: str = Field(..., description="Target the workload was replayed against")
+    speed: float = Field(..., description="Pace relative to the recording (0: unpaced)")
+    items: int = Field(default=0, description="Items replayed")
+    errors: int = Field(default=0, description="Items that failed")
+    seconds: float = Field(default=0.0, description="Wall time of the replay")
+    p50_ms: float = Field(default=0.0, description="Median latency")
+    p99_ms: float = Field(default=0.0, description="99th percentile latency")
+    max_ms: float = Field(default=0.0, description="Slowest item")
+    recorded_p50_ms: float = Field(default=0.0, description="Median latency in the capture")
+    recorded_p99_ms: float = Field(default=0.0, description="99th percentile in the capture")
+    chunked_items: int = Field(
+        default=0,
+        description="Items replayed in recorded chunks; their latencies are chunk averages",
+    )
+    truncated: bool = Field(default=False, description="Whether the capture was cut short")
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of items that failed."""
+        return self.errors / self.items if self.items else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Items per second."""
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def format(self) -> str:
+        """Render the report as text."""
+        pace = "unpaced" if self.speed == 0 else f"{self.speed:g}x speed"
+        return "\n".join(
+            [
+                f"Replayed {self.items} items against {self.target} ({pace}) in {self.seconds:.2f}s",
+                f"  throughput  {self.throughput:,.1f} items/s",
+                f"  latency     p50 {self.p50_ms:.2f}ms  p99 {self.p99_ms:.2f}ms  "
+                f"max {self.max_ms:.2f}ms",
+                f"  recorded    p50 {self.recorded_p50_ms:.2f}ms  p99 {self.recorded_p99_ms:.2f}ms",
+                f"  errors      {self.errors} ({self.error_rate:.2%})",
+                *(
+                    [
+                        f"  chunked     {self.chunked_items} items replayed as recorded chunks; "
+                        "their latencies (replayed and recorded) are per-item chunk averages"
+                    ]
+                    if self.chunked_items
+                    else []
+                ),
+                *(
+                    ["  capture     truncated (recording run was cut short)"]
+                    if self.truncated
+                    else []
+                ),
+            ]
+        )
+
+
+class _Target(NamedTuple):
+    """Replays one item, or one recorded chunk returning a success per name."""
+
+    one: Callable[[str], bool]
+    chunk: Callable[[list[str]], list[bool]]
+
+
+def _inprocess(name: str) -> bool:
+    return process_example(name).success
+
+
+def _inprocess_chunk(names: list[str]) -> list[bool]:
+    return [result.success for result in process_batch(names).outputs]
+
+
+def _cli(name: str) -> bool:
+    # "--name=..." keeps names starting with "-" from being parsed as options;
+    # the env keeps each replayed run from writing its own capture or trace.
+    completed = subprocess.run(
+        [sys.executable, "-m", "my_project.cli", "run", f"--name={name}"],
+        env={**os.environ, **_CLI_ENV},
+        capture_output=True,
+        timeout=_CLI_TIMEOUT,
+        check=False,
+    )
+    return completed.returncode == 0
+
+
+def _cli_chunk(names: list[str]) -> list[bool]:
+    # Streams the chunk through 'run --input -', as the recording run did.
+    completed = subprocess.run(
+        [sys.executable, "-m", "my_project.cli", "run", "--input", "-"],
+        input="".join(f"{name}\n" for name in names),
+        env={**os.environ, **_CLI_ENV},
+        capture_output=True,
+        text=True,
+        timeout=_CLI_TIMEOUT,
+        check=False,
+    )
+    lines = completed.stdout.splitlines()
+    if len(lines) != len(names):
+        return [False] * len(names)
+    return [bool(json.loads(line).get("success")) for line in lines]
+
+
+TARGETS: dict[str, _Target] = {
+    "inprocess": _Target(_inprocess, _inprocess_chunk),
+    "cli": _Target(_cli, _cli_chunk),
+}
+
+
+def _units(records: Sequence[CaptureRecord]) -> list[list[CaptureRecord]]:
+    """Group records into replay units: single items and whole recorded chunks."""
+    units: list[list[CaptureRecord]] = []
+    chunks: dict[int, list[CaptureRecord]] = {}
+    for record in records:
+        if not record.chunk:
+            units.append([record])
+            continue
+        unit = chunks.get(record.chunk)
+        if unit is None:
+            unit = chunks[record.chunk] = []
+            units.append(unit)
+        unit.append(record)
+    return units
+
+
+def replay(
+    path: Path,
+    *,
+    target: str = "inprocess",
+    speed: float = 1.0,
+    workers: int = 4,
+) -> ReplayReport:
+    """
+    Replay a captured workload and measure it.
+
+    Args:
+        path: Capture file
+        target: ``inprocess`` (call process_example, or process_batch for a
+            recorded chunk) or ``cli`` (one ``my-project run`` subprocess per
+            item or chunk)
+        speed: Pace multiplier for recorded offsets; 0 replays unpaced
+        workers: Concurrent items or chunks in flight
+
+    Returns:
+        ReplayReport with throughput, latency percentiles and error rate
+
+    Raises:
+        ValueError: For an unknown target, negative speed or invalid capture
+    """
+    if target not in TARGETS:
+        raise ValueError(f"Unknown replay target '{target}'; choose from {', '.join(TARGETS)}")
+    if speed < 0 or workers < 1:
+        raise ValueError("speed must be >= 0 and workers >= 1")
+
+    workload = load_capture(path)
+    call = TARGETS[target]
+    begin = time.perf_counter()
+
+    def run_unit(unit: list[CaptureRecord]) -> list[tuple[float, bool]]:
+        due = begin + unit[0].offset / speed if speed else time.perf_counter()
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        names = [record.name for record in unit]
+        try:
+            oks = call.chunk(names) if unit[0].chunk else [call.one(names[0])]
+        except Exception:
+            oks = [False] * len(names)
+        # Chunk items share the chunk's latency, matching how they were recorded.
+        share = (time.perf_counter() - due) / len(unit)
+        return [(share, ok) for ok in oks]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="replay") as pool:
+        outcomes = [o for unit in pool.map(run_unit, _units(workload.records)) for o in unit]
+
+    latencies = sorted(seconds * 1000 for seconds, _ in outcomes)
+    recorded = sorted(r.latency * 1000 for r in workload.records)
+    return ReplayReport(
+        target=target,
+        speed=speed,
+        items=len(outcomes),
+        errors=sum(1 for _, ok in outcomes if not ok),
+        seconds=time.perf_counter() - begin,
+        p50_ms=_percentile(latencies, 0.50),
+        p99_ms=_percentile(latencies, 0.99),
+        max_ms=latencies[-1] if latencies else 0.0,
+        recorded_p50_ms=_percentile(recorded, 0.50),
+        recorded_p99_ms=_percentile(recorded, 0.99),
+        chunked_items=sum(1 for r in workload.records if r.chunk),
+        truncated=workload.truncated,
+    )
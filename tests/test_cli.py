@@ -7,13 +7,32 @@ These tests verify the command-line interface logic.
 from __future__ import annotations
 
 import argparse
+import json
+from datetime import datetime, timedelta
 from io import StringIO
 from unittest.mock import patch
 
 import pytest
 
-from my_project.cli import cmd_info, cmd_run, create_parser, main
-from my_project.models import Result
+from my_project.cli import (
+    cmd_build_site,
+    cmd_compact_segments,
+    cmd_compact_shards,
+    cmd_info,
+    cmd_negative_cache,
+    cmd_preview_site,
+    cmd_rebalance_shards,
+    cmd_replay,
+    cmd_run,
+    create_parser,
+    main,
+)
+from my_project.models import Example, Result
+from my_project.negative_cache import NegativeCache
+from my_project.repository import SQLiteRepository
+from my_project.segments import SegmentStore
+from my_project.sharding import ShardedStore
+from my_project.workload import load_capture
 
 
 class TestCreateParser:
@@ -51,6 +70,39 @@ class TestCreateParser:
         args = parser.parse_args(["run"])
         assert args.name == "example"
 
+    @pytest.mark.parametrize("rate", ["2", "-0.1", "nan", "half"])
+    def test_parser_rejects_invalid_trace_rate(
+        self, rate: str, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """--trace outside 0-1 is a usage error, not a traceback."""
+        parser = create_parser()
+
+        with pytest.raises(SystemExit) as exc_info:
+            parser.parse_args(["run", "--trace", rate])
+
+        assert exc_info.value.code == 2
+        assert "--trace" in capsys.readouterr().err
+
+    @pytest.mark.parametrize("command", ["run", "replay"])
+    def test_parser_rejects_non_positive_workers(
+        self, command: str, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """--workers below 1 is a usage error, not a traceback."""
+        parser = create_parser()
+        argv = [command, "--workers", "0"] + (["capture.jsonl.gz"] if command == "replay" else [])
+
+        with pytest.raises(SystemExit) as exc_info:
+            parser.parse_args(argv)
+
+        assert exc_info.value.code == 2
+        assert "--workers" in capsys.readouterr().err
+
+    def test_parser_accepts_trace_rate_bounds(self) -> None:
+        """--trace accepts 0 and 1."""
+        parser = create_parser()
+        assert parser.parse_args(["run", "--trace", "0"]).trace == 0
+        assert parser.parse_args(["run", "--trace", "1"]).trace == 1
+
     def test_parser_info_command(self) -> None:
         """Parser accepts info command."""
         parser = create_parser()
@@ -111,6 +163,68 @@ class TestCmdRun:
             cmd_run(args)
             mock_process.assert_called_once_with("custom-name")
 
+    def test_streams_input_file(self, tmp_path) -> None:
+        """--input streams names and writes one JSON result per line."""
+        source = tmp_path / "names.txt"
+        source.write_text("a\nb\nc\n")
+        target = tmp_path / "out.jsonl"
+        args = argparse.Namespace(
+            name="unused", debug=False, input=str(source), output=str(target), workers=2
+        )
+
+        with patch("sys.stderr", new=StringIO()) as mock_stderr:
+            exit_code = cmd_run(args)
+
+        assert exit_code == 0
+        assert len(target.read_text().splitlines()) == 3
+        assert "peak RSS" in mock_stderr.getvalue()
+
+    def test_missing_input_returns_one(self, tmp_path) -> None:
+        """An unreadable input file is reported as an error."""
+        args = argparse.Namespace(
+            name="unused",
+            debug=False,
+            input=str(tmp_path / "missing.txt"),
+            output="-",
+            workers=1,
+        )
+
+        with patch("sys.stderr", new=StringIO()):
+            assert cmd_run(args) == 1
+
+    def test_persist_writes_to_repository(self, test_settings) -> None:
+        """--persist stores the example in the SQLite store under data_dir."""
+        args = argparse.Namespace(name="stored", debug=False, persist=True)
+
+        with patch("sys.stdout", new=StringIO()):
+            assert cmd_run(args) == 0
+
+        with SQLiteRepository.from_settings(test_settings) as repository:
+            assert repository.count_examples() == 1
+        assert len(SegmentStore.from_settings(test_settings).last(timedelta(minutes=5))) == 1
+
+    def test_capture_records_workload(self, test_settings) -> None:
+        """--capture writes a replayable capture under log_dir/captures."""
+        args = argparse.Namespace(name="captured", debug=False, capture=True)
+
+        with patch("sys.stdout", new=StringIO()), patch("sys.stderr", new=StringIO()):
+            assert cmd_run(args) == 0
+
+        (path,) = (test_settings.log_dir / "captures").iterdir()
+        assert [r.name for r in load_capture(path).records] == ["captured"]
+
+    def test_trace_writes_chrome_trace(self, test_settings) -> None:
+        """--trace exports the run's spans under log_dir/traces."""
+        args = argparse.Namespace(name="traced", debug=False, trace=1.0)
+
+        with patch("sys.stdout", new=StringIO()), patch("sys.stderr", new=StringIO()) as err:
+            assert cmd_run(args) == 0
+
+        (path,) = (test_settings.log_dir / "traces").iterdir()
+        names = {e["name"] for e in json.loads(path.read_text())["traceEvents"]}
+        assert {"cmd_run", "process_example", "create_example"} <= names
+        assert "Traced 1/1 roots" in err.getvalue()
+
 
 class TestCmdInfo:
     """Tests for cmd_info function."""
@@ -173,3 +287,176 @@ class TestMain:
             mock_parser.return_value.parse_args.return_value = argparse.Namespace(command="unknown")
             exit_code = main()
             assert exit_code == 1
+
+
+class TestCmdBuildSite:
+    """Tests for cmd_build_site function."""
+
+    def test_builds_site(self, tmp_path) -> None:
+        """Build command writes the site and returns 0."""
+        args = argparse.Namespace(
+            source=tmp_path / "data",
+            output=tmp_path / "site",
+            jobs=1,
+            force=False,
+            asset_url="assets/",
+            compress=True,
+        )
+
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            exit_code = cmd_build_site(args)
+
+        assert exit_code == 0
+        assert (tmp_path / "site" / "index.html").exists()
+        assert "1 written" in mock_stdout.getvalue()
+        assert "1 new assets" in mock_stdout.getvalue()
+        assert "Compressed" in mock_stdout.getvalue()
+
+    def test_build_error_returns_one(self, tmp_path) -> None:
+        """Invalid data files return exit code 1."""
+        source = tmp_path / "data"
+        source.mkdir()
+        (source / "bad.yaml").write_text("- not a mapping\n")
+        args = argparse.Namespace(
+            source=source,
+            output=tmp_path / "site",
+            jobs=1,
+            force=False,
+            asset_url="assets/",
+            compress=False,
+        )
+
+        with patch("sys.stderr", new=StringIO()) as mock_stderr:
+            exit_code = cmd_build_site(args)
+
+        assert exit_code == 1
+        assert "bad.yaml" in mock_stderr.getvalue()
+
+    def test_parser_build_site_command(self) -> None:
+        """Parser accepts build-site with options."""
+        parser = create_parser()
+        args = parser.parse_args(["build-site", "--output", "out", "--jobs", "2", "--force"])
+
+        assert args.command == "build-site"
+        assert str(args.output) == "out"
+        assert args.jobs == 2
+        assert args.force is True
+
+
+class TestCmdPreviewSite:
+    """Tests for cmd_preview_site function."""
+
+    def test_missing_directory_returns_one(self, tmp_path) -> None:
+        """Serving a directory that was never built fails fast."""
+        args = argparse.Namespace(directory=tmp_path / "missing", host=None, port=None)
+
+        with patch("sys.stderr", new=StringIO()):
+            assert cmd_preview_site(args) == 1
+
+    def test_uses_api_host_and_port(self, tmp_path) -> None:
+        """Host and port default to the API settings."""
+        args = argparse.Namespace(directory=tmp_path, host=None, port=None)
+
+        with (
+            patch("my_project.cli.create_server") as mock_create,
+            patch("sys.stdout", new=StringIO()),
+        ):
+            mock_create.return_value.server_address = ("0.0.0.0", 8000)
+            exit_code = cmd_preview_site(args)
+
+        assert exit_code == 0
+        mock_create.assert_called_once_with(tmp_path, "0.0.0.0", 8000)
+        mock_create.return_value.serve_forever.assert_called_once()
+
+
+class TestCmdCompactSegments:
+    """Tests for cmd_compact_segments function."""
+
+    def test_compacts_closed_segments(self, test_settings) -> None:
+        """Closed segments under data_dir are compacted and reported."""
+        store = SegmentStore.from_settings(test_settings)
+        store.append([Example(id="old", name="old", created_at=datetime(2024, 1, 1))])
+
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            assert cmd_compact_segments(argparse.Namespace()) == 0
+
+        assert store.is_compacted("2024-01-01T00")
+        assert "Compacted 1 segments" in mock_stdout.getvalue()
+
+
+class TestCmdShards:
+    """Tests for cmd_rebalance_shards and cmd_compact_shards."""
+
+    def test_rebalance_and_compact(self, test_settings) -> None:
+        """Shards are rebalanced to the requested count, then compacted."""
+        with ShardedStore.from_settings(test_settings) as store:
+            store.upsert_examples([Example(id=f"e{i}", name=f"n{i}") for i in range(20)])
+
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            assert cmd_rebalance_shards(argparse.Namespace(shards=3)) == 0
+            assert cmd_compact_shards(argparse.Namespace()) == 0
+
+        assert "1 -> 3 shards" in mock_stdout.getvalue()
+        assert "Compacted 3 shards" in mock_stdout.getvalue()
+        with ShardedStore.from_settings(test_settings) as store:
+            assert store.shard_count == 3
+            assert store.count_examples() == 20
+
+    def test_rejects_zero_shards(self, test_settings) -> None:
+        """The shard count must be positive."""
+        with patch("sys.stderr", new=StringIO()):
+            assert cmd_rebalance_shards(argparse.Namespace(shards=0)) == 1
+
+
+class TestCmdNegativeCache:
+    """Tests for the negative cache in cmd_run and cmd_negative_cache."""
+
+    def test_run_reports_cache_stats(self, test_settings) -> None:
+        """run --negative-cache consults the cache and prints its counters."""
+        args = argparse.Namespace(name="fine", debug=False, negative_cache=True)
+
+        with patch("sys.stdout", new=StringIO()), patch("sys.stderr", new=StringIO()) as err:
+            assert cmd_run(args) == 0
+
+        assert "Negative cache: 0/1 hits" in err.getvalue()
+
+    def test_show_rebuild_and_forget(self, test_settings) -> None:
+        """The command forgets names, rebuilds the filter and shows its size."""
+        with NegativeCache.from_settings(test_settings) as cache:
+            cache.record("bad", "boom")
+            cache.record("worse", "boom")
+        args = argparse.Namespace(rebuild=True, forget=["bad"])
+
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            assert cmd_negative_cache(args) == 0
+
+        output = mock_stdout.getvalue()
+        assert "Forgot 1 names" in output
+        assert "Cached failures: 1" in output
+        assert "1/1024 names" in output
+
+
+class TestCmdReplay:
+    """Tests for cmd_replay function."""
+
+    def test_replays_capture(self, test_settings) -> None:
+        """A capture from 'run --capture' replays and prints the report."""
+        with patch("sys.stdout", new=StringIO()), patch("sys.stderr", new=StringIO()):
+            cmd_run(argparse.Namespace(name="again", debug=False, capture=True))
+        (path,) = (test_settings.log_dir / "captures").iterdir()
+        args = argparse.Namespace(capture=path, target="inprocess", speed=0.0, workers=1)
+
+        with patch("sys.stdout", new=StringIO()) as mock_stdout:
+            assert cmd_replay(args) == 0
+
+        assert "Replayed 1 items against inprocess" in mock_stdout.getvalue()
+
+    def test_invalid_capture_returns_one(self, tmp_path) -> None:
+        """Missing or malformed captures are reported as errors."""
+        args = argparse.Namespace(
+            capture=tmp_path / "missing.jsonl.gz", target="inprocess", speed=1.0, workers=1
+        )
+
+        with patch("sys.stderr", new=StringIO()) as mock_stderr:
+            assert cmd_replay(args) == 1
+        assert "Error" in mock_stderr.getvalue()
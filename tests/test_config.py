@@ -4,9 +4,11 @@ Tests for configuration management.
 These tests verify settings loading and environment handling.
 """
 
+import threading
 from pathlib import Path
 
 import pytest
+from pydantic import ValidationError
 
 from my_project.config import Settings, get_settings
 
@@ -69,6 +71,72 @@ class TestSettings:
         assert data_dir.exists()
         assert log_dir.exists()
 
+    def test_watermarks_must_be_ordered(self) -> None:
+        """The low watermark must sit below the high watermark."""
+        with pytest.raises(ValueError, match="watermark"):
+            Settings(stream_high_watermark=10, stream_low_watermark=10)
+
+
+class TestWithOverrides:
+    """Tests for Settings snapshots and copy-on-write overrides."""
+
+    def test_settings_are_frozen(self) -> None:
+        """Snapshots cannot be mutated in place."""
+        settings = Settings()
+        with pytest.raises(ValidationError):
+            settings.debug = True  # type: ignore[misc]
+
+    def test_override_returns_new_snapshot(self, tmp_path: Path) -> None:
+        """Overrides produce a new snapshot and leave the original untouched."""
+        base = Settings(app_name="base")
+        tenant = base.with_overrides(data_dir=str(tmp_path), stream_chunk_size="7")
+
+        assert tenant.data_dir == tmp_path
+        assert tenant.stream_chunk_size == 7
+        assert tenant.app_name == "base"
+        assert base.data_dir == Path("data")
+        assert base.with_overrides() is base
+
+    def test_does_not_reread_environment(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Overrides copy the snapshot instead of loading the environment again."""
+        base = Settings()
+        monkeypatch.setenv("APP_NAME", "changed")
+
+        assert base.with_overrides(debug=True).app_name == base.app_name
+
+    def test_invalid_value(self) -> None:
+        """Overridden values are validated against their field."""
+        with pytest.raises(ValueError, match="stream_chunk_size"):
+            Settings().with_overrides(stream_chunk_size=0)
+
+    def test_unknown_field(self) -> None:
+        """Unknown setting names are rejected."""
+        with pytest.raises(ValueError, match="Unknown settings: nope"):
+            Settings().with_overrides(nope=1)
+
+    def test_cross_field_checks(self) -> None:
+        """Model-level checks still apply to the combined snapshot."""
+        with pytest.raises(ValueError, match="watermark"):
+            Settings().with_overrides(stream_low_watermark=10**9)
+
+    def test_shared_across_threads(self, tmp_path: Path) -> None:
+        """Threads deriving snapshots from one base see only their own overrides."""
+        base = Settings()
+        seen: dict[int, Path] = {}
+
+        def worker(i: int) -> None:
+            snapshot = base.with_overrides(data_dir=tmp_path / str(i))
+            seen[i] = snapshot.data_dir
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert seen == {i: tmp_path / str(i) for i in range(8)}
+        assert base.data_dir == Path("data")
+
 
 class TestGetSettings:
     """Tests for get_settings function."""
@@ -6,8 +6,14 @@ These tests verify the main application functionality.
 
 from unittest.mock import patch
 
-from my_project.core import create_example, process_example, validate_input
-from my_project.models import Status
+from my_project.core import (
+    create_example,
+    default_pipeline,
+    process_batch,
+    process_example,
+    validate_input,
+)
+from my_project.models import Result, Status
 
 
 class TestCreateExample:
@@ -71,6 +77,46 @@ class TestProcessExample:
             assert result.error == "Test error"
             assert "failed" in result.message.lower()
 
+    def test_custom_pipeline(self) -> None:
+        """A caller-supplied pipeline is used instead of the default."""
+        pipeline = default_pipeline().add_stage("tag", lambda r: r, pure=False)
+        result = process_example("custom", pipeline=pipeline)
+
+        assert result.success is True
+
+
+class TestProcessBatch:
+    """Tests for process_batch function."""
+
+    def test_results_in_order(self) -> None:
+        """Each name yields one Result, in input order."""
+        run = process_batch(["a", "b", "c"])
+
+        assert [r.data["name"] for r in run.outputs if r.data] == ["a", "b", "c"]
+        assert all(isinstance(r, Result) for r in run.outputs)
+
+    def test_default_stages_fuse(self) -> None:
+        """The default pipeline runs as a single fused pass."""
+        run = process_batch(["a"])
+
+        assert len(run.report.stages) == 1
+        assert run.report.stages[0].stages == ["create", "complete", "result"]
+
+    def test_failure_isolated_per_item(self) -> None:
+        """One failing item does not affect the others."""
+
+        def reject_bad(name: str) -> str:
+            if name == "bad":
+                raise ValueError("rejected")
+            return name
+
+        pipeline = default_pipeline().add_stage("validate", reject_bad, before="create")
+        run = process_batch(["ok", "bad"], pipeline=pipeline)
+
+        assert run.outputs[0].success is True
+        assert run.outputs[1].success is False
+        assert run.outputs[1].error == "rejected"
+
 
 class TestValidateInput:
     """Tests for validate_input function."""
@@ -7,8 +7,20 @@ These tests verify the Pydantic models work correctly.
 from datetime import datetime
 
 import pytest
-
-from my_project.models import Example, Result, Status
+from pydantic import ValidationError
+
+from my_project.models import (
+    Example,
+    Result,
+    Status,
+    dump_examples_json,
+    dump_results_json,
+    example_list_adapter,
+    validate_examples,
+    validate_examples_jsonl,
+    validate_results,
+    warm_models,
+)
 
 
 class TestStatus:
@@ -100,3 +112,41 @@ class TestResult:
         result = Result(success=True, message="OK")
         assert result.success is True
         assert result.message == "OK"
+
+
+class TestModelRegistry:
+    """Tests for the shared list adapters and batch helpers."""
+
+    def test_adapters_are_shared(self) -> None:
+        """Each list adapter is built once per process."""
+        assert example_list_adapter() is example_list_adapter()
+
+    def test_warm_models_builds_validators(self) -> None:
+        """warm_models leaves every model ready to validate."""
+        warm_models()
+        assert Example.__pydantic_complete__
+        assert Result.__pydantic_complete__
+
+    def test_validate_examples_applies_model_config(self) -> None:
+        """List validation strips whitespace like the model does."""
+        (example,) = validate_examples([{"id": "1", "name": "  padded  "}])
+        assert example.name == "padded"
+
+    def test_validate_examples_jsonl(self) -> None:
+        """JSON lines validate in one call; blank lines are skipped."""
+        lines = [Example(id=str(i), name=f"n{i}").model_dump_json().encode() for i in range(3)]
+        examples = validate_examples_jsonl([lines[0], b"\n", *lines[1:]])
+        assert [e.id for e in examples] == ["0", "1", "2"]
+
+    def test_validation_errors_name_the_item(self) -> None:
+        """An invalid item fails the batch with its index in the error."""
+        with pytest.raises(ValidationError, match=r"1\.success"):
+            validate_results([{"success": True, "message": "ok"}, {"message": "no"}])
+
+    def test_dump_round_trip(self) -> None:
+        """Dumped lists validate back to equal models."""
+        examples = [Example(id="1", name="a", status=Status.COMPLETED)]
+        results = [Result(success=True, message="ok", data={"id": "1"})]
+
+        assert example_list_adapter().validate_json(dump_examples_json(examples)) == examples
+        assert dump_results_json(results).startswith(b'[{"success":true')
@@ -0,0 +1,214 @@
+"""
+Tests for the negative cache and its bloom filter.
+
+These tests verify filtering, short-circuiting, persistence and rebuilds.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from my_project.config import Settings
+from my_project.core import default_pipeline, negative_cache_pipeline, process_batch, validate_input
+from my_project.negative_cache import (
+    BLOOM_FILENAME,
+    BloomFilter,
+    KnownFailureError,
+    NegativeCache,
+)
+
+
+def _validate(name: str) -> str:
+    ok, error = validate_input(name, max_length=5)
+    if not ok:
+        raise ValueError(error)
+    return name
+
+
+def _validating_pipeline():
+    return default_pipeline().add_stage("validate", _validate, before="create")
+
+
+class TestBloomFilter:
+    """Tests for BloomFilter."""
+
+    def test_no_false_negatives(self) -> None:
+        """Every added name is reported present."""
+        bloom = BloomFilter(500, 0.01)
+        names = [f"name-{i}" for i in range(500)]
+        for name in names:
+            bloom.add(name)
+
+        assert all(name in bloom for name in names)
+
+    def test_false_positive_rate_near_target(self) -> None:
+        """At capacity the false-positive rate stays near the target."""
+        bloom = BloomFilter(2000, 0.01)
+        for i in range(2000):
+            bloom.add(f"in-{i}")
+
+        false_positives = sum(f"out-{i}" in bloom for i in range(20_000))
+        assert false_positives / 20_000 < 0.02
+
+    def test_round_trip(self) -> None:
+        """Serialized filters load with the same contents."""
+        bloom = BloomFilter(100, 0.05)
+        bloom.add("alpha")
+
+        loaded = BloomFilter.from_bytes(bloom.to_bytes())
+        assert "alpha" in loaded
+        assert (loaded.bits, loaded.hashes, loaded.count) == (bloom.bits, bloom.hashes, 1)
+
+    def test_rejects_garbage(self) -> None:
+        """Data that is not a filter is rejected."""
+        with pytest.raises(ValueError):
+            BloomFilter.from_bytes(b"nope")
+
+    def test_invalid_parameters(self) -> None:
+        """Capacity and fp_rate are validated."""
+        with pytest.raises(ValueError):
+            BloomFilter(0)
+        with pytest.raises(ValueError):
+            BloomFilter(10, fp_rate=1.0)
+
+
+class TestNegativeCache:
+    """Tests for NegativeCache."""
+
+    def test_lookup_and_stats(self, tmp_path: Path) -> None:
+        """Recorded failures hit; unseen names are filtered without a table lookup."""
+        with NegativeCache(tmp_path) as cache:
+            cache.record("bad", "Value cannot be empty")
+
+            assert cache.lookup("bad") == "Value cannot be empty"
+            assert cache.lookup("good") is None
+
+            assert cache.stats.hits == 1
+            assert cache.stats.lookups == 2
+            assert cache.stats.filtered + cache.stats.false_positives == 1
+            assert "1/2 hits" in cache.stats.format()
+
+    def test_check_raises_for_known_failures(self, tmp_path: Path) -> None:
+        """The pipeline stage raises the cached error."""
+        with NegativeCache(tmp_path) as cache:
+            cache.record("bad", "boom")
+            assert cache.check("ok") == "ok"
+            with pytest.raises(KnownFailureError, match="boom"):
+                cache.check("bad")
+
+    def test_persists_across_instances(self, tmp_path: Path) -> None:
+        """Failures and the filter survive reopening."""
+        with NegativeCache(tmp_path, batch_size=100) as cache:
+            cache.record("bad", "boom")
+        assert (tmp_path / BLOOM_FILENAME).exists()
+
+        with NegativeCache(tmp_path) as cache:
+            assert cache.lookup("bad") == "boom"
+            assert len(cache) == 1
+
+    def test_corrupt_filter_is_rebuilt(self, tmp_path: Path) -> None:
+        """A damaged filter file is rebuilt from the table."""
+        with NegativeCache(tmp_path) as cache:
+            cache.record("bad", "boom")
+        (tmp_path / BLOOM_FILENAME).write_bytes(b"junk")
+
+        with NegativeCache(tmp_path) as cache:
+            assert cache.lookup("bad") == "boom"
+
+    def test_rebuild_expires_old_failures(self, tmp_path: Path) -> None:
+        """Rebuilding drops failures older than the TTL."""
+        with NegativeCache(tmp_path, ttl_hours=1) as cache:
+            cache.record("bad", "boom")
+            cache.flush()
+            cache._conn.execute("UPDATE failures SET last_failed = 0")
+            cache._conn.commit()
+
+            cache.rebuild()
+
+            assert cache.lookup("bad") is None
+            assert cache.stats.rebuilds == 1
+
+    def test_periodic_rebuild(self, tmp_path: Path) -> None:
+        """A rebuild runs at the first failure once the interval has passed."""
+        with NegativeCache(tmp_path, rebuild_seconds=0.001) as cache:
+            cache._built_at -= 1
+            cache.record("bad", "boom")
+            assert cache.stats.rebuilds == 1
+            assert "bad" in cache.bloom
+
+    def test_saturated_filter_is_resized(self, tmp_path: Path) -> None:
+        """Outgrowing the filter triggers a rebuild with more capacity."""
+        with NegativeCache(tmp_path, rebuild_seconds=None) as cache:
+            capacity = cache.bloom.capacity
+            for i in range(capacity + 1):
+                cache.record(f"bad-{i}", "boom")
+
+            assert cache.stats.rebuilds == 1
+            assert cache.bloom.capacity > capacity
+            assert cache.lookup("bad-0") == "boom"
+
+    def test_forget(self, tmp_path: Path) -> None:
+        """Forgotten names are processed again."""
+        with NegativeCache(tmp_path) as cache:
+            cache.record("bad", "boom")
+            assert cache.forget(["bad"]) == 1
+            assert cache.lookup("bad") is None
+
+    def test_from_settings(self, tmp_path: Path) -> None:
+        """The cache lives under data_dir with the configured FP rate."""
+        settings = Settings(data_dir=tmp_path, negative_cache_fp_rate=0.001)
+        with NegativeCache.from_settings(settings) as cache:
+            assert cache.root == tmp_path / "negative_cache"
+            assert cache.fp_rate == 0.001
+
+
+class TestNegativeCachePipeline:
+    """Tests for negative_cache_pipeline and process_batch integration."""
+
+    def test_known_failures_short_circuit(self, tmp_path: Path) -> None:
+        """A name that failed once is answered from the cache with the same error."""
+        calls: list[str] = []
+
+        def counting(name: str) -> str:
+            calls.append(name)
+            return _validate(name)
+
+        pipeline = default_pipeline().add_stage("validate", counting, before="create")
+        with NegativeCache(tmp_path) as cache:
+            first = process_batch(["ok", "toolong"], pipeline, negative_cache=cache).outputs
+            second = process_batch(["ok", "toolong"], pipeline, negative_cache=cache).outputs
+
+            assert calls == ["ok", "toolong", "ok"]
+            assert second[1] == first[1]
+            assert second[1].error == "Value exceeds maximum length of 5"
+            assert second[0].success
+            assert cache.stats.hits == 1
+
+    def test_environmental_errors_not_cached(self, tmp_path: Path) -> None:
+        """OSErrors do not mark a name as bad."""
+
+        def flaky(name: str) -> str:
+            raise OSError("disk full")
+
+        pipeline = default_pipeline().add_stage("flaky", flaky, before="create")
+        with NegativeCache(tmp_path) as cache:
+            process_batch(["a"], negative_cache_pipeline(cache, pipeline))
+            assert cache.stats.recorded == 0
+
+    def test_stage_runs_first(self, tmp_path: Path) -> None:
+        """The cache check precedes every other stage."""
+        with NegativeCache(tmp_path) as cache:
+            pipeline = negative_cache_pipeline(cache, _validating_pipeline())
+        assert pipeline.stages[0].name == "negative_cache"
+
+    def test_cache_does_not_change_outcomes(self, tmp_path: Path) -> None:
+        """Enabling the cache leaves results of the default pipeline unchanged."""
+        names = ["ok", "x" * 101]
+        plain = process_batch(names).outputs
+        with NegativeCache(tmp_path) as cache:
+            cached = process_batch(names, negative_cache=cache).outputs
+
+        assert [(r.success, r.message) for r in cached] == [(r.success, r.message) for r in plain]
+        assert [stage.name for stage in negative_cache_pipeline(cache).stages][1:] == [
+            stage.name for stage in default_pipeline().stages
+        ]
@@ -0,0 +1,429 @@
+"""
+Tests for the static site builder.
+
+These tests verify page rendering and incremental rebuilds.
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from my_project.pages import (
+    BUILD_CACHE_NAME,
+    MANIFEST_NAME,
+    STYLESHEET,
+    SiteBuildError,
+    asset_path,
+    build_site,
+    collect_assets,
+    compress_site,
+    load_data_file,
+    publish_assets,
+    write_if_changed,
+)
+
+
+@pytest.fixture
+def source_dir(tmp_path: Path) -> Path:
+    """Create a data directory with one YAML and one JSON data file."""
+    source = tmp_path / "data"
+    source.mkdir()
+    (source / "nightly.yaml").write_text(
+        "title: Nightly\n"
+        "examples:\n"
+        "  - id: ex-1\n"
+        "    name: First <example>\n"
+        "results:\n"
+        "  - success: true\n"
+        "    message: ok\n"
+        "  - success: false\n"
+        "    message: boom\n"
+        "    error: bad input\n"
+    )
+    (source / "weekly.json").write_text(
+        json.dumps({"results": [{"success": True, "message": "fine"}]})
+    )
+    return source
+
+
+class TestLoadDataFile:
+    """Tests for load_data_file function."""
+
+    def test_loads_yaml(self, source_dir: Path) -> None:
+        """YAML data files are parsed into models."""
+        data = load_data_file(source_dir / "nightly.yaml")
+
+        assert data["title"] == "Nightly"
+        assert data["examples"][0].id == "ex-1"
+        assert len(data["results"]) == 2
+
+    def test_title_defaults_to_stem(self, source_dir: Path) -> None:
+        """Missing title falls back to the file name."""
+        data = load_data_file(source_dir / "weekly.json")
+        assert data["title"] == "weekly"
+
+    def test_invalid_model_raises(self, tmp_path: Path) -> None:
+        """Records that fail model validation raise SiteBuildError."""
+        path = tmp_path / "bad.json"
+        path.write_text(json.dumps({"examples": [{"name": "no id"}]}))
+
+        with pytest.raises(SiteBuildError, match=r"bad\.json"):
+            load_data_file(path)
+
+    def test_non_mapping_raises(self, tmp_path: Path) -> None:
+        """Top-level lists are rejected."""
+        path = tmp_path / "list.yaml"
+        path.write_text("- 1\n- 2\n")
+
+        with pytest.raises(SiteBuildError, match="mapping"):
+            load_data_file(path)
+
+
+class TestWriteIfChanged:
+    """Tests for write_if_changed function."""
+
+    def test_writes_new_file(self, tmp_path: Path) -> None:
+        """Missing files are written."""
+        target = tmp_path / "sub" / "a.html"
+
+        assert write_if_changed(target, b"hello") is True
+        assert target.read_bytes() == b"hello"
+
+    def test_skips_identical_content(self, tmp_path: Path) -> None:
+        """Identical content is not rewritten."""
+        target = tmp_path / "a.html"
+        write_if_changed(target, b"hello")
+        mtime = target.stat().st_mtime_ns
+
+        assert write_if_changed(target, b"hello") is False
+        assert target.stat().st_mtime_ns == mtime
+
+
+class TestBuildSite:
+    """Tests for build_site function."""
+
+    def test_first_build_writes_all_pages(self, source_dir: Path, tmp_path: Path) -> None:
+        """A fresh build renders every data page plus the index."""
+        output = tmp_path / "site"
+        report = build_site(source_dir, output, jobs=1)
+
+        assert sorted(report.written) == ["index.html", "nightly.html", "weekly.html"]
+        assert (output / BUILD_CACHE_NAME).exists()
+        index = (output / "index.html").read_text()
+        assert 'href="nightly.html"' in index
+        assert "Nightly" in index
+
+    def test_escapes_content(self, source_dir: Path, tmp_path: Path) -> None:
+        """Data values are HTML-escaped."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+
+        page = (output / "nightly.html").read_text()
+        assert "First &lt;example&gt;" in page
+        assert "1/2 passed" in page
+
+    def test_rebuild_skips_unchanged(self, source_dir: Path, tmp_path: Path) -> None:
+        """A second build with the same inputs renders nothing."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+        report = build_site(source_dir, output, jobs=1)
+
+        assert report.written == []
+        assert sorted(report.skipped) == ["index.html", "nightly.html", "weekly.html"]
+
+    def test_rebuild_only_changed_page(self, source_dir: Path, tmp_path: Path) -> None:
+        """Only pages whose inputs changed are rendered again."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+        (source_dir / "weekly.json").write_text(
+            json.dumps({"results": [{"success": False, "message": "broke"}]})
+        )
+        report = build_site(source_dir, output, jobs=1)
+
+        assert report.written == ["weekly.html"]
+        assert "nightly.html" in report.skipped
+        assert "index.html" in report.skipped
+
+    def test_equivalent_input_leaves_output_untouched(
+        self, source_dir: Path, tmp_path: Path
+    ) -> None:
+        """Input changes that render identically do not rewrite the page."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+        path = source_dir / "weekly.json"
+        path.write_text(path.read_text() + "\n")
+        report = build_site(source_dir, output, jobs=1)
+
+        assert report.unchanged == ["weekly.html"]
+
+    def test_removed_source_deletes_page(self, source_dir: Path, tmp_path: Path) -> None:
+        """Pages whose data file disappeared are removed and unlinked."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+        (source_dir / "weekly.json").unlink()
+        report = build_site(source_dir, output, jobs=1)
+
+        assert report.removed == ["weekly.html"]
+        assert not (output / "weekly.html").exists()
+        assert "index.html" in report.written
+
+    def test_force_still_removes_deleted_sources(self, source_dir: Path, tmp_path: Path) -> None:
+        """A forced rebuild drops pages whose source is gone."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+        (source_dir / "weekly.json").unlink()
+
+        report = build_site(source_dir, output, jobs=1, force=True)
+
+        assert report.removed == ["weekly.html"]
+        assert not (output / "weekly.html").exists()
+
+    def test_deleted_output_is_rebuilt(self, source_dir: Path, tmp_path: Path) -> None:
+        """A cached page whose output file is missing is rebuilt."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+        (output / "nightly.html").unlink()
+        report = build_site(source_dir, output, jobs=1)
+
+        assert report.written == ["nightly.html"]
+
+    def test_missing_source_dir_builds_index(self, tmp_path: Path) -> None:
+        """Without data files the index page is still produced."""
+        output = tmp_path / "site"
+        report = build_site(tmp_path / "missing", output, jobs=1)
+
+        assert report.written == ["index.html"]
+        assert "No data pages" in (output / "index.html").read_text()
+
+    def test_parallel_matches_serial(self, source_dir: Path, tmp_path: Path) -> None:
+        """Rendering across worker processes produces the same output."""
+        serial = tmp_path / "serial"
+        parallel = tmp_path / "parallel"
+        build_site(source_dir, serial, jobs=1)
+        build_site(source_dir, parallel, jobs=2)
+
+        for name in ("index.html", "nightly.html", "weekly.html"):
+            assert (serial / name).read_bytes() == (parallel / name).read_bytes()
+
+    def test_conflicting_sources_raise(self, source_dir: Path, tmp_path: Path) -> None:
+        """Two data files mapping to the same page are rejected."""
+        (source_dir / "nightly.json").write_text("{}")
+
+        with pytest.raises(SiteBuildError, match="already taken"):
+            build_site(source_dir, tmp_path / "site", jobs=1)
+
+
+class TestAssets:
+    """Tests for content-addressed asset publishing."""
+
+    def test_asset_path_is_content_addressed(self) -> None:
+        """Identical bytes map to the same path; different bytes do not."""
+        assert asset_path("a.css", b"x") == asset_path("a.css", b"x")
+        assert asset_path("a.css", b"x") != asset_path("a.css", b"y")
+        assert asset_path("a.css", b"x").startswith("assets/")
+        assert asset_path("a.css", b"x").endswith("/a.css")
+
+    def test_collect_includes_stylesheet_and_user_assets(self, source_dir: Path) -> None:
+        """The built-in stylesheet and files under assets/ are collected."""
+        (source_dir / "assets" / "img").mkdir(parents=True)
+        (source_dir / "assets" / "img" / "logo.svg").write_bytes(b"<svg/>")
+
+        assets = collect_assets(source_dir)
+
+        assert STYLESHEET in assets
+        assert assets["img/logo.svg"] == b"<svg/>"
+
+    def test_publish_prunes_stale_hashes(self, tmp_path: Path) -> None:
+        """Superseded asset versions are removed from the output."""
+        mapping, written = publish_assets({"a.css": b"one"}, tmp_path)
+        old = tmp_path / mapping["a.css"]
+        assert written == [mapping["a.css"]]
+
+        mapping, _ = publish_assets({"a.css": b"two"}, tmp_path)
+
+        assert not old.exists()
+        assert (tmp_path / mapping["a.css"]).read_bytes() == b"two"
+
+    def test_publish_skips_existing(self, tmp_path: Path) -> None:
+        """Assets already present are not written again."""
+        publish_assets({"a.css": b"one"}, tmp_path)
+        _, written = publish_assets({"a.css": b"one"}, tmp_path)
+        assert written == []
+
+
+class TestBuildSiteAssets:
+    """Tests for asset handling in build_site."""
+
+    def test_pages_link_hashed_stylesheet(self, source_dir: Path, tmp_path: Path) -> None:
+        """Pages link the stylesheet through the asset URL prefix."""
+        output = tmp_path / "site"
+        report = build_site(source_dir, output, jobs=1, asset_url="../assets/")
+
+        href = "../" + report.assets[STYLESHEET]
+        assert f'href="{href}"' in (output / "nightly.html").read_text()
+        assert (output / report.assets[STYLESHEET]).exists()
+
+    def test_manifest_lists_assets_and_pages(self, source_dir: Path, tmp_path: Path) -> None:
+        """manifest.json maps asset names to paths and records page digests."""
+        output = tmp_path / "site"
+        report = build_site(source_dir, output, jobs=1)
+
+        manifest = json.loads((output / MANIFEST_NAME).read_text())
+        assert manifest["assets"] == report.assets
+        assert set(manifest["pages"]) == {"index.html", "nightly.html", "weekly.html"}
+
+    def test_output_is_stable_across_builds(self, source_dir: Path, tmp_path: Path) -> None:
+        """Independent builds of the same inputs produce identical asset paths."""
+        first = build_site(source_dir, tmp_path / "a", jobs=1)
+        second = build_site(source_dir, tmp_path / "b", jobs=1)
+
+        assert first.assets == second.assets
+        manifest_a = (tmp_path / "a" / MANIFEST_NAME).read_bytes()
+        assert manifest_a == (tmp_path / "b" / MANIFEST_NAME).read_bytes()
+
+    def test_asset_change_rebuilds_pages(self, source_dir: Path, tmp_path: Path) -> None:
+        """Changing the stylesheet re-renders pages that link it."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+        (source_dir / "assets").mkdir()
+        (source_dir / "assets" / STYLESHEET).write_text("body{}")
+
+        report = build_site(source_dir, output, jobs=1)
+
+        assert sorted(report.written) == ["index.html", "nightly.html", "weekly.html"]
+
+    def test_asset_url_change_rebuilds_pages(self, source_dir: Path, tmp_path: Path) -> None:
+        """Switching the asset URL prefix invalidates cached pages."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+        report = build_site(source_dir, output, jobs=1, asset_url="../assets/")
+
+        assert report.skipped == []
+
+
+class TestCompressSite:
+    """Tests for compress_site function."""
+
+    @pytest.fixture
+    def site(self, tmp_path: Path) -> Path:
+        """A site directory with compressible and non-compressible files."""
+        site = tmp_path / "site"
+        site.mkdir()
+        (site / "page.html").write_text("<p>hello</p>" * 100)
+        (site / "tiny.html").write_text("<p/>")
+        (site / "image.png").write_bytes(b"\x89PNG" * 100)
+        return site
+
+    def test_writes_gzip_siblings(self, site: Path) -> None:
+        """Compressible files get a .gz sibling that round-trips."""
+        report = compress_site(site, jobs=1)
+
+        assert report.compressed == ["page.html"]
+        assert (
+            gzip.decompress((site / "page.html.gz").read_bytes())
+            == (site / "page.html").read_bytes()
+        )
+        assert report.gzip_bytes < report.raw_bytes
+
+    def test_skips_small_and_binary_files(self, site: Path) -> None:
+        """Tiny files and binary formats are left alone."""
+        compress_site(site, jobs=1)
+
+        assert not (site / "tiny.html.gz").exists()
+        assert not (site / "image.png.gz").exists()
+
+    def test_second_pass_skips_fresh(self, site: Path) -> None:
+        """Files whose siblings are up to date are not recompressed."""
+        first = compress_site(site, jobs=1)
+        second = compress_site(site, jobs=1)
+
+        assert second.compressed == []
+        assert second.skipped == ["page.html"]
+        assert second.gzip_bytes == first.gzip_bytes
+
+    def test_removes_orphaned_siblings(self, site: Path) -> None:
+        """Siblings of deleted files are cleaned up."""
+        compress_site(site, jobs=1)
+        (site / "page.html").unlink()
+        compress_site(site, jobs=1)
+
+        assert not (site / "page.html.gz").exists()
+
+    def test_parallel_matches_serial(self, tmp_path: Path) -> None:
+        """Parallel compression is byte-identical to serial."""
+        for name in ("a", "b"):
+            site = tmp_path / name
+            site.mkdir()
+            for i in range(3):
+                (site / f"p{i}.html").write_text(f"<p>{i}</p>" * 200)
+        compress_site(tmp_path / "a", jobs=1)
+        compress_site(tmp_path / "b", jobs=2)
+
+        for i in range(3):
+            assert (tmp_path / "a" / f"p{i}.html.gz").read_bytes() == (
+                tmp_path / "b" / f"p{i}.html.gz"
+            ).read_bytes()
+
+    def test_skips_build_cache(self, site: Path) -> None:
+        """The build cache is never compressed and stale siblings of it are removed."""
+        (site / f"{BUILD_CACHE_NAME}.gz").write_bytes(b"stale")
+        report = compress_site(site, jobs=1)
+
+        assert BUILD_CACHE_NAME not in report.compressed
+        assert not (site / f"{BUILD_CACHE_NAME}.gz").exists()
+
+    def test_freshness_follows_content_not_mtime(self, site: Path) -> None:
+        """Touching a file does not recompress it; changing its bytes does."""
+        compress_site(site, jobs=1)
+        page = site / "page.html"
+        sibling = site / "page.html.gz"
+        os.utime(sibling, ns=(0, 0))
+
+        assert compress_site(site, jobs=1).skipped == ["page.html"]
+
+        page.write_text("<p>changed</p>" * 100)
+        os.utime(page, ns=(0, 0))
+
+        assert compress_site(site, jobs=1).compressed == ["page.html"]
+        assert gzip.decompress(sibling.read_bytes()) == page.read_bytes()
+
+    def test_build_keeps_compression_digests(self, source_dir: Path, tmp_path: Path) -> None:
+        """A rebuild after compressing leaves unchanged pages fresh."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+        first = compress_site(output, jobs=1)
+        build_site(source_dir, output, jobs=1)
+        second = compress_site(output, jobs=1)
+
+        assert first.compressed
+        assert second.compressed == []
+        assert sorted(second.skipped) == sorted(first.compressed)
+
+    def test_removes_siblings_of_shrunk_files(self, site: Path) -> None:
+        """A file that shrinks below the size threshold loses its siblings."""
+        compress_site(site, jobs=1)
+        (site / "page.html").write_text("<p/>")
+        compress_site(site, jobs=1)
+
+        assert not (site / "page.html.gz").exists()
+
+    def test_build_drops_siblings_of_rewritten_pages(
+        self, source_dir: Path, tmp_path: Path
+    ) -> None:
+        """Rebuilt or removed pages never keep compressed siblings of old content."""
+        output = tmp_path / "site"
+        build_site(source_dir, output, jobs=1)
+        compress_site(output, jobs=1)
+        (source_dir / "nightly.yaml").write_text("results: []\n")
+        (source_dir / "weekly.json").unlink()
+        build_site(source_dir, output, jobs=1)
+
+        assert not (output / "nightly.html.gz").exists()
+        assert not (output / "weekly.html.gz").exists()
+        compress_site(output, jobs=1)
+        for sibling in output.rglob("*.gz"):
+            original = sibling.with_suffix("")
+            assert gzip.decompress(sibling.read_bytes()) == original.read_bytes()
@@ -0,0 +1,159 @@
+"""
+Tests for parallel batch execution backends.
+
+These tests verify backend selection, ordering and thread safety.
+"""
+
+import sys
+import threading
+
+import pytest
+
+from my_project.config import Settings
+from my_project.core import create_example, default_pipeline
+from my_project.parallel import free_threaded, resolve_backend, run_batch
+from my_project.transport import SharedResults
+
+
+class TestBackendSelection:
+    """Tests for free-threading detection and backend resolution."""
+
+    def test_free_threaded_when_gil_disabled(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A disabled GIL is detected."""
+        monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+        assert free_threaded() is True
+        assert resolve_backend("auto") == "thread"
+
+    def test_standard_build(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """With the GIL enabled, auto prefers processes."""
+        monkeypatch.setattr(sys, "_is_gil_enabled", lambda: True, raising=False)
+        assert free_threaded() is False
+        assert resolve_backend("auto") == "process"
+
+    def test_interpreter_without_probe(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Interpreters older than 3.13 always have a GIL."""
+        monkeypatch.delattr(sys, "_is_gil_enabled", raising=False)
+        assert free_threaded() is False
+
+    def test_explicit_backend_kept(self) -> None:
+        """Explicit backends are not changed."""
+        assert resolve_backend("serial") == "serial"
+
+
+class TestRunBatch:
+    """Tests for run_batch."""
+
+    @pytest.mark.parametrize("backend", ["thread", "process", "serial"])
+    def test_results_in_input_order(self, backend: str) -> None:
+        """Every backend returns one Result per name, in order."""
+        names = [f"item-{i}" for i in range(50)]
+        outputs, report = run_batch(names, backend=backend, workers=3)  # type: ignore[arg-type]
+
+        assert [r.data["name"] for r in outputs if r.data] == names
+        assert report.items == 50
+        assert report.failed == 0
+        assert report.backend == backend
+        assert report.chunks >= 1
+
+    def test_thread_backend_chunks(self) -> None:
+        """Names are split into several chunks per worker."""
+        _, report = run_batch([str(i) for i in range(100)], backend="thread", workers=2)
+        assert report.chunks == 8
+        assert report.workers == 2
+
+    def test_failures_counted(self) -> None:
+        """Failed items are counted without stopping the batch."""
+        pipeline = default_pipeline()
+
+        def explode(name: str) -> str:
+            if name == "bad":
+                raise RuntimeError("boom")
+            return name
+
+        pipeline.add_stage("explode", explode, before="create")
+        outputs, report = run_batch(["ok", "bad", "ok"], backend="thread", pipeline=pipeline)
+
+        assert [r.success for r in outputs] == [True, False, True]
+        assert report.failed == 1
+
+    def test_process_backend_stays_lazy(self) -> None:
+        """The process backend returns SharedResults without decoding them."""
+        outputs, report = run_batch(["a", "b", "c"], backend="process", workers=2)
+
+        assert isinstance(outputs, SharedResults)
+        assert report.failed == 0
+        assert outputs[2].data == {"id": outputs.raw(2)[1], "name": "c"}
+
+    def test_backends_agree_on_long_names(self) -> None:
+        """Names too long for a transport record match across backends."""
+        names = ["é" * 300, "b"]
+        thread = run_batch(names, backend="thread", workers=2).outputs
+        process = run_batch(names, backend="process", workers=2).outputs
+
+        assert [r.data["name"] for r in process if r.data] == names
+        assert [r.message for r in process] == [r.message for r in thread]
+
+    def test_process_backend_rejects_custom_pipeline(self) -> None:
+        """Custom pipelines cannot be sent to worker processes."""
+        with pytest.raises(ValueError, match="default pipeline"):
+            run_batch(["a"], backend="process", pipeline=default_pipeline())
+
+    def test_process_backend_rejects_chunk_size(self) -> None:
+        """chunk_size only applies to the thread and serial backends."""
+        with pytest.raises(ValueError, match="chunk_size"):
+            run_batch(["a"], backend="process", chunk_size=10)
+
+    def test_stage_timings_merged(self) -> None:
+        """Per-chunk stage timings are summed into the batch report."""
+        _, report = run_batch([str(i) for i in range(10)], backend="thread", chunk_size=3)
+
+        assert report.chunks == 4
+        assert [t.name for t in report.stages] == ["create+complete+result"]
+        assert report.stages[0].items == 10
+        assert report.stages[0].calls == 10
+
+    def test_defaults_from_settings(self) -> None:
+        """Backend and worker count default to the settings snapshot."""
+        settings = Settings(batch_backend="serial", batch_workers=5)
+        _, report = run_batch(["a", "b"], settings=settings)
+
+        assert report.backend == "serial"
+        assert report.workers == 1
+
+    def test_invalid_workers(self) -> None:
+        """workers must be positive."""
+        with pytest.raises(ValueError):
+            run_batch(["a"], backend="thread", workers=-1)
+
+    def test_empty_input(self) -> None:
+        """An empty batch produces an empty run."""
+        outputs, report = run_batch([], backend="thread")
+        assert outputs == []
+        assert report.items == 0
+
+    def test_report_format(self) -> None:
+        """The report renders throughput and the interpreter build."""
+        _, report = run_batch(["a"], backend="serial")
+        line = report.format()
+        assert "1 items" in line
+        assert "items/s" in line
+
+
+class TestThreadSafety:
+    """Tests for state shared between worker threads."""
+
+    def test_ids_unique_across_threads(self) -> None:
+        """Concurrent example creation never repeats an ID."""
+        ids: list[list[str]] = [[] for _ in range(8)]
+
+        def create(slot: int) -> None:
+            ids[slot].extend(create_example(f"n{i}").id for i in range(500))
+
+        threads = [threading.Thread(target=create, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        flat = [i for chunk in ids for i in chunk]
+        assert len(set(flat)) == len(flat) == 4000
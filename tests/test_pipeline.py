@@ -0,0 +1,238 @@
+"""
+Tests for the processing pipeline.
+
+These tests verify stage registration, fusion and error handling.
+"""
+
+from collections.abc import Callable
+
+import pytest
+
+from my_project.pipeline import Pipeline
+
+
+def _double(x: int) -> int:
+    return x * 2
+
+
+def _inc(x: int) -> int:
+    return x + 1
+
+
+def _reject_odd(x: int) -> int:
+    if x % 2:
+        raise ValueError("odd")
+    return x
+
+
+def _record(seen: list[list[int]]) -> Callable[[list[int]], list[int]]:
+    def save(items: list[int]) -> list[int]:
+        seen.append(list(items))
+        return items
+
+    return save
+
+
+class TestRegistration:
+    """Tests for adding and ordering stages."""
+
+    def test_add_stage_appends(self) -> None:
+        """Stages run in registration order."""
+        pipeline = Pipeline().add_stage("double", _double).add_stage("inc", _inc)
+
+        assert [s.name for s in pipeline.stages] == ["double", "inc"]
+        assert pipeline.run([1, 2]).outputs == [3, 5]
+
+    def test_decorator_registers(self) -> None:
+        """The stage decorator registers under the function name."""
+        pipeline = Pipeline()
+
+        @pipeline.stage()
+        def negate(x: int) -> int:
+            return -x
+
+        assert pipeline.stages[0].name == "negate"
+        assert pipeline.run([3]).outputs == [-3]
+
+    def test_insert_before_and_after(self) -> None:
+        """Stages can be positioned relative to existing ones."""
+        pipeline = Pipeline().add_stage("a", _inc).add_stage("c", _inc)
+        pipeline.add_stage("b", _double, after="a")
+        pipeline.add_stage("start", _double, before="a")
+
+        assert [s.name for s in pipeline.stages] == ["start", "a", "b", "c"]
+
+    def test_duplicate_name_rejected(self) -> None:
+        """Stage names must be unique."""
+        pipeline = Pipeline().add_stage("a", _inc)
+        with pytest.raises(ValueError, match="already registered"):
+            pipeline.add_stage("a", _inc)
+
+    def test_unknown_anchor_raises(self) -> None:
+        """Inserting relative to a missing stage raises KeyError."""
+        with pytest.raises(KeyError):
+            Pipeline().add_stage("a", _inc, before="missing")
+
+    def test_copy_is_independent(self) -> None:
+        """Copies do not share stage lists."""
+        original = Pipeline().add_stage("a", _inc)
+        clone = original.copy().add_stage("b", _inc)
+
+        assert len(original.stages) == 1
+        assert len(clone.stages) == 2
+
+    def test_remove_stage(self) -> None:
+        """Removed stages no longer run."""
+        pipeline = Pipeline().add_stage("a", _inc).add_stage("b", _double).remove_stage("b")
+        assert pipeline.run([1]).outputs == [2]
+
+
+class TestFusion:
+    """Tests for segment compilation."""
+
+    def test_adjacent_pure_stages_fuse(self) -> None:
+        """Pure per-item stages collapse into one segment."""
+        pipeline = Pipeline().add_stage("a", _inc).add_stage("b", _double).add_stage("c", _inc)
+
+        segments = pipeline.compile()
+
+        assert len(segments) == 1
+        assert segments[0].name == "a+b+c"
+
+    def test_impure_and_batch_stages_split_segments(self) -> None:
+        """Impure and batch stages break fusion."""
+        pipeline = (
+            Pipeline()
+            .add_stage("a", _inc)
+            .add_stage("b", _inc)
+            .add_stage("log", _inc, pure=False)
+            .add_stage("c", _inc)
+            .add_stage("save", list, batch=True)
+        )
+
+        names = [seg.name for seg in pipeline.compile()]
+
+        assert names == ["a+b", "log", "c", "save"]
+
+    def test_fused_output_matches_sequential(self) -> None:
+        """Fusion does not change results."""
+        fused = Pipeline().add_stage("a", _inc).add_stage("b", _double)
+        split = Pipeline().add_stage("a", _inc).add_stage("b", _double, pure=False)
+
+        assert fused.run(range(10)).outputs == split.run(range(10)).outputs
+
+    def test_recompiles_after_change(self) -> None:
+        """Adding a stage invalidates the compiled plan."""
+        pipeline = Pipeline().add_stage("a", _inc)
+        pipeline.compile()
+        pipeline.add_stage("b", _inc)
+
+        assert pipeline.compile()[0].name == "a+b"
+
+
+class TestRun:
+    """Tests for running pipelines."""
+
+    def test_batch_stage_receives_chunks(self) -> None:
+        """Batch stages are called once per chunk."""
+        seen: list[int] = []
+
+        def record(items: list[int]) -> list[int]:
+            seen.append(len(items))
+            return items
+
+        pipeline = Pipeline().add_stage("save", record, batch=True, pure=False)
+        run = pipeline.run(range(5), chunk_size=2)
+
+        assert seen == [2, 2, 1]
+        assert run.report.chunks == 3
+
+    def test_errors_routed_to_handler(self) -> None:
+        """Failing items get the on_error output and skip later stages."""
+        calls: list[int] = []
+
+        def check(x: int) -> int:
+            if x == 2:
+                raise ValueError("two")
+            return x
+
+        def track(x: int) -> int:
+            calls.append(x)
+            return x
+
+        pipeline = Pipeline(on_error=lambda item, e: f"{item}:{e}")
+        pipeline.add_stage("check", check).add_stage("track", track, pure=False)
+        run = pipeline.run([1, 2, 3])
+
+        assert run.outputs == [1, "2:two", 3]
+        assert calls == [1, 3]
+        assert run.report.failed == 1
+
+    def test_batch_failure_fails_chunk(self) -> None:
+        """A raising batch stage fails every item in the chunk."""
+
+        def boom(items: list[int]) -> list[int]:
+            raise RuntimeError("down")
+
+        pipeline = Pipeline(on_error=lambda item, e: None).add_stage("save", boom, batch=True)
+        run = pipeline.run([1, 2])
+
+        assert run.outputs == [None, None]
+        assert run.report.stages[0].failed == 2
+
+    def test_batch_length_mismatch_fails(self) -> None:
+        """Batch stages must return one output per input."""
+        pipeline = Pipeline(on_error=lambda item, e: str(e))
+        pipeline.add_stage("drop", lambda items: items[:1], batch=True)
+
+        outputs = pipeline.run([1, 2]).outputs
+
+        assert "returned 1 items for 2" in outputs[0]
+
+    def test_default_handler_reraises(self) -> None:
+        """Without on_error, stage exceptions propagate."""
+        pipeline = Pipeline().add_stage("fail", lambda x: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            pipeline.run([1])
+
+    def test_report_counts(self) -> None:
+        """The report records items and per-segment calls."""
+        pipeline = Pipeline().add_stage("a", _inc).add_stage("save", list, batch=True)
+        report = pipeline.run(range(4), chunk_size=2).report
+
+        assert report.items == 4
+        assert report.stages[0].calls == 4
+        assert report.stages[1].calls == 2
+        assert "save" in report.format()
+
+    def test_run_unpacks_with_cached_report(self) -> None:
+        """A run unpacks as (outputs, report) and builds its report once."""
+        pipeline = Pipeline().add_stage("a", _inc).add_stage("b", _double)
+        run = pipeline.run([1, 2])
+        outputs, report = run
+
+        assert outputs == [4, 6]
+        assert report is run.report
+        assert report.stages[0].name == "a+b"
+        assert report.stages[0].items == 2
+
+    def test_run_one_matches_run(self) -> None:
+        """run_one gives the same output as a one-item run, errors included."""
+        pipeline = Pipeline(on_error=lambda item, exc: f"{item}: {exc}")
+        pipeline.add_stage("inc", _inc).add_stage("check", _reject_odd, pure=False)
+
+        for item in (1, 2):
+            assert pipeline.run_one(item) == pipeline.run([item]).outputs[0]
+
+    def test_run_one_with_batch_stage(self) -> None:
+        """Pipelines with batch stages still hand run_one's item over as a chunk."""
+        seen: list[list[int]] = []
+        pipeline = Pipeline().add_stage("a", _inc).add_stage("save", _record(seen), batch=True)
+
+        assert pipeline.run_one(1) == 2
+        assert seen == [[2]]
+
+    def test_invalid_chunk_size(self) -> None:
+        """chunk_size must be positive."""
+        with pytest.raises(ValueError):
+            Pipeline().run([1], chunk_size=0)
@@ -0,0 +1,155 @@
+"""
+Tests for the local preview server.
+
+These tests start a real server on a free port and issue HTTP requests.
+"""
+
+import gzip
+import http.client
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from my_project.pages import build_site, compress_site
+from my_project.preview import _accepted_encodings, create_server
+
+
+@pytest.fixture
+def site_dir(tmp_path: Path) -> Path:
+    """Build a small compressed site."""
+    source = tmp_path / "data"
+    source.mkdir()
+    (source / "report.yaml").write_text(
+        "results:\n" + "".join(f"  - success: true\n    message: item {i}\n" for i in range(50))
+    )
+    output = tmp_path / "site"
+    build_site(source, output, jobs=1)
+    compress_site(output, jobs=1)
+    return output
+
+
+@pytest.fixture
+def server(site_dir: Path) -> Iterator[tuple[str, int]]:
+    """Serve the site on a free port for the duration of a test."""
+    httpd = create_server(site_dir, "127.0.0.1", 0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "127.0.0.1", httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(
+    server: tuple[str, int], path: str, headers: dict[str, str] | None = None, method: str = "GET"
+) -> tuple[http.client.HTTPResponse, bytes]:
+    conn = http.client.HTTPConnection(*server, timeout=5)
+    conn.request(method, path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+class TestAcceptedEncodings:
+    """Tests for Accept-Encoding parsing."""
+
+    def test_parses_list(self) -> None:
+        """Codings are split and lowercased."""
+        assert _accepted_encodings("gzip, BR") == {"gzip", "br"}
+
+    def test_zero_quality_excluded(self) -> None:
+        """q=0 explicitly refuses a coding."""
+        assert _accepted_encodings("br;q=0, gzip;q=0.5") == {"gzip"}
+
+    def test_missing_header(self) -> None:
+        """No header means identity only."""
+        assert _accepted_encodings(None) == set()
+
+
+class TestPreviewServer:
+    """Tests for PreviewHandler behaviour."""
+
+    def test_serves_identity(self, server: tuple[str, int], site_dir: Path) -> None:
+        """Without Accept-Encoding the raw file is served."""
+        response, body = _get(server, "/report.html")
+
+        assert response.status == 200
+        assert response.getheader("Content-Encoding") is None
+        assert response.getheader("Content-Type") == "text/html"
+        assert body == (site_dir / "report.html").read_bytes()
+
+    def test_serves_gzip_variant(self, server: tuple[str, int], site_dir: Path) -> None:
+        """gzip-accepting clients receive the pre-compressed sibling."""
+        response, body = _get(server, "/report.html", {"Accept-Encoding": "gzip"})
+
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert response.getheader("Vary") == "Accept-Encoding"
+        assert gzip.decompress(body) == (site_dir / "report.html").read_bytes()
+
+    def test_prefers_brotli(self, server: tuple[str, int], site_dir: Path) -> None:
+        """Brotli is preferred when both encodings are available."""
+        if not (site_dir / "report.html.br").exists():
+            pytest.skip("brotli not installed")
+        response, _ = _get(server, "/report.html", {"Accept-Encoding": "gzip, br"})
+        assert response.getheader("Content-Encoding") == "br"
+
+    def test_etag_not_modified(self, server: tuple[str, int]) -> None:
+        """A matching If-None-Match yields 304 with no body."""
+        first, _ = _get(server, "/report.html")
+        etag = first.getheader("ETag")
+        assert etag
+
+        response, body = _get(server, "/report.html", {"If-None-Match": etag})
+
+        assert response.status == 304
+        assert body == b""
+
+    def test_etag_differs_per_encoding(self, server: tuple[str, int]) -> None:
+        """Compressed and identity responses carry different ETags."""
+        plain, _ = _get(server, "/report.html")
+        packed, _ = _get(server, "/report.html", {"Accept-Encoding": "gzip"})
+        assert plain.getheader("ETag") != packed.getheader("ETag")
+
+    def test_directory_serves_index(self, server: tuple[str, int], site_dir: Path) -> None:
+        """The site root serves index.html."""
+        response, body = _get(server, "/")
+
+        assert response.status == 200
+        assert body == (site_dir / "index.html").read_bytes()
+
+    def test_assets_are_immutable(self, server: tuple[str, int], site_dir: Path) -> None:
+        """Content-addressed assets get a long-lived cache policy."""
+        css = next((site_dir / "assets").rglob("*.css"))
+        path = "/" + css.relative_to(site_dir).as_posix()
+
+        response, _ = _get(server, path)
+
+        assert "immutable" in (response.getheader("Cache-Control") or "")
+
+    def test_head_has_no_body(self, server: tuple[str, int]) -> None:
+        """HEAD returns headers only."""
+        response, body = _get(server, "/report.html", method="HEAD")
+
+        assert response.status == 200
+        assert int(response.getheader("Content-Length") or 0) > 0
+        assert body == b""
+
+    def test_missing_file_404(self, server: tuple[str, int]) -> None:
+        """Unknown paths return 404."""
+        response, _ = _get(server, "/nope.html")
+        assert response.status == 404
+
+    def test_ignores_stale_sibling(self, server: tuple[str, int], site_dir: Path) -> None:
+        """A sibling older than its page is not served."""
+        page = site_dir / "report.html"
+        for suffix in (".gz", ".br"):
+            sibling = site_dir / f"report.html{suffix}"
+            if sibling.exists():
+                os.utime(sibling, ns=(0, 0))
+        response, body = _get(server, "/report.html", {"Accept-Encoding": "gzip, br"})
+
+        assert response.getheader("Content-Encoding") is None
+        assert body == page.read_bytes()
@@ -0,0 +1,168 @@
+"""
+Tests for the SQLite repository.
+
+These tests verify upserts, indexed queries and write-through from core.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from my_project.config import Settings
+from my_project.core import create_example, process_batch, process_example
+from my_project.models import Example, Result, Status
+from my_project.repository import SQLiteRepository
+from my_project.segments import SegmentStore
+
+
+@pytest.fixture
+def repository(tmp_path: Path) -> SQLiteRepository:
+    """Repository in a temporary directory with a small batch size."""
+    repo = SQLiteRepository(tmp_path / "db" / "test.sqlite3", batch_size=2)
+    yield repo
+    repo.close()
+
+
+def _example(name: str, minutes: int, status: Status = Status.PENDING) -> Example:
+    return Example(
+        id=f"id-{name}",
+        name=name,
+        status=status,
+        created_at=datetime(2024, 1, 1) + timedelta(minutes=minutes),
+    )
+
+
+class TestSQLiteRepository:
+    """Tests for SQLiteRepository."""
+
+    def test_creates_database_in_wal_mode(self, repository: SQLiteRepository) -> None:
+        """The database file exists and uses write-ahead logging."""
+        assert repository.path.exists()
+        mode = repository._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_invalid_batch_size(self, tmp_path: Path) -> None:
+        """batch_size must be positive."""
+        with pytest.raises(ValueError):
+            SQLiteRepository(tmp_path / "x.sqlite3", batch_size=0)
+
+    def test_from_settings(self, tmp_path: Path) -> None:
+        """from_settings places the file under data_dir."""
+        settings = Settings(data_dir=tmp_path / "data", sqlite_filename="store.db")
+        with SQLiteRepository.from_settings(settings) as repo:
+            assert repo.path == tmp_path / "data" / "store.db"
+            assert repo.batch_size == settings.sqlite_batch_size
+
+    def test_upsert_round_trip(self, repository: SQLiteRepository) -> None:
+        """Examples read back with the same fields."""
+        example = create_example("alpha", {"k": "v"})
+        assert repository.upsert_examples([example]) == 1
+        assert repository.get_example(example.id) == example
+        assert repository.get_example("missing") is None
+
+    def test_upsert_replaces_by_id(self, repository: SQLiteRepository) -> None:
+        """A second upsert with the same ID updates the row."""
+        example = _example("alpha", 0)
+        repository.upsert_examples([example])
+        example.status = Status.COMPLETED
+        repository.upsert_examples([example])
+
+        assert repository.count_examples() == 1
+        stored = repository.get_example(example.id)
+        assert stored is not None
+        assert stored.status == Status.COMPLETED
+
+    def test_bulk_upsert_spans_batches(self, repository: SQLiteRepository) -> None:
+        """More rows than batch_size are all written."""
+        examples = [_example(f"n{i}", i) for i in range(5)]
+        assert repository.upsert_examples(iter(examples)) == 5
+        assert repository.count_examples() == 5
+
+    def test_examples_by_status(self, repository: SQLiteRepository) -> None:
+        """Status lookups return matches oldest first and honour limit."""
+        repository.upsert_examples(
+            [
+                _example("b", 2, Status.COMPLETED),
+                _example("a", 1, Status.COMPLETED),
+                _example("c", 3, Status.FAILED),
+            ]
+        )
+
+        names = [e.name for e in repository.examples_by_status(Status.COMPLETED)]
+        assert names == ["a", "b"]
+        assert len(repository.examples_by_status(Status.COMPLETED, limit=1)) == 1
+        assert repository.count_examples(Status.FAILED) == 1
+
+    def test_examples_between(self, repository: SQLiteRepository) -> None:
+        """Time-range queries are half-open and can filter by status."""
+        repository.upsert_examples(
+            [_example(f"n{i}", i, Status.COMPLETED if i % 2 else Status.PENDING) for i in range(6)]
+        )
+        start = datetime(2024, 1, 1, 0, 1)
+        end = datetime(2024, 1, 1, 0, 4)
+
+        assert [e.name for e in repository.examples_between(start, end)] == ["n1", "n2", "n3"]
+        completed = repository.examples_between(start, end, status=Status.COMPLETED)
+        assert [e.name for e in completed] == ["n1", "n3"]
+
+    def test_results_keyed_by_example(self, repository: SQLiteRepository) -> None:
+        """Results replace earlier results for the same example ID."""
+        first = Result(success=False, message="no", error="boom", data={"id": "x"})
+        second = Result(success=True, message="ok", data={"id": "x"})
+        repository.upsert_results([first, second])
+
+        assert repository.result_for("x") == second
+        assert repository.result_for("y") is None
+
+    def test_connection_per_thread(self, repository: SQLiteRepository) -> None:
+        """Each thread gets its own connection and sees committed writes."""
+        repository.upsert_examples([_example("main", 0)])
+        seen: list[int] = []
+        connections: list[object] = []
+
+        def worker() -> None:
+            connections.append(repository._connection())
+            seen.append(repository.count_examples())
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert seen == [1]
+        assert connections[0] is not repository._connection()
+
+
+class TestWriteThrough:
+    """Tests for persisting through the core pipeline."""
+
+    def test_process_batch_persists(self, repository: SQLiteRepository) -> None:
+        """Completed examples and their results are stored."""
+        results = process_batch(["a", "b", "c"], repository=repository).outputs
+
+        assert repository.count_examples(Status.COMPLETED) == 3
+        for result in results:
+            assert result.data is not None
+            assert repository.result_for(result.data["id"]) == result
+
+    def test_persist_uses_settings_snapshot(self, tmp_path: Path) -> None:
+        """persist=True writes to the stores under the given snapshot's data_dir."""
+        base = Settings(data_dir=tmp_path / "default")
+        tenant = base.with_overrides(data_dir=tmp_path / "tenant")
+
+        process_batch(["a", "b"], settings=tenant, persist=True)
+
+        with SQLiteRepository.from_settings(tenant) as repo:
+            assert repo.count_examples() == 2
+        assert len(SegmentStore.from_settings(tenant).segments()) >= 1
+        assert not base.data_dir.exists()
+
+    def test_process_example_persists(self, repository: SQLiteRepository) -> None:
+        """process_example writes its example through."""
+        result = process_example("solo", repository=repository)
+
+        assert result.data is not None
+        stored = repository.get_example(result.data["id"])
+        assert stored is not None
+        assert stored.name == "solo"
@@ -0,0 +1,181 @@
+"""
+Tests for time-partitioned segment storage.
+
+These tests verify segment layout, range queries, compaction and retention.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from my_project.config import Settings
+from my_project.core import persistent_pipeline, process_batch
+from my_project.models import Example, Status
+from my_project.segments import SegmentStore
+
+BASE = datetime(2024, 1, 1, 10, 0)
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> SegmentStore:
+    """Hourly segment store in a temporary directory."""
+    return SegmentStore(tmp_path / "segments")
+
+
+def _example(name: str, minutes: int, status: Status = Status.PENDING) -> Example:
+    return Example(
+        id=f"id-{name}", name=name, status=status, created_at=BASE + timedelta(minutes=minutes)
+    )
+
+
+class TestSegmentLayout:
+    """Tests for segment naming and placement."""
+
+    def test_hourly_keys(self, store: SegmentStore) -> None:
+        """Examples land in the segment for their hour."""
+        store.append([_example("a", 5), _example("b", 70), _example("c", 10)])
+
+        assert store.segments() == ["2024-01-01T10", "2024-01-01T11"]
+        assert (store.root / "2024-01-01T10.jsonl").read_text().count("\n") == 2
+
+    def test_daily_keys(self, tmp_path: Path) -> None:
+        """Daily granularity uses one segment per date."""
+        store = SegmentStore(tmp_path, granularity="day")
+        store.append([_example("a", 0), _example("b", 60 * 20)])
+
+        assert store.segments() == ["2024-01-01", "2024-01-02"]
+        assert store.bucket("2024-01-02") == datetime(2024, 1, 2)
+
+    def test_invalid_granularity(self, tmp_path: Path) -> None:
+        """Only hour and day are supported."""
+        with pytest.raises(ValueError):
+            SegmentStore(tmp_path, granularity="week")  # type: ignore[arg-type]
+
+    def test_from_settings(self, tmp_path: Path) -> None:
+        """from_settings places segments under data_dir and applies the policy."""
+        settings = Settings(
+            data_dir=tmp_path, segment_granularity="day", segment_retention_hours=48
+        )
+        store = SegmentStore.from_settings(settings)
+
+        assert store.root == tmp_path / "segments"
+        assert store.granularity == "day"
+        assert store.retention_hours == 48
+
+
+class TestRangeQueries:
+    """Tests for time-range queries."""
+
+    def test_between_is_half_open(self, store: SegmentStore) -> None:
+        """Queries include start, exclude end and come back sorted."""
+        store.append([_example(f"n{i}", i * 20) for i in range(6)][::-1])
+
+        found = store.between(BASE + timedelta(minutes=20), BASE + timedelta(minutes=80))
+        assert [e.name for e in found] == ["n1", "n2", "n3"]
+
+    def test_touches_only_overlapping_segments(self, store: SegmentStore) -> None:
+        """Segments outside the range are never opened."""
+        store.append([_example(f"h{h}", h * 60) for h in range(5)])
+        start = BASE + timedelta(hours=2, minutes=30)
+
+        assert store.segments_for(start, start + timedelta(minutes=45)) == [
+            "2024-01-01T12",
+            "2024-01-01T13",
+        ]
+        with patch.object(store, "_read_all", wraps=store._read_all) as read:
+            found = store.between(start, start + timedelta(minutes=45))
+        assert [e.name for e in found] == ["h3"]
+        assert read.call_count == 2
+
+    def test_last_window(self, store: SegmentStore) -> None:
+        """last() returns examples created within the window before now."""
+        store.append([_example("old", 0), _example("recent", 50)])
+        now = BASE + timedelta(minutes=55)
+
+        assert [e.name for e in store.last(timedelta(minutes=15), now=now)] == ["recent"]
+
+    def test_latest_record_wins(self, store: SegmentStore) -> None:
+        """Re-appending an example supersedes the earlier record."""
+        example = _example("a", 0)
+        store.append([example])
+        example.status = Status.COMPLETED
+        store.append([example])
+
+        found = store.between(BASE, BASE + timedelta(hours=1))
+        assert [e.status for e in found] == [Status.COMPLETED]
+
+
+class TestCompaction:
+    """Tests for compaction and retention."""
+
+    def test_compacts_closed_segments_only(self, store: SegmentStore) -> None:
+        """Closed segments are sorted, deduplicated and indexed; open ones are left."""
+        example = _example("a", 30)
+        store.append([example, _example("b", 10)])
+        example.status = Status.COMPLETED
+        store.append([example, _example("c", 65)])
+
+        report = store.compact(now=BASE + timedelta(minutes=70))
+
+        assert report.compacted == ["2024-01-01T10"]
+        assert report.records == 2
+        assert report.duplicates == 1
+        assert store.is_compacted("2024-01-01T10")
+        assert not store.is_compacted("2024-01-01T11")
+        lines = (store.root / "2024-01-01T10.jsonl").read_text().splitlines()
+        assert [Example.model_validate_json(line).name for line in lines] == ["b", "a"]
+
+    def test_indexed_reads_match_scans(self, store: SegmentStore) -> None:
+        """Queries over a compacted segment read only the matching range."""
+        store.append([_example(f"n{i}", i) for i in range(0, 60, 3)][::-1])
+        start, end = BASE + timedelta(minutes=10), BASE + timedelta(minutes=20)
+        before = store.between(start, end)
+
+        store.compact(now=BASE + timedelta(hours=2))
+        with patch.object(store, "_read_all") as read:
+            after = store.between(start, end)
+
+        read.assert_not_called()
+        assert after == before
+        assert [e.name for e in after] == ["n12", "n15", "n18"]
+        assert store.between(BASE + timedelta(minutes=61), BASE + timedelta(minutes=62)) == []
+
+    def test_append_after_compaction_drops_index(self, store: SegmentStore) -> None:
+        """Late writes make a segment unsorted until it is compacted again."""
+        store.append([_example("a", 30)])
+        store.compact(now=BASE + timedelta(hours=2))
+        store.append([_example("late", 5)])
+
+        assert not store.is_compacted("2024-01-01T10")
+        names = [e.name for e in store.between(BASE, BASE + timedelta(hours=1))]
+        assert names == ["late", "a"]
+
+    def test_retention_expires_old_segments(self, tmp_path: Path) -> None:
+        """Segments whose bucket ended before the retention window are deleted."""
+        store = SegmentStore(tmp_path, retention_hours=2)
+        store.append([_example(f"h{h}", h * 60) for h in range(4)])
+
+        report = store.compact(now=BASE + timedelta(hours=4, minutes=30))
+
+        assert report.expired == ["2024-01-01T10", "2024-01-01T11"]
+        assert store.segments() == ["2024-01-01T12", "2024-01-01T13"]
+
+    def test_no_retention_keeps_everything(self, store: SegmentStore) -> None:
+        """Without a retention policy nothing expires."""
+        store.append([_example("a", 0)])
+        assert store.expire(now=BASE + timedelta(days=365)) == []
+
+
+class TestWriteThrough:
+    """Tests for persisting through the core pipeline."""
+
+    def test_pipeline_appends_examples(self, store: SegmentStore) -> None:
+        """Completed examples are appended to the current segment."""
+        pipeline = persistent_pipeline(None, segments=store)
+        results = process_batch(["a", "b"], pipeline=pipeline).outputs
+
+        found = store.last(timedelta(minutes=5))
+        assert {e.id for e in found} == {r.data["id"] for r in results if r.data}
+        assert {e.status for e in found} == {Status.COMPLETED}
@@ -0,0 +1,240 @@
+"""
+Tests for consistent-hash sharding of the example store.
+
+These tests verify routing, shard-aware writes, scans, compaction and rebalancing.
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from my_project.config import Settings
+from my_project.core import open_repository, process_batch
+from my_project.models import Example, Result, Status
+from my_project.repository import SQLiteRepository
+from my_project.sharding import RING_FILE, HashRing, ShardedStore
+
+BASE = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> ShardedStore:
+    """Four-shard store in a temporary directory."""
+    sharded = ShardedStore(tmp_path / "shards", 4, batch_size=50)
+    yield sharded
+    sharded.close()
+
+
+def _examples(count: int, tenant: str | None = None) -> list[Example]:
+    return [
+        Example(
+            id=f"ex-{i}",
+            name=f"n{i}",
+            created_at=BASE + timedelta(minutes=i),
+            metadata={"tenant": tenant} if tenant else {},
+        )
+        for i in range(count)
+    ]
+
+
+def _result(example: Example) -> Result:
+    return Result(success=True, message="ok", data={"id": example.id, "name": example.name})
+
+
+class TestHashRing:
+    """Tests for HashRing."""
+
+    def test_deterministic(self) -> None:
+        """The same key always maps to the same shard."""
+        assert HashRing(8).shard_for("alpha") == HashRing(8).shard_for("alpha")
+
+    def test_spreads_keys(self) -> None:
+        """Keys spread over every shard."""
+        ring = HashRing(4)
+        counts = [0] * 4
+        for i in range(4000):
+            counts[ring.shard_for(f"key-{i}")] += 1
+        assert min(counts) > 500
+
+    def test_growing_moves_few_keys(self) -> None:
+        """Adding a shard moves roughly 1/N of keys, all onto the new shard."""
+        before, after = HashRing(4), HashRing(5)
+        moved = [k for k in map(str, range(5000)) if before.shard_for(k) != after.shard_for(k)]
+
+        assert len(moved) < 5000 * 0.35
+        assert {after.shard_for(k) for k in moved} == {4}
+
+    def test_invalid(self) -> None:
+        """At least one shard is required."""
+        with pytest.raises(ValueError):
+            HashRing(0)
+
+
+class TestShardedStore:
+    """Tests for ShardedStore reads and writes."""
+
+    def test_writes_group_by_shard(self, store: ShardedStore) -> None:
+        """Each example lands only in the shard that owns it."""
+        examples = _examples(40)
+        assert store.upsert_examples(examples) == 40
+
+        for example in examples:
+            owner = store.repository(store.shard_for(example))
+            assert owner.get_example(example.id) == example
+        assert sum(store.repository(i).count_examples() for i in range(4)) == 40
+        assert len(list((store.root).glob("*/my_project.sqlite3"))) == 4
+
+    def test_tenant_routes_together(self, store: ShardedStore) -> None:
+        """Examples of one tenant share a shard."""
+        examples = _examples(20, tenant="acme")
+        store.upsert_examples(examples)
+
+        assert {store.shard_for(e) for e in examples} == {store.shard_for(examples[0])}
+        assert store.get_example("ex-3", tenant="acme") == examples[3]
+
+    def test_results_routed_by_example_id(self, store: ShardedStore) -> None:
+        """Results are found by their example ID."""
+        examples = _examples(10)
+        store.upsert_results([_result(e) for e in examples])
+
+        assert store.result_for("ex-7") == _result(examples[7])
+        assert store.result_for("missing") is None
+
+    def test_scans_merge_across_shards(self, store: ShardedStore) -> None:
+        """Time-range scans fan out and come back in created_at order."""
+        store.upsert_examples(_examples(30))
+
+        found = store.examples_between(BASE + timedelta(minutes=5), BASE + timedelta(minutes=25))
+        assert [e.name for e in found] == [f"n{i}" for i in range(5, 25)]
+        assert store.count_examples() == 30
+        assert store.count_examples(Status.COMPLETED) == 0
+
+    def test_compact(self, store: ShardedStore) -> None:
+        """Every shard is compacted."""
+        store.upsert_examples(_examples(10))
+        assert store.compact() == 4
+
+    def test_recorded_shard_count_wins(self, tmp_path: Path) -> None:
+        """Reopening a store keeps the count recorded in ring.json."""
+        with ShardedStore(tmp_path, 3):
+            pass
+        with ShardedStore(tmp_path, 8) as reopened:
+            assert reopened.shard_count == 3
+
+    def test_from_settings(self, tmp_path: Path) -> None:
+        """from_settings uses data_dir/shards and the configured count."""
+        settings = Settings(data_dir=tmp_path, shard_count=2, shard_key="team")
+        with ShardedStore.from_settings(settings) as sharded:
+            assert sharded.root == tmp_path / "shards"
+            assert sharded.shard_count == 2
+            assert sharded.shard_key == "team"
+
+    def test_open_repository_picks_sharding(self, tmp_path: Path) -> None:
+        """The configured store is sharded only with more than one shard."""
+        single = Settings(data_dir=tmp_path / "one")
+        with open_repository(single) as repo:
+            assert isinstance(repo, SQLiteRepository)
+        with open_repository(single.with_overrides(shard_count=3)) as repo:
+            assert isinstance(repo, ShardedStore)
+
+    def test_unsharded_database_is_imported(self, tmp_path: Path) -> None:
+        """Enabling sharding carries over rows from the unsharded database."""
+        single = Settings(data_dir=tmp_path)
+        examples = _examples(20)
+        with open_repository(single) as repo:
+            repo.upsert_examples(examples)
+            repo.upsert_results(_result(e) for e in examples)
+
+        with open_repository(single.with_overrides(shard_count=4)) as repo:
+            assert isinstance(repo, ShardedStore)
+            assert repo.shard_count == 4
+            assert repo.count_examples() == 20
+            assert repo.result_for("ex-3") == _result(examples[3])
+        assert not (tmp_path / single.sqlite_filename).exists()
+
+        with pytest.warns(UserWarning, match="rebalance-shards"), open_repository(single) as repo:
+            assert isinstance(repo, ShardedStore)
+            assert repo.count_examples() == 20
+
+    def test_persist_through_shards(self, tmp_path: Path) -> None:
+        """persist=True writes through the sharded store when configured."""
+        settings = Settings(data_dir=tmp_path, shard_count=3)
+        results = process_batch(["a", "b", "c", "d"], settings=settings, persist=True).outputs
+
+        with ShardedStore.from_settings(settings) as sharded:
+            assert sharded.count_examples(Status.COMPLETED) == 4
+            for result in results:
+                assert result.data is not None
+                assert sharded.result_for(result.data["id"]) == result
+
+
+class TestRebalance:
+    """Tests for online rebalancing."""
+
+    @pytest.mark.parametrize("target", [6, 2])
+    def test_rebalance_moves_rows(self, store: ShardedStore, target: int) -> None:
+        """After rebalancing every row lives on its new owner and nothing is lost."""
+        examples = _examples(200)
+        store.upsert_examples(examples)
+        store.upsert_results([_result(e) for e in examples])
+
+        report = store.rebalance(target)
+
+        assert report.previous == 4
+        assert report.shards == target
+        assert 0 < report.examples_moved < 200
+        assert report.results_moved > 0
+        assert store.count_examples() == 200
+        for example in examples:
+            owner = store.repository(store.shard_for(example))
+            assert owner.get_example(example.id) == example
+            assert store.result_for(example.id) == _result(example)
+        assert json.loads((store.root / RING_FILE).read_text()) == {"shards": target}
+        assert sorted(p.name for p in store.root.iterdir() if p.is_dir()) == [
+            f"{i:03d}" for i in range(target)
+        ]
+
+    def test_newer_rows_are_not_overwritten(self, store: ShardedStore) -> None:
+        """A row already rewritten on its new owner keeps the newer version."""
+        example = _examples(1)[0]
+        store.upsert_examples([example])
+        target = next(
+            n for n in range(6, 64) if HashRing(n).shard_for(example.id) != store.shard_for(example)
+        )
+        updated = example.model_copy(update={"status": Status.COMPLETED})
+        store.repository(HashRing(target).shard_for(example.id)).upsert_examples([updated])
+
+        store.rebalance(target)
+
+        stored = store.get_example(example.id)
+        assert stored is not None
+        assert stored.status == Status.COMPLETED
+
+    def test_writes_during_rebalance(self, store: ShardedStore) -> None:
+        """Concurrent writes are routed with the new ring and survive the rebalance."""
+        store.upsert_examples(_examples(300))
+        late = [Example(id=f"late-{i}", name=f"late{i}", created_at=BASE) for i in range(100)]
+
+        writer = threading.Thread(target=store.upsert_examples, args=(late,))
+        writer.start()
+        store.rebalance(7)
+        writer.join()
+
+        assert store.count_examples() == 400
+        for example in late:
+            assert store.get_example(example.id) == example
+
+    def test_resume_interrupted_rebalance(self, tmp_path: Path) -> None:
+        """A store reopened mid-rebalance reads through the previous ring and can finish."""
+        with ShardedStore(tmp_path, 2) as first:
+            first.upsert_examples(_examples(50))
+        (tmp_path / RING_FILE).write_text(json.dumps({"shards": 5, "previous": 2}))
+
+        with ShardedStore(tmp_path) as reopened:
+            assert reopened.get_example("ex-10") is not None
+            reopened.rebalance(5)
+            assert reopened.count_examples() == 50
+            assert json.loads((tmp_path / RING_FILE).read_text()) == {"shards": 5}
@@ -0,0 +1,176 @@
+"""
+Tests for memory-bounded streaming runs.
+
+These tests verify watermark backpressure, ordering and the RSS ceiling.
+"""
+
+import json
+import threading
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from my_project.config import Settings
+from my_project.core import default_pipeline
+from my_project.streaming import (
+    MemoryLimitError,
+    WatermarkQueue,
+    current_rss_mb,
+    peak_rss_mb,
+    stream_run,
+)
+from my_project.workload import WorkloadRecorder, load_capture
+
+
+@pytest.fixture
+def small_settings() -> Settings:
+    """Settings with tiny watermarks so backpressure kicks in quickly."""
+    return Settings(stream_chunk_size=3, stream_high_watermark=6, stream_low_watermark=2)
+
+
+class TestWatermarkQueue:
+    """Tests for WatermarkQueue."""
+
+    def test_invalid_watermarks(self) -> None:
+        """low must be below high."""
+        with pytest.raises(ValueError):
+            WatermarkQueue(high=2, low=2)
+
+    def test_fifo_and_close(self) -> None:
+        """Entries come out in order and get reports exhaustion after close."""
+        queue = WatermarkQueue(high=10, low=5)
+        queue.put("a")
+        queue.put("b")
+        queue.close()
+
+        assert queue.get() == (True, "a")
+        assert queue.get() == (True, "b")
+        assert queue.get() == (False, None)
+
+    def test_blocks_until_low_watermark(self) -> None:
+        """A producer blocked at the high watermark resumes only at the low one."""
+        queue = WatermarkQueue(high=3, low=1)
+        queue.put("x", weight=3)
+        done = threading.Event()
+
+        def produce() -> None:
+            queue.put("y")
+            done.set()
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+
+        queue.get()
+        queue.release(1)
+        assert not done.wait(0.1)  # weight 2 is still above the low watermark
+
+        queue.release(1)
+        assert done.wait(2)
+        thread.join()
+        assert queue.peak == 3
+
+    def test_non_blocking_put_ignores_watermark(self) -> None:
+        """block=False always enqueues."""
+        queue = WatermarkQueue(high=1, low=0)
+        queue.put("a")
+        queue.put("b", block=False)
+        assert queue.weight == 2
+
+
+class TestStreamRun:
+    """Tests for stream_run function."""
+
+    def test_results_in_input_order(self, small_settings: Settings) -> None:
+        """Output lines follow input order even with several workers."""
+        names = [f"item-{i}" for i in range(50)]
+        output = StringIO()
+
+        report = stream_run(names, output, settings=small_settings, workers=4)
+
+        lines = output.getvalue().splitlines()
+        assert [json.loads(line)["data"]["name"] for line in lines] == names
+        assert report.items == 50
+        assert report.chunks == 17
+
+    def test_backpressure_bounds_residency(self, small_settings: Settings) -> None:
+        """No stage ever holds more than the high watermark plus one chunk per worker."""
+        report = stream_run(
+            (f"n{i}" for i in range(200)), StringIO(), settings=small_settings, workers=2
+        )
+
+        assert report.peak_queued <= 6 + 2 * 3
+
+    def test_skips_blank_lines(self, small_settings: Settings) -> None:
+        """Blank and whitespace-only lines are ignored; names are stripped."""
+        output = StringIO()
+        report = stream_run(["a\n", "\n", "  \n", " b \n"], output, settings=small_settings)
+
+        assert report.items == 2
+        assert '"name":"b"' in output.getvalue()
+
+    def test_counts_failures(self, small_settings: Settings) -> None:
+        """Unsuccessful results are counted."""
+
+        def reject(name: str) -> str:
+            raise ValueError(name)
+
+        pipeline = default_pipeline().add_stage("reject", reject, before="create")
+        report = stream_run(["a", "b"], StringIO(), pipeline, settings=small_settings)
+
+        assert report.failed == 2
+
+    def test_stage_exception_propagates(self, small_settings: Settings) -> None:
+        """Unexpected errors in a stage abort the run and are re-raised."""
+        with (
+            patch("my_project.streaming.process_batch", side_effect=RuntimeError("boom")),
+            pytest.raises(RuntimeError, match="boom"),
+        ):
+            stream_run([f"n{i}" for i in range(30)], StringIO(), settings=small_settings)
+
+    def test_reports_peak_memory(self, small_settings: Settings) -> None:
+        """The report includes peak RSS."""
+        report = stream_run(["a"], StringIO(), settings=small_settings)
+        assert report.peak_rss_mb > 0
+
+    def test_rss_ceiling_enforced(self, small_settings: Settings) -> None:
+        """A ceiling below the baseline RSS fails once nothing is in flight."""
+        if current_rss_mb() is None:
+            pytest.skip("RSS not readable on this platform")
+        settings = small_settings.model_copy(update={"max_rss_mb": 1})
+
+        with pytest.raises(MemoryLimitError):
+            stream_run(["a", "b"], StringIO(), settings=settings)
+
+    def test_rss_ceiling_not_hit(self, small_settings: Settings) -> None:
+        """A generous ceiling does not throttle."""
+        settings = small_settings.model_copy(update={"max_rss_mb": 1_000_000})
+        report = stream_run(["a", "b"], StringIO(), settings=settings)
+        assert report.rss_throttled == 0
+
+    def test_records_workload(self, small_settings: Settings, tmp_path: Path) -> None:
+        """A recorder captures every streamed name."""
+        names = [f"n{i}" for i in range(10)]
+        with WorkloadRecorder(tmp_path / "c.jsonl.gz") as recorder:
+            stream_run(names, StringIO(), settings=small_settings, workers=2, recorder=recorder)
+
+        records = load_capture(recorder.path).records
+        assert sorted(r.name for r in records) == sorted(names)
+        assert all(r.success for r in records)
+
+    def test_invalid_workers(self, small_settings: Settings) -> None:
+        """workers must be positive."""
+        with pytest.raises(ValueError):
+            stream_run([], StringIO(), settings=small_settings, workers=0)
+
+
+class TestPeakRss:
+    """Tests for memory helpers."""
+
+    def test_peak_at_least_current(self) -> None:
+        """Peak RSS is never below current RSS."""
+        current = current_rss_mb()
+        if current is None:
+            pytest.skip("RSS not readable on this platform")
+        assert peak_rss_mb() >= current * 0.9
@@ -0,0 +1,128 @@
+"""
+Tests for tracing spans and the Chrome trace exporter.
+
+These tests verify sampling, nesting, the no-op path and the export format.
+"""
+
+import json
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from my_project.config import Settings
+from my_project.core import process_example
+from my_project.tracing import (
+    Tracer,
+    current_tracer,
+    span,
+    start_tracing,
+    stop_tracing,
+)
+
+
+@pytest.fixture(autouse=True)
+def _no_tracer() -> Iterator[None]:
+    """Make sure no test leaves a tracer installed."""
+    yield
+    stop_tracing()
+
+
+def _spans(path: Path) -> list[dict]:
+    return [e for e in json.loads(path.read_text())["traceEvents"] if e["ph"] == "X"]
+
+
+class TestSpan:
+    """Tests for span."""
+
+    def test_noop_without_tracer(self) -> None:
+        """Without a tracer every span is the same shared no-op."""
+        assert current_tracer() is None
+        assert span("a") is span("b", x=1)
+        with span("a"):
+            pass
+
+    def test_records_nested_spans(self, tmp_path: Path) -> None:
+        """Nested spans are recorded inside their parent with their args."""
+        tracer = start_tracing(Tracer(tmp_path / "t.json"))
+        with span("outer"), span("inner", item="x"):
+            pass
+
+        spans = {e["name"]: e for e in _spans(tracer.export())}
+        outer, inner = spans["outer"], spans["inner"]
+        assert inner["args"] == {"item": "x"}
+        assert outer["ts"] <= inner["ts"]
+        assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+        assert tracer.roots == 1
+
+    def test_unsampled_trace_is_silent(self, tmp_path: Path) -> None:
+        """Spans under an unsampled root record nothing."""
+        tracer = start_tracing(Tracer(tmp_path / "t.json", sample_rate=0.0))
+        with span("root"):
+            assert span("child") is span("other")
+
+        assert tracer.events == 0
+        assert (tracer.roots, tracer.sampled) == (1, 0)
+
+    def test_head_sampling_rate(self, tmp_path: Path) -> None:
+        """Roughly sample_rate of roots are kept, each with its whole subtree."""
+        tracer = start_tracing(Tracer(tmp_path / "t.json", sample_rate=0.25, seed=7))
+        for _ in range(2000):
+            with span("root"), span("child"):
+                pass
+
+        assert 400 < tracer.sampled < 600
+        assert tracer.events == 2 * tracer.sampled
+
+    def test_threads_sample_independently(self, tmp_path: Path) -> None:
+        """A worker thread's first span is a root of its own."""
+        tracer = start_tracing(Tracer(tmp_path / "t.json"))
+
+        def work() -> None:
+            with span("worker"):
+                pass
+
+        with span("main"):
+            thread = threading.Thread(target=work, name="tracing-worker")
+            thread.start()
+            thread.join()
+
+        assert tracer.roots == 2
+        events = json.loads(tracer.export().read_text())["traceEvents"]
+        names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+        assert "tracing-worker" in names
+
+    def test_max_events(self, tmp_path: Path) -> None:
+        """Spans beyond max_events are dropped and counted."""
+        tracer = start_tracing(Tracer(tmp_path / "t.json", max_events=2))
+        for _ in range(3):
+            with span("s"):
+                pass
+
+        assert tracer.events == 2
+        assert json.loads(tracer.export().read_text())["otherData"]["dropped"] == 1
+
+
+class TestTracer:
+    """Tests for Tracer."""
+
+    def test_create_under_log_dir(self, tmp_path: Path) -> None:
+        """create() exports to log_dir/traces with the configured rate."""
+        tracer = Tracer.create(Settings(log_dir=tmp_path, trace_sample_rate=0.1))
+        assert tracer.path.parent == tmp_path / "traces"
+        assert tracer.sample_rate == 0.1
+
+    def test_invalid_rate(self, tmp_path: Path) -> None:
+        """sample_rate must be a fraction."""
+        with pytest.raises(ValueError):
+            Tracer(tmp_path / "t.json", sample_rate=1.5)
+
+    def test_instruments_processing(self, tmp_path: Path) -> None:
+        """process_example emits spans down to model construction."""
+        tracer = start_tracing(Tracer(tmp_path / "t.json"))
+        process_example("traced")
+
+        names = [e["name"] for e in _spans(tracer.export())]
+        for expected in ["process_example", "process_batch", "create_example", "Example"]:
+            assert expected in names
@@ -0,0 +1,176 @@
+"""
+Tests for the shared-memory result transport.
+
+These tests verify record encoding and multi-process delivery.
+"""
+
+import pytest
+
+from my_project.models import Result
+from my_project.transport import (
+    ERROR_SIZE,
+    FLAG_OVERFLOW,
+    NAME_SIZE,
+    RECORD,
+    ResultRing,
+    SharedResults,
+    decode_record,
+    encode_result,
+    process_parallel,
+)
+
+
+class TestRecordEncoding:
+    """Tests for encode_result and decode_record."""
+
+    def test_success_round_trip(self) -> None:
+        """A standard success Result survives encoding."""
+        result = Result(
+            success=True,
+            message="Successfully processed 'né'",
+            data={"id": "abc-123", "name": "né"},
+        )
+
+        record = encode_result(7, result)
+
+        assert len(record) == RECORD.size
+        assert decode_record(record) == result
+
+    def test_failure_round_trip(self) -> None:
+        """A failure Result keeps its error text."""
+        result = Result(success=False, message="Processing failed", error="bad input")
+        assert decode_record(encode_result(0, result)) == result
+
+    def test_long_name_truncated_on_char_boundary(self) -> None:
+        """Names longer than the slot are clipped without splitting characters."""
+        name = "é" * NAME_SIZE
+        result = Result(success=True, message="", data={"id": "x", "name": name})
+
+        decoded = decode_record(encode_result(0, result))
+
+        assert decoded.data is not None
+        assert name.startswith(decoded.data["name"])
+        assert len(decoded.data["name"].encode()) <= NAME_SIZE
+
+    @pytest.mark.parametrize(
+        "result",
+        [
+            Result(success=True, message="Successfully processed 'a'", data={"id": "1"}),
+            Result(
+                success=True,
+                message="Successfully processed 'a'",
+                data={"id": "1", "name": "a", "extra": 2},
+            ),
+            Result(success=True, message="custom", data={"id": "1", "name": "a"}),
+            Result(success=False, message="Processing failed", error="x" * (ERROR_SIZE + 1)),
+            Result(success=False, message="Processing failed"),
+        ],
+    )
+    def test_lossy_records_flagged(self, result: Result) -> None:
+        """Results a record cannot reproduce exactly are flagged as overflow."""
+        assert encode_result(0, result)[8] & FLAG_OVERFLOW
+
+    def test_standard_records_not_flagged(self) -> None:
+        """Standard results fit their record."""
+        result = Result(
+            success=True, message="Successfully processed 'a'", data={"id": "1", "name": "a"}
+        )
+        assert not encode_result(0, result)[8] & FLAG_OVERFLOW
+
+
+class TestSharedResults:
+    """Tests for lazy result access."""
+
+    @pytest.fixture
+    def results(self) -> SharedResults:
+        """Three packed records: success, failure, success."""
+        packed = [
+            Result(success=True, message="", data={"id": "1", "name": "a"}),
+            Result(success=False, message="Processing failed", error="nope"),
+            Result(success=True, message="", data={"id": "3", "name": "c"}),
+        ]
+        records = bytearray(b"".join(encode_result(i, r) for i, r in enumerate(packed)))
+        return SharedResults(records, 3)
+
+    def test_len_and_index(self, results: SharedResults) -> None:
+        """Indexing decodes the requested record."""
+        assert len(results) == 3
+        assert results[1].error == "nope"
+        assert results[-1].data == {"id": "3", "name": "c"}
+
+    def test_slice(self, results: SharedResults) -> None:
+        """Slices decode to lists."""
+        assert [r.success for r in results[:2]] == [True, False]
+
+    def test_out_of_range(self, results: SharedResults) -> None:
+        """Indexing past the end raises IndexError."""
+        with pytest.raises(IndexError):
+            results[3]
+
+    def test_successes_without_decoding(self, results: SharedResults) -> None:
+        """successes counts flag bytes."""
+        assert results.successes == 2
+
+    def test_raw_fields(self, results: SharedResults) -> None:
+        """raw returns field tuples."""
+        assert results.raw(0) == (True, "1", "a", "")
+
+    def test_overflow_served_in_full(self) -> None:
+        """Overflow items come from the overflow map, not the clipped record."""
+        result = Result(success=True, message="custom", data={"id": "1", "name": "é" * 300})
+        shared = SharedResults(bytearray(encode_result(0, result)), 1, {0: result})
+
+        assert shared[0] == result
+        assert shared.raw(0) == (True, "1", "é" * 300, "")
+        assert shared.successes == 1
+
+
+class TestResultRing:
+    """Tests for the ring buffer."""
+
+    def test_invalid_capacity(self) -> None:
+        """Capacity must be positive."""
+        with pytest.raises(ValueError):
+            ResultRing(0)
+
+    def test_get_times_out_when_empty(self) -> None:
+        """An empty ring returns None after the timeout."""
+        ring = ResultRing(2)
+        try:
+            assert ring.get(timeout=0.01) is None
+        finally:
+            ring.close()
+
+
+class TestProcessParallel:
+    """Tests for process_parallel function."""
+
+    def test_results_in_input_order(self) -> None:
+        """Results come back in input order across processes."""
+        names = [f"item-{i}" for i in range(300)]
+
+        results = process_parallel(names, processes=3, capacity=16)
+
+        assert len(results) == 300
+        assert results.successes == 300
+        assert [results.raw(i)[2] for i in range(300)] == names
+        assert results[42].message == "Successfully processed 'item-42'"
+
+    def test_ids_unique(self) -> None:
+        """Each item gets its own generated ID."""
+        results = process_parallel(["a", "b", "c"], processes=2)
+        assert len({results.raw(i)[1] for i in range(3)}) == 3
+
+    def test_long_fields_match_in_process(self) -> None:
+        """Results too large for a record arrive intact."""
+        names = ["é" * 300, "short", "x" * 600]
+
+        results = process_parallel(names, processes=2, capacity=2)
+
+        assert [r.data["name"] for r in results if r.data] == names
+        assert results[0].message == f"Successfully processed '{names[0]}'"
+        assert results.raw(2)[2] == names[2]
+
+    def test_empty_input(self) -> None:
+        """No names means no workers and no results."""
+        assert len(process_parallel([])) == 0
@@ -0,0 +1,232 @@
+"""
+Tests for workload capture and replay.
+
+These tests verify the capture format, loading and replay metrics.
+"""
+
+import gzip
+import json
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from my_project.config import Settings
+from my_project.models import Result
+from my_project.workload import (
+    CAPTURE_FORMAT,
+    WorkloadRecorder,
+    _percentile,
+    load_capture,
+    replay,
+)
+
+
+def _capture(path: Path, names: list[str], gap: float = 0.0) -> Path:
+    with WorkloadRecorder(path) as recorder:
+        base = recorder._started
+        for i, name in enumerate(names):
+            recorder.record(name, base + i * gap, 0.002, success=name != "bad")
+    return path
+
+
+class TestWorkloadRecorder:
+    """Tests for WorkloadRecorder."""
+
+    def test_compact_format(self, tmp_path: Path) -> None:
+        """Captures are gzip JSON lines: a header, then one array per item."""
+        path = _capture(tmp_path / "c.jsonl.gz", ["alpha", "bad"], gap=0.5)
+
+        lines = gzip.decompress(path.read_bytes()).decode().splitlines()
+        header = json.loads(lines[0])
+        assert header["format"] == CAPTURE_FORMAT
+        assert header["command"] == "run"
+        assert json.loads(lines[1]) == [0.0, "alpha", 2.0, 1]
+        assert json.loads(lines[2]) == [500.0, "bad", 2.0, 0]
+
+    def test_record_batch_shares_time(self, tmp_path: Path) -> None:
+        """Chunk items share the chunk's start and wall time."""
+        results = [
+            Result(success=True, message="ok"),
+            Result(success=False, message="no", error="x"),
+        ]
+        with WorkloadRecorder(tmp_path / "b.jsonl.gz") as recorder:
+            recorder.record_batch(["a", "b"], results, recorder._started, 0.01)
+            assert recorder.records == 2
+
+        records = load_capture(recorder.path).records
+        assert [r.latency for r in records] == [0.005, 0.005]
+        assert [r.success for r in records] == [True, False]
+        assert [r.chunk for r in records] == [1, 1]
+
+    def test_create_under_log_dir(self, tmp_path: Path) -> None:
+        """create() places captures in log_dir/captures."""
+        settings = Settings(log_dir=tmp_path / "logs")
+        with WorkloadRecorder.create(settings) as recorder:
+            assert recorder.path.parent == tmp_path / "logs" / "captures"
+            assert recorder.path.name.endswith(".jsonl.gz")
+
+
+class TestLoadCapture:
+    """Tests for load_capture."""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Loaded records carry names, offsets and outcomes in seconds."""
+        workload = load_capture(_capture(tmp_path / "c.jsonl.gz", ["a", "b"], gap=0.25))
+
+        assert [r.name for r in workload.records] == ["a", "b"]
+        assert workload.records[1].offset == pytest.approx(0.25)
+
+    def test_rejects_other_files(self, tmp_path: Path) -> None:
+        """Files that are not captures are rejected."""
+        path = tmp_path / "other.jsonl.gz"
+        path.write_bytes(gzip.compress(b'{"format": "something-else"}\n'))
+        with pytest.raises(ValueError, match="not a workload capture"):
+            load_capture(path)
+
+
+class TestTruncatedCaptures:
+    """Tests for captures whose recording run was killed."""
+
+    def test_unclosed_capture_is_readable(self, tmp_path: Path) -> None:
+        """Records are flushed as they are written, before close()."""
+        recorder = WorkloadRecorder(tmp_path / "live.jsonl.gz")
+        recorder.record("a", recorder._started, 0.001, success=True)
+        recorder.record("b", recorder._started, 0.001, success=True)
+
+        workload = load_capture(recorder.path)
+        recorder.close()
+
+        assert [r.name for r in workload.records] == ["a", "b"]
+        assert workload.truncated
+
+    def test_cut_capture_keeps_prefix(self, tmp_path: Path) -> None:
+        """A capture cut mid-stream loads the records before the cut."""
+        path = _capture(tmp_path / "c.jsonl.gz", [f"n{i}" for i in range(50)])
+        data = path.read_bytes()
+        path.write_bytes(data[: len(data) - 40])
+
+        workload = load_capture(path)
+
+        assert workload.truncated
+        assert [r.name for r in workload.records] == [f"n{i}" for i in range(len(workload.records))]
+
+    def test_replay_reports_truncation(self, tmp_path: Path) -> None:
+        """Replaying a truncated capture says so instead of crashing."""
+        recorder = WorkloadRecorder(tmp_path / "live.jsonl.gz")
+        recorder.record("a", recorder._started, 0.001, success=True)
+
+        report = replay(recorder.path, speed=0)
+        recorder.close()
+
+        assert report.items == 1
+        assert report.truncated
+        assert "truncated" in report.format()
+
+    def test_empty_file_is_rejected(self, tmp_path: Path) -> None:
+        """A capture cut before its header is not a capture."""
+        path = tmp_path / "empty.jsonl.gz"
+        path.write_bytes(gzip.compress(b"")[:5])
+        with pytest.raises(ValueError, match="not a workload capture"):
+            load_capture(path)
+
+
+class TestReplay:
+    """Tests for replay."""
+
+    def test_reports_latency_and_errors(self, tmp_path: Path) -> None:
+        """Replays report throughput, percentiles and error rate."""
+        path = _capture(tmp_path / "c.jsonl.gz", ["a", "b", "c", "d"])
+
+        with patch("my_project.workload.process_example") as mock_process:
+            mock_process.side_effect = lambda name: Result(
+                success=name != "c", message="", error=None if name != "c" else "boom"
+            )
+            report = replay(path, speed=0, workers=2)
+
+        assert report.items == 4
+        assert report.errors == 1
+        assert report.error_rate == 0.25
+        assert report.throughput > 0
+        assert report.p50_ms <= report.p99_ms <= report.max_ms
+        assert report.recorded_p50_ms == 2.0
+        assert "p99" in report.format()
+
+    def test_paced_replay_follows_offsets(self, tmp_path: Path) -> None:
+        """At recorded speed the replay takes at least the recorded span."""
+        path = _capture(tmp_path / "c.jsonl.gz", ["a", "b", "c"], gap=0.05)
+
+        assert replay(path, speed=1.0).seconds >= 0.1
+        assert replay(path, speed=10.0).seconds < 0.1
+
+    def test_target_exceptions_are_errors(self, tmp_path: Path) -> None:
+        """A target that raises counts as an error instead of aborting."""
+        path = _capture(tmp_path / "c.jsonl.gz", ["a"])
+        with patch("my_project.workload.process_example", side_effect=RuntimeError):
+            assert replay(path, speed=0).errors == 1
+
+    def test_cli_target_passes_dash_names_safely(self, tmp_path: Path) -> None:
+        """CLI replays pass names as --name=... and disable capture and tracing."""
+        path = _capture(tmp_path / "c.jsonl.gz", ["-x"])
+
+        with patch("my_project.workload.subprocess.run") as mock_run:
+            mock_run.return_value.returncode = 0
+            report = replay(path, target="cli", speed=0)
+
+        assert report.errors == 0
+        command = mock_run.call_args.args[0]
+        env = mock_run.call_args.kwargs["env"]
+        assert command[-1] == "--name=-x"
+        assert env["CAPTURE_WORKLOADS"] == "false"
+        assert env["TRACE_SAMPLE_RATE"] == "0"
+
+    def test_chunks_replayed_as_chunks(self, tmp_path: Path) -> None:
+        """Recorded chunks go through the batch path and are labelled as averages."""
+        ok = Result(success=True, message="ok")
+        with WorkloadRecorder(tmp_path / "c.jsonl.gz") as recorder:
+            recorder.record("single", recorder._started, 0.001, success=True)
+            for chunk in (["a", "b", "c"], ["d", "e"]):
+                recorder.record_batch(chunk, [ok] * len(chunk), recorder._started, 0.003)
+
+        with (
+            patch("my_project.workload.process_batch") as mock_batch,
+            patch("my_project.workload.process_example", return_value=ok) as mock_one,
+        ):
+            mock_batch.side_effect = lambda names: Mock(outputs=[ok] * len(names))
+            report = replay(recorder.path, speed=0)
+
+        assert [c.args[0] for c in mock_batch.call_args_list] == [["a", "b", "c"], ["d", "e"]]
+        mock_one.assert_called_once_with("single")
+        assert report.items == 6
+        assert report.errors == 0
+        assert report.chunked_items == 5
+        assert "chunk averages" in report.format()
+
+    def test_cli_chunk_streams_names(self, tmp_path: Path) -> None:
+        """CLI replays of a chunk stream its names through 'run --input -'."""
+        with WorkloadRecorder(tmp_path / "c.jsonl.gz") as recorder:
+            ok = Result(success=True, message="ok")
+            recorder.record_batch(["a", "b"], [ok, ok], recorder._started, 0.002)
+
+        with patch("my_project.workload.subprocess.run") as mock_run:
+            mock_run.return_value.stdout = '{"success": true}\n{"success": false}\n'
+            report = replay(recorder.path, target="cli", speed=0)
+
+        assert mock_run.call_args.args[0][-2:] == ["--input", "-"]
+        assert mock_run.call_args.kwargs["input"] == "a\nb\n"
+        assert report.errors == 1
+
+    def test_invalid_arguments(self, tmp_path: Path) -> None:
+        """Unknown targets and negative speeds are rejected."""
+        path = _capture(tmp_path / "c.jsonl.gz", ["a"])
+        with pytest.raises(ValueError, match="Unknown replay target"):
+            replay(path, target="http")
+        with pytest.raises(ValueError):
+            replay(path, speed=-1)
+
+    def test_percentile(self) -> None:
+        """Percentiles use the nearest-rank method."""
+        values = [float(v) for v in range(1, 101)]
+        assert _percentile(values, 0.5) == 50.0
+        assert _percentile(values, 0.99) == 99.0
+        assert _percentile([], 0.5) == 0.0